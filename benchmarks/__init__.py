@@ -0,0 +1,5 @@
+"""
+Throughput benchmarks for phanas-pydantic-helpers.
+
+Run them with `python -m benchmarks --help`.
+"""
@@ -0,0 +1,89 @@
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+
+import pydantic
+
+from benchmarks.suite import CASES, run
+from phanas_pydantic_helpers import __version__
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=("Time each helper's hot path against a plain Pydantic baseline."),
+    )
+    parser.add_argument(
+        "patterns",
+        nargs="*",
+        metavar="PATTERN",
+        help='glob patterns of the cases to run (e.g. "template.*")',
+    )
+    parser.add_argument(
+        "-n",
+        "--number",
+        type=int,
+        default=1000,
+        help="calls per timing (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=5,
+        help="timings per case; the fastest is kept (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-o", "--output", metavar="FILE", help="save the results as JSON to FILE"
+    )
+    parser.add_argument(
+        "-l", "--list", action="store_true", help="list the cases and exit"
+    )
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(CASES))
+        return 0
+
+    results = run(
+        args.patterns,
+        number=args.number,
+        repeat=args.repeat,
+        progress=lambda name: print(f"Running {name}...", file=sys.stderr),
+    )
+
+    name_width = max((len(r["name"]) for r in results), default=0)
+    print(f"{'case':<{name_width}}  {'helper':>12}  {'baseline':>12}  {'ratio':>7}")
+    for result in results:
+        if "skipped" in result:
+            print(f"{result['name']:<{name_width}}  skipped: {result['skipped']}")
+            continue
+        print(
+            f"{result['name']:<{name_width}}  "
+            f"{result['seconds'] * 1e6:>10.2f}us  "
+            f"{result['baseline_seconds'] * 1e6:>10.2f}us  "
+            f"{result['ratio']:>6.2f}x"
+        )
+
+    if args.output:
+        report = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pydantic": pydantic.VERSION,
+            "phanas_pydantic_helpers": __version__,
+            "number": args.number,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
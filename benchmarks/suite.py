@@ -0,0 +1,772 @@
+"""
+Benchmark cases for each helper's hot path.
+
+Every case is timed next to a baseline that does the same job with plain
+Pydantic (a built-in field type or a hand-written validator), so results stay
+comparable between machines.
+
+Add cases with the `case` decorator. A case is a setup function which returns
+a pair of zero-argument callables: the helper being measured and its
+baseline.
+"""
+
+__all__ = ["Case", "CASES", "case", "run", "SkipCase"]
+
+import atexit
+import datetime as dt
+import fnmatch
+import itertools
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from pydantic import BaseModel, create_model, root_validator, validator
+
+ROOT_DIR = Path(__file__).parents[1]
+
+T_Statement = Callable[[], Any]
+T_Setup = Callable[[], Tuple[T_Statement, T_Statement]]
+
+
+class SkipCase(Exception):
+    """
+    Raised by a case's setup when it can't run here (e.g. a missing optional
+    dependency).
+    """
+
+
+class Case(NamedTuple):
+    name: str
+    setup: T_Setup
+    # Calls per timing, overriding the suite's default if set
+    number: Optional[int] = None
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, *, number: Optional[int] = None) -> Callable[[T_Setup], T_Setup]:
+    def register(setup: T_Setup) -> T_Setup:
+        if name in CASES:
+            raise ValueError(f"Benchmark case {name!r} is already registered")
+        CASES[name] = Case(name, setup, number)
+        return setup
+
+    return register
+
+
+def _require_pendulum() -> None:
+    try:
+        import pendulum  # noqa: F401
+    except ImportError:
+        raise SkipCase("pendulum is not installed")
+
+
+def _cycle(values: List[Any]) -> Callable[[], Any]:
+    """
+    Make a function which returns the next item of `values` each time it's
+    called, so statements don't validate the same input every time.
+    """
+    return itertools.cycle(values).__next__
+
+
+# region Import
+
+
+def _time_import(module: str) -> T_Statement:
+    args = [sys.executable, "-c", f"import {module}"]
+
+    def stmt():
+        subprocess.run(args, cwd=ROOT_DIR, check=True)
+
+    return stmt
+
+
+@case("import", number=1)
+def _import():
+    return _time_import("phanas_pydantic_helpers"), _time_import("pydantic")
+
+
+# endregion
+
+# region FieldConverter
+
+
+def _field_converter_models():
+    from phanas_pydantic_helpers import FieldConverter
+
+    class Number(int, FieldConverter):
+        @classmethod
+        def _pyd_convert_str(cls, value: str):
+            return cls(value.strip())
+
+        @classmethod
+        def _pyd_convert_int(cls, value: int):
+            return cls(value)
+
+    class Model(BaseModel):
+        value: Number
+
+    class BaselineModel(BaseModel):
+        value: int
+
+        @validator("value", pre=True, allow_reuse=True)
+        def convert(cls, value):
+            if isinstance(value, str):
+                return int(value.strip())
+            if isinstance(value, int):
+                return value
+            raise TypeError(f"No converter for type {type(value)}")
+
+    return Number, Model, BaselineModel
+
+
+@case("field_converter.warm")
+def _field_converter_warm():
+    _, Model, BaselineModel = _field_converter_models()
+    next_value = _cycle([" 1", 2, True, "3 "])
+    return (
+        lambda: Model(value=next_value()),
+        lambda: BaselineModel(value=next_value()),
+    )
+
+
+@case("field_converter.cold")
+def _field_converter_cold():
+    Number, Model, BaselineModel = _field_converter_models()
+    # Forget which converter each input type resolved to before every call
+    dispatch = Number._FieldConverter__pyd_dispatch
+    next_value = _cycle([" 1", 2, True, "3 "])
+
+    def stmt():
+        dispatch.clear()
+        Model(value=next_value())
+
+    return stmt, lambda: BaselineModel(value=next_value())
+
+
+@case("field_converter.union")
+def _field_converter_union():
+    # Picking union members by type vs letting Pydantic try each member
+    from phanas_pydantic_helpers import FieldConverter, converter_union
+
+    Number, _, _ = _field_converter_models()
+
+    class Text(str, FieldConverter):
+        @classmethod
+        def _pyd_convert_bytes(cls, value: bytes):
+            return cls(value.decode())
+
+    Model = create_model("Model", value=(converter_union(Number, Text), ...))
+    BaselineModel = create_model("BaselineModel", value=(Union[Number, Text], ...))
+    next_value = _cycle([b"a", b"b", 1, b"c"])
+    return (
+        lambda: Model(value=next_value()),
+        lambda: BaselineModel(value=next_value()),
+    )
+
+
+@case("field_converter.stats")
+def _field_converter_stats():
+    # The overhead of recording stats for every conversion
+    from phanas_pydantic_helpers import ConverterStats
+
+    _, Model, _ = _field_converter_models()
+    stats = ConverterStats()
+    next_value = _cycle([" 1", 2, True, "3 "])
+
+    def stmt():
+        with stats:
+            Model(value=next_value())
+
+    return stmt, lambda: Model(value=next_value())
+
+
+@case("field_converter.core_schema")
+def _field_converter_core_schema():
+    # The union of isinstance checks the converters compile to on
+    # pydantic-core (Pydantic v2), against one plain validator function which
+    # dispatches in Python, as used when there's nothing pydantic-core can
+    # check. Both validate the same single field.
+    try:
+        from pydantic_core import SchemaValidator, core_schema
+    except ImportError:
+        raise SkipCase("pydantic-core is not installed")
+    from phanas_pydantic_helpers.helpers.field_converter import _v2_validator
+
+    Number, _, _ = _field_converter_models()
+    union_validator = SchemaValidator(Number.__get_pydantic_core_schema__(Number, None))
+    plain_validator = SchemaValidator(
+        core_schema.no_info_plain_validator_function(
+            _v2_validator(
+                Number, Number._FieldConverter__pyd_convert.__func__, observe=False
+            )
+        )
+    )
+    next_value = _cycle([" 1", 2, True, "3 "])
+    return (
+        lambda: union_validator.validate_python(next_value()),
+        lambda: plain_validator.validate_python(next_value()),
+    )
+
+
+# endregion
+
+# region Time fields
+
+
+def _time_field_case(field_name: str, baseline_type: type, values: List[str]):
+    _require_pendulum()
+    import phanas_pydantic_helpers
+
+    Model = create_model(
+        "Model", value=(getattr(phanas_pydantic_helpers, field_name), ...)
+    )
+    BaselineModel = create_model("BaselineModel", value=(baseline_type, ...))
+    next_value = _cycle(values)
+    return (
+        lambda: Model(value=next_value()),
+        lambda: BaselineModel(value=next_value()),
+    )
+
+
+@case("time_field")
+def _time_field():
+    return _time_field_case(
+        "TimeField",
+        dt.time,
+        [f"{h:02}:{m:02}" for h in range(24) for m in (0, 15, 30, 45)],
+    )
+
+
+@case("duration_field")
+def _duration_field():
+    # Both parse "[H]H:MM:SS" durations
+    return _time_field_case(
+        "DurationField",
+        dt.timedelta,
+        [f"{h}:{m:02}:00" for h in range(10) for m in range(0, 60, 7)],
+    )
+
+
+@case("datetime_field")
+def _datetime_field():
+    return _time_field_case(
+        "DateTimeField",
+        dt.datetime,
+        [
+            f"2023-{mo:02}-{d:02}T{h:02}:30:00Z"
+            for mo in (1, 6, 12)
+            for d in (1, 15, 28)
+            for h in (0, 9, 18)
+        ],
+    )
+
+
+@case("dump_many", number=10)
+def _dump_many():
+    _require_pendulum()
+    from phanas_pydantic_helpers import (
+        DateTimeField,
+        DurationField,
+        TimeField,
+        dump_many,
+    )
+
+    class Model(BaseModel):
+        time: TimeField
+        duration: DurationField
+        dt: DateTimeField
+
+    models = [
+        Model(
+            time=f"{idx % 24}:{idx % 60:02}",
+            duration=f"{idx % 10}:{idx % 60:02}:00",
+            dt=f"2023-{idx % 12 + 1:02}-01T{idx % 24:02}:30:00Z",
+        )
+        for idx in range(1_000)
+    ]
+
+    def baseline():
+        "[" + ",".join(model.json() for model in models) + "]"
+
+    return lambda: dump_many(models), baseline
+
+
+@case("time_arrays", number=10)
+def _time_arrays():
+    _require_pendulum()
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        raise SkipCase("numpy is not installed")
+    from phanas_pydantic_helpers.common.time import parse_time
+    from phanas_pydantic_helpers.common.time_arrays import parse_times_array
+
+    # A column of times with many repeats, like a schedule export
+    values = [
+        f"{h % 12 + 1}:{m:02} {'am' if h < 12 else 'pm'}"
+        for h in range(24)
+        for m in (0, 15, 30, 45)
+    ]
+    column = (values * 105)[:10_000]
+
+    def baseline():
+        minutes = []
+        for value in column:
+            try:
+                time = parse_time(value)
+            except ValueError:
+                minutes.append(None)
+            else:
+                minutes.append(time.hour * 60 + time.minute)
+
+    return lambda: parse_times_array(column), baseline
+
+
+# endregion
+
+# region Factories
+
+
+def _section_model(name: str) -> type:
+    return create_model(
+        name,
+        **{f"option_{i}": (int, i) for i in range(10)},
+        tags=(List[str], ["a", "b"]),
+    )
+
+
+@case("lazy_factory")
+def _lazy_factory():
+    # Building a config whose sections are all left at their defaults
+    from phanas_pydantic_helpers import Factory, LazyFactory
+
+    sections = [_section_model(f"Section{i}") for i in range(5)]
+    Model = create_model(
+        "Model",
+        token=(str, ...),
+        **{f"section_{i}": (s, LazyFactory(s)) for i, s in enumerate(sections)},
+    )
+    BaselineModel = create_model(
+        "BaselineModel",
+        token=(str, ...),
+        **{f"section_{i}": (s, Factory(s)) for i, s in enumerate(sections)},
+    )
+    return lambda: Model(token="x"), lambda: BaselineModel(token="x")
+
+
+@case("prototype_list_factory")
+def _prototype_list_factory():
+    # Default lists of an item with validators, compared with validating the
+    # item every time like instance_list_factory does
+    from phanas_pydantic_helpers import (
+        Factory,
+        instance_list_factory,
+        only_one_of,
+        prototype_list_factory,
+    )
+
+    Number, _, _ = _field_converter_models()
+
+    class Item(BaseModel):
+        a: Number = 0
+        b: Number = 0
+        c: Number = 0
+        name: str = "item"
+
+        _check = only_one_of(["a", "b"], "c")
+
+    Model = create_model(
+        "Model", items=(List[Item], Factory(prototype_list_factory(Item, c="3")))
+    )
+    BaselineModel = create_model(
+        "BaselineModel",
+        items=(List[Item], Factory(instance_list_factory(Item, c="3"))),
+    )
+    return lambda: Model(), lambda: BaselineModel()
+
+
+# endregion
+
+# region Validators
+
+
+@case("only_one_of")
+def _only_one_of():
+    from phanas_pydantic_helpers import only_one_of
+
+    class Model(BaseModel):
+        a: int = 0
+        b: int = 0
+        c: int = 0
+        d: int = 0
+
+        _check = only_one_of(["a", "b"], ["c", "d"])
+
+    class BaselineModel(BaseModel):
+        a: int = 0
+        b: int = 0
+        c: int = 0
+        d: int = 0
+
+        @root_validator(pre=True, allow_reuse=True)
+        def check(cls, values):
+            first = "a" in values and "b" in values
+            second = "c" in values and "d" in values
+            if first == second:
+                raise ValueError("One and only one group must exist")
+            return values
+
+    next_value = _cycle([{"a": 1, "b": 2}, {"c": 3, "d": 4}])
+    return (
+        lambda: Model(**next_value()),
+        lambda: BaselineModel(**next_value()),
+    )
+
+
+@case("only_one_of.check_many", number=10)
+def _only_one_of_check_many():
+    from phanas_pydantic_helpers import OnlyOneOf
+
+    check = OnlyOneOf(["a", "b"], ["c", "d"])
+    batch = [{"a": i, "b": i} if i % 2 else {"c": i, "d": i} for i in range(1000)]
+
+    def baseline():
+        errors = {}
+        for idx, values in enumerate(batch):
+            first = "a" in values and "b" in values
+            second = "c" in values and "d" in values
+            if first == second:
+                errors[idx] = ValueError("One and only one group must exist")
+        return errors
+
+    return lambda: check.check_many(batch), baseline
+
+
+@case("maybe_relative_path")
+def _maybe_relative_path():
+    from phanas_pydantic_helpers import maybe_relative_path
+
+    root = Path("/srv/app")
+
+    class Model(BaseModel):
+        path: Path
+
+        _path = maybe_relative_path("path", root)
+
+    class BaselineModel(BaseModel):
+        path: Path
+
+    next_value = _cycle(["config.toml", "/etc/app/config.toml", "data/input.csv"])
+    return (
+        lambda: Model(path=next_value()),
+        lambda: BaselineModel(path=next_value()),
+    )
+
+
+@case("maybe_relative_path.must_exist")
+def _maybe_relative_path_must_exist():
+    from phanas_pydantic_helpers import maybe_relative_path
+
+    root = Path(tempfile.mkdtemp())
+    atexit.register(shutil.rmtree, root, ignore_errors=True)
+    names = [f"file_{i}.txt" for i in range(100)]
+    for name in names:
+        (root / name).touch()
+
+    class Model(BaseModel):
+        path: Path
+
+        _path = maybe_relative_path("path", root, must_exist=True)
+
+    class BaselineModel(BaseModel):
+        path: Path
+
+        @validator("path", allow_reuse=True)
+        def check_exists(cls, path: Path):
+            path = root / path
+            if not path.exists():
+                raise ValueError(f"Path {str(path)!r} does not exist")
+            return path
+
+    next_value = _cycle(names)
+    return (
+        lambda: Model(path=next_value()),
+        lambda: BaselineModel(path=next_value()),
+    )
+
+
+# endregion
+
+# region Forward refs
+
+
+@case("update_forward_refs", number=10)
+def _update_forward_refs():
+    from phanas_pydantic_helpers import update_forward_refs_recursive
+
+    # A schema module with 200 models, half of which use forward refs, nested
+    # in a root model
+    module = ModuleType("benchmark_schema")
+    sys.modules[module.__name__] = module
+    module.Leaf = create_model("Leaf", __module__=module.__name__, x=(int, ...))
+    names = []
+    for i in range(200):
+        name = f"Model{i}"
+        model = create_model(
+            name,
+            __module__=module.__name__,
+            leaf=("Leaf" if i % 2 else module.Leaf, ...),
+        )
+        setattr(module, name, model)
+        names.append(name)
+    Root = create_model(
+        "Root",
+        __module__=module.__name__,
+        **{f"field_{name}": (name, ...) for name in names},
+    )
+    for name in names:
+        setattr(Root, name, getattr(module, name))
+
+    def baseline():
+        # Update every model without checking which need it
+        for name in names:
+            getattr(module, name).update_forward_refs()
+        Root.update_forward_refs()
+
+    return lambda: update_forward_refs_recursive(Root), baseline
+
+
+# endregion
+
+# region JSON lines
+
+
+@case("load_jsonl", number=10)
+def _load_jsonl():
+    import io
+
+    from phanas_pydantic_helpers import load_jsonl
+
+    _, Model, BaselineModel = _field_converter_models()
+    data = b"".join(
+        b'{"value": "%d"}\n' % (idx % 100) if idx % 2 else b'{"value": %d}\n' % idx
+        for idx in range(2_000)
+    )
+
+    def stmt():
+        for _ in load_jsonl(Model, io.BytesIO(data)):
+            pass
+
+    def baseline():
+        for line in io.BytesIO(data):
+            BaselineModel.parse_raw(line)
+
+    return stmt, baseline
+
+
+# endregion
+
+# region Parallel validation
+
+
+class _ParallelItem(BaseModel):
+    name: str
+    tags: List[str]
+    scores: Dict[str, float]
+
+
+class _ParallelModel(BaseModel):
+    # Models sent to worker processes have to be importable
+    id: int
+    items: List[_ParallelItem]
+
+
+@case("validate_parallel", number=3)
+def _validate_parallel():
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    from phanas_pydantic_helpers import validate_parallel
+
+    workers = min(4, os.cpu_count() or 1)
+    if workers < 2:
+        raise SkipCase("there is only one CPU")
+
+    records = [
+        {
+            "id": str(idx),
+            "items": [
+                {
+                    "name": f"item {j}",
+                    "tags": ["a", "b", "c"],
+                    "scores": {"x": str(j), "y": j / 2},
+                }
+                for j in range(10)
+            ],
+        }
+        for idx in range(2_000)
+    ]
+    # Starting the pool is a one-off cost, so reuse it between runs
+    executor = ProcessPoolExecutor(max_workers=workers)
+    atexit.register(executor.shutdown)
+    validate_parallel(_ParallelModel, records[:workers], chunksize=1, executor=executor)
+
+    def stmt():
+        validate_parallel(_ParallelModel, records, workers, executor=executor)
+
+    def baseline():
+        for record in records:
+            _ParallelModel.parse_obj(record)
+
+    return stmt, baseline
+
+
+# endregion
+
+# region Reloading
+
+
+@case("model_reloader")
+def _model_reloader():
+    from phanas_pydantic_helpers import ModelReloader
+
+    fields = {f"value_{idx}": (int, idx) for idx in range(10)}
+    Section = create_model("Section", **fields)
+    Config = create_model(
+        "Config", **{f"section_{idx}": (Section, ...) for idx in range(200)}
+    )
+
+    raw = {
+        f"section_{idx}": {f"value_{j}": str(j) for j in range(10)}
+        for idx in range(200)
+    }
+    # Change one value in one section, back and forth
+    raws = [raw, {**raw, "section_100": {**raw["section_100"], "value_5": "-1"}}]
+    reloader = ModelReloader(Config, raw)
+    next_raw = _cycle(raws[::-1])
+
+    return lambda: reloader.reload(next_raw()), lambda: Config.parse_obj(next_raw())
+
+
+# endregion
+
+# region Templates
+
+
+def _wide_model(width: int = 200) -> type:
+    return create_model(
+        "Wide",
+        **{f"field_{i}": ((int, str, List[int])[i % 3], ...) for i in range(width)},
+    )
+
+
+def _deep_model(depth: int = 50) -> type:
+    model = create_model("Leaf", value=(int, ...), values=(List[str], ...))
+    for i in range(depth):
+        model = create_model(f"Level{i}", child=(model, ...), name=(str, ...))
+    return model
+
+
+def _template_case(model: type, *, cold: bool):
+    from phanas_pydantic_helpers import (
+        clear_template_plan_cache,
+        create_template_from_model,
+    )
+
+    if cold:
+
+        def stmt():
+            clear_template_plan_cache()
+            create_template_from_model(model)
+
+    else:
+
+        def stmt():
+            create_template_from_model(model)
+
+    # The closest thing Pydantic does on its own is generating the schema
+    def baseline():
+        model.__schema_cache__.clear()
+        model.schema()
+
+    return stmt, baseline
+
+
+@case("template.wide")
+def _template_wide():
+    return _template_case(_wide_model(), cold=False)
+
+
+@case("template.wide.cold")
+def _template_wide_cold():
+    return _template_case(_wide_model(), cold=True)
+
+
+@case("template.deep")
+def _template_deep():
+    return _template_case(_deep_model(), cold=False)
+
+
+@case("template.deep.cold")
+def _template_deep_cold():
+    return _template_case(_deep_model(), cold=True)
+
+
+# endregion
+
+
+def _time(stmt: T_Statement, number: int, repeat: int) -> float:
+    # Take the fastest run; the slower ones mostly measure other noise
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def run(
+    patterns: Optional[List[str]] = None,
+    *,
+    number: int = 1000,
+    repeat: int = 5,
+    progress: Optional[Callable[[str], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run the benchmark cases.
+
+    :param patterns: glob patterns of the case names to run (e.g.
+        "template.*"), or None to run every case
+    :param number: how many times to call each statement per timing
+    :param repeat: how many timings to take; the fastest is reported
+    :param progress: called with each case's name before it runs
+    :return: a result dict for each case, in registration order
+    """
+    results = []
+    for name, case_ in CASES.items():
+        if patterns and not any(fnmatch.fnmatchcase(name, p) for p in patterns):
+            continue
+        if progress is not None:
+            progress(name)
+
+        result: Dict[str, Any] = {"name": name}
+        try:
+            stmt, baseline = case_.setup()
+        except SkipCase as e:
+            result["skipped"] = str(e)
+            results.append(result)
+            continue
+
+        case_number = case_.number if case_.number is not None else number
+        seconds = _time(stmt, case_number, repeat)
+        baseline_seconds = _time(baseline, case_number, repeat)
+        result.update(
+            seconds=seconds,
+            baseline_seconds=baseline_seconds,
+            ratio=seconds / baseline_seconds,
+        )
+        results.append(result)
+
+    return results
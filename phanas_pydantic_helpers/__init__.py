@@ -1,3 +1,40 @@
-from .fields import *
+from importlib import import_module as _import_module
+
+from . import helpers as _helpers
 from .helpers import *
 from .version import *
+
+# These need optional dependencies (like pendulum) which are slow to import,
+# so they're only imported when they're first used. Maps names to the module
+# they're imported from.
+_lazy_imports = {
+    "DateTimeField": ".fields",
+    "TimeField": ".fields",
+    "DurationField": ".fields",
+    "TIME_JSON_ENCODERS": ".fields",
+    "dump_many": ".fields",
+    "parse_time": ".common.time",
+    "parse_duration": ".common.time",
+    "parse_datetime": ".common.time",
+}
+
+__all__ = [
+    *(name for name in dir(_helpers) if not name.startswith("_")),
+    "__version__",
+    *_lazy_imports,
+]
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _lazy_imports[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(_import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_lazy_imports})
@@ -1 +1,11 @@
-from . import imports, time, typing
+from importlib import import_module as _import_module
+
+from . import imports, typing
+
+
+def __getattr__(name: str):
+    # `time` needs pendulum, which is slow to import, so only import it when
+    # it's first used
+    if name == "time":
+        return _import_module(".time", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-__all__ = ["raise_if_missing_deps", "DummyModule"]
+__all__ = ["raise_if_missing_deps", "DummyModule", "PYDANTIC_V1"]
 
 from typing import Any
 
+from pydantic import VERSION as PYDANTIC_VERSION
 from typing_extensions import Self
 
+# Most helpers use Pydantic v1's model internals, but field converters (and
+# the time fields) work on both major versions
+PYDANTIC_V1 = PYDANTIC_VERSION.startswith("1.")
+
 
 def raise_if_missing_deps(*modules: Any) -> None:
     missing_dep_names = []
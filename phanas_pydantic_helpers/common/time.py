@@ -1,10 +1,13 @@
 __all__ = [
     "parse_time",
     "parse_duration",
+    "parse_datetime",
 ]
 
+from datetime import datetime
+from functools import lru_cache
 import re
-from typing import Type, TypeVar
+from typing import Dict, List, Optional, Tuple, Type, TypeVar, Union
 
 from phanas_pydantic_helpers.common.imports import DummyModule, raise_if_missing_deps
 
@@ -13,11 +16,6 @@ try:
 except ImportError:
     pen = DummyModule("pendulum")
 
-try:
-    import pytimeparse
-except ImportError:
-    pytimeparse = DummyModule("pytimeparse")
-
 time_pattern = re.compile(
     r"^"
     r"(?P<hour>[0-2]?\d)"
@@ -31,26 +29,87 @@ time_pattern = re.compile(
 
 V = TypeVar("V")
 
+# The number of recently parsed strings to remember
+PARSE_CACHE_SIZE = 1024
+
+MINUTES_PER_DAY = 24 * 60
 
-def parse_time(time_str: str, class_: Type[V] = pen.Time) -> V:
+# Interned times by class, indexed by minute of the day
+_interned_times: Dict[type, List[Optional[object]]] = {}
+
+
+def _fast_match_time(time_str: str) -> Optional[Tuple[int, int, str]]:
     """
-    Parse a string as a time specifier of the general format "12:34 PM".
+    Match the common shapes of `time_pattern` ("9", "930", "9:30", "17:30",
+    "9am", "9:30 PM", ...) without a regex.
 
-    :return: the parsed time
+    :return: the hour, minute, and period ("a", "p", or "") if the string is
+        one of the common shapes, otherwise None. None doesn't mean the string
+        is invalid; it should be matched with `time_pattern` instead.
     """
-    raise_if_missing_deps(pen)
+    end = len(time_str)
+    period = ""
+    last = time_str[-1:].lower()
+    if last == "m":
+        period = time_str[-2:-1].lower()
+        if period != "a" and period != "p":
+            return None
+        end -= 2
+    elif last == "a" or last == "p":
+        period = last
+        end -= 1
+
+    while end and (time_str[end - 1] == " " or time_str[end - 1] == "\t"):
+        end -= 1
+
+    colon = time_str.find(":", 0, end)
+    if colon == -1:
+        hour_str = time_str[:end]
+        if len(hour_str) > 2:
+            # The last two digits are the minute
+            hour_str, minute_str = hour_str[:-2], hour_str[-2:]
+        else:
+            minute_str = "00"
+    else:
+        hour_str = time_str[:colon]
+        minute_str = time_str[colon + 1 : end]
+
+    if (
+        not 1 <= len(hour_str) <= 2
+        or len(minute_str) != 2
+        # A 2 digit hour must start with 0-2 (from "[0-2]?\d")
+        or (len(hour_str) == 2 and hour_str[0] not in "012")
+        or not (hour_str + minute_str).isdigit()
+        or not hour_str.isascii()
+        or not minute_str.isascii()
+    ):
+        return None
 
-    match = time_pattern.match(time_str)
-    if not match:
-        raise ValueError("No match")
+    return int(hour_str), int(minute_str), period
 
-    hour = int(match["hour"])
-    minute = int(match["minute"] or 0)
 
-    if (0 > hour > 23) or (0 > minute > 59):
+def _parse_time_parts(time_str: str) -> Tuple[int, int]:
+    """
+    Parse a string as a time specifier of the general format "12:34 PM".
+
+    :return: the hour and minute in 24 hour time
+    """
+    fast_match = _fast_match_time(time_str)
+    if fast_match:
+        hour, minute, period = fast_match
+    else:
+        match = time_pattern.match(time_str)
+        if not match:
+            raise ValueError("No match")
+
+        hour = int(match["hour"])
+        minute = int(match["minute"] or 0)
+        period = "p" if match["period_pm"] else "a" if match["period_am"] else ""
+
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
         raise ValueError("Hour or minute is out of range")
 
-    if match["period_pm"]:
+    if period == "p":
         if hour < 12:
             # This is PM and we use 24 hour times in datetime, so add 12 hours
             hour += 12
@@ -59,7 +118,7 @@ def parse_time(time_str: str, class_: Type[V] = pen.Time) -> V:
             pass
         else:
             raise ValueError("24 hour times do not use AM or PM")
-    elif match["period_am"]:
+    elif period == "a":
         if hour < 12:
             # AM, so no change
             pass
@@ -69,13 +128,419 @@ def parse_time(time_str: str, class_: Type[V] = pen.Time) -> V:
         else:
             raise ValueError("24 hour times do not use AM or PM")
 
+    return hour, minute
+
+
+def _parse_iso_time(
+    time_str: str,
+) -> Optional[Tuple[int, int, int, int, Optional[int]]]:
+    """
+    Parse an ISO 8601 time with seconds, like "12:34:56", "12:34:56.789", or
+    "12:34:56+02:00", as written by `time.isoformat`.
+
+    :return: the hour, minute, second, microsecond, and UTC offset in seconds
+        (None if there isn't one), or None if the string isn't an ISO 8601
+        time with seconds
+    :raises ValueError: if a part is out of range
+    """
+    if len(time_str) < 8 or time_str[2] != ":" or time_str[5] != ":":
+        return None
+    digits = time_str[:2] + time_str[3:5] + time_str[6:8]
+    if not (digits.isdigit() and digits.isascii()):
+        return None
+    hour, minute, second = int(digits[:2]), int(digits[2:4]), int(digits[4:])
+
+    pos = 8
+    microsecond = 0
+    if time_str[pos : pos + 1] == ".":
+        end = pos + 1
+        while end < len(time_str) and time_str[end] in _DIGITS:
+            end += 1
+        fraction = time_str[pos + 1 : end]
+        if not 1 <= len(fraction) <= 6:
+            return None
+        microsecond = int(fraction.ljust(6, "0"))
+        pos = end
+
+    offset_str = time_str[pos:]
+    offset: Optional[int] = None
+    if offset_str == "Z" or offset_str == "z":
+        offset = 0
+    elif offset_str:
+        # +HH:MM or +HH:MM:SS
+        if len(offset_str) not in (6, 9) or offset_str[0] not in "+-":
+            return None
+        parts = offset_str[1:].split(":")
+        if not all(len(part) == 2 and _is_digits(part) for part in parts):
+            return None
+        offset = int(parts[0]) * 3600 + int(parts[1]) * 60
+        if len(parts) == 3:
+            offset += int(parts[2])
+        if offset_str[0] == "-":
+            offset = -offset
+
+    if not (hour <= 23 and minute <= 59 and second <= 59):
+        raise ValueError("Hour, minute, or second is out of range")
+    if offset is not None and not -86400 < offset < 86400:
+        raise ValueError("UTC offset is out of range")
+    return hour, minute, second, microsecond, offset
+
+
+def _intern_time(hour: int, minute: int, class_: Type[V]) -> V:
+    try:
+        table = _interned_times[class_]
+    except KeyError:
+        table = _interned_times.setdefault(class_, [None] * MINUTES_PER_DAY)
+
+    idx = hour * 60 + minute
+    time = table[idx]
+    if time is None:
+        time = table[idx] = class_(hour, minute)
+    return time
+
+
+def _make_time(time_str: str, class_: Type[V], intern: bool) -> V:
+    iso = _parse_iso_time(time_str)
+    if iso is None:
+        hour, minute = _parse_time_parts(time_str)
+    else:
+        hour, minute, second, microsecond, offset = iso
+        if second or microsecond or offset is not None:
+            # Only times with just an hour and minute are interned
+            tz = None
+            if offset is not None:
+                tz = pen.UTC if offset == 0 else _fixed_timezone(offset)
+            return class_(hour, minute, second, microsecond, tz)
+    if intern:
+        return _intern_time(hour, minute, class_)
     return class_(hour, minute)
 
 
-def parse_duration(duration_str: str, class_: Type[V] = pen.Duration) -> V:
-    raise_if_missing_deps(pen, pytimeparse)
+_make_time_cached = lru_cache(maxsize=PARSE_CACHE_SIZE)(_make_time)
+
+
+def parse_time(
+    time_str: str,
+    class_: Type[V] = pen.Time,
+    *,
+    cache: bool = True,
+    intern: bool = False,
+) -> V:
+    """
+    Parse a string as a time specifier of the general format "12:34 PM", or
+    an ISO 8601 time with seconds (and optionally microseconds and a UTC
+    offset) like "12:34:56.789+02:00".
+
+    :param time_str: the string to parse
+    :param class_: the time class to return an instance of
+    :param cache: whether to remember the results for recently parsed
+        strings. The same instance is returned for strings that are equal
+        ignoring case, so `class_` should be immutable.
+    :param intern: whether to return the same instance of `class_` for every
+        string with the same hour and minute. This saves memory when many
+        times are kept around, and lets them be compared by identity.
+    :return: the parsed time
+    """
+    raise_if_missing_deps(pen)
+
+    if cache:
+        return _make_time_cached(time_str.lower(), class_, intern)
+    return _make_time(time_str, class_, intern)
+
+
+# Duration unit names, mapped to the unit's index in _DURATION_UNIT_SECONDS
+_DURATION_UNITS = {
+    **dict.fromkeys(("w", "wk", "wks", "week", "weeks"), 0),
+    **dict.fromkeys(("d", "dy", "dys", "day", "days"), 1),
+    **dict.fromkeys(("h", "hr", "hrs", "hour", "hours"), 2),
+    **dict.fromkeys(("m", "min", "mins", "minute", "minutes"), 3),
+    **dict.fromkeys(("s", "sec", "secs", "second", "seconds"), 4),
+}
+_DURATION_UNIT_SECONDS = (7 * 24 * 60 * 60, 24 * 60 * 60, 60 * 60, 60, 1)
+_SECONDS_UNIT = 4
+_DIGITS = frozenset("0123456789")
+# One "<number> <unit>" part of a duration, with an optional separator
+_duration_token = re.compile(r"([0-9.]+)[ \t]*([A-Za-z]+)[ \t]*(?:([,/])[ \t]*)?")
+
+
+def _is_digits(s: str, min_len: int = 1, max_len: Optional[int] = None) -> bool:
+    if not min_len <= len(s) <= (max_len or len(s)):
+        return False
+    return all(c in _DIGITS for c in s)
+
+
+def _is_clock_seconds(s: str) -> bool:
+    # \d{2}(?:\.\d+)?
+    return _is_digits(s[:2], 2, 2) and (
+        len(s) == 2 or (s[2] == "." and _is_digits(s[3:]))
+    )
+
+
+def _sum_duration(values: List[Optional[str]]) -> Union[int, float]:
+    total = 0
+    for idx, value in enumerate(values):
+        if value is not None:
+            if not value.isdigit():
+                break
+            total += _DURATION_UNIT_SECONDS[idx] * int(value)
+    else:
+        return total
+
+    # Sum the values the same way pytimeparse does, so the result is an int
+    # unless the seconds are fractional
+    present = [(idx, value) for idx, value in enumerate(values) if value is not None]
+    seconds = values[_SECONDS_UNIT]
+    if seconds is None or seconds.isdigit():
+        others = sum(
+            _DURATION_UNIT_SECONDS[idx] * float(value)
+            for idx, value in present
+            if idx != _SECONDS_UNIT
+        )
+        return int(others) + (int(seconds) if seconds else 0)
+
+    return sum(_DURATION_UNIT_SECONDS[idx] * float(value) for idx, value in present)
+
+
+def _parse_duration_native(duration_str: str) -> Optional[Union[int, float]]:
+    """
+    Parse the common duration formats ("1h30m", "90s", "2 days", "1.5 hours",
+    "1:30:00", "1:30", ...) in a single pass, without trying each format in
+    turn like pytimeparse.
+
+    :return: the number of seconds, or None if the string isn't in one of the
+        common formats. None doesn't mean the string is invalid; it may still
+        be parsed by pytimeparse.
+    """
+    s = duration_str.strip(" \t")
+    sign = 1
+    if s[:1] == "-" or s[:1] == "+":
+        sign = -1 if s[0] == "-" else 1
+        s = s[1:].lstrip(" \t")
+    if not s:
+        return None
+
+    # Weeks, days, hours, minutes, seconds
+    values: List[Optional[str]] = [None] * 5
+
+    if ":" in s:
+        # Clock format, like [[[days:]hours:]minutes]:seconds
+        parts = s.split(":")
+        if not _is_clock_seconds(parts[-1]):
+            return None
+        values[_SECONDS_UNIT] = parts[-1]
+
+        if len(parts) == 2:
+            if parts[0]:
+                if not _is_digits(parts[0], 1, 2):
+                    return None
+                values[3] = parts[0]
+        elif len(parts) == 3:
+            if not (_is_digits(parts[0]) and _is_digits(parts[1], 2, 2)):
+                return None
+            values[2:4] = parts[:2]
+        elif len(parts) == 4:
+            if not (
+                _is_digits(parts[0])
+                and _is_digits(parts[1], 2, 2)
+                and _is_digits(parts[2], 2, 2)
+            ):
+                return None
+            values[1:4] = parts[:3]
+        else:
+            return None
+
+        return sign * _sum_duration(values)
+
+    # Units format, like "1w 2d 3h 4m 5s", where each unit is optional but
+    # they must be in order
+    pos = 0
+    end = len(s)
+    last_unit = -1
+    while pos < end:
+        match = _duration_token.match(s, pos)
+        if not match:
+            return None
+        number, unit_name, separator = match.groups()
+        unit = _DURATION_UNITS.get(unit_name.lower())
+        if (
+            unit is None
+            or unit <= last_unit
+            or (separator and unit == _SECONDS_UNIT)
+            or number.count(".") > 1
+            or number == "."
+        ):
+            return None
+        values[unit] = number
+        last_unit = unit
+        pos = match.end()
+
+    return sign * _sum_duration(values)
+
+
+def _parse_duration_seconds(duration_str: str) -> Union[int, float]:
+    seconds = _parse_duration_native(duration_str)
+    if seconds is None:
+        # Fall back to pytimeparse for less common formats, if it's installed
+        try:
+            import pytimeparse
+        except ImportError:
+            pass
+        else:
+            seconds = pytimeparse.parse(duration_str)
 
-    seconds = pytimeparse.parse(duration_str)
     if seconds is None:
         raise ValueError("Invalid time duration")
-    return class_(seconds=seconds)
+    return seconds
+
+
+def _make_duration(duration_str: str, class_: Type[V]) -> V:
+    return class_(seconds=_parse_duration_seconds(duration_str))
+
+
+_make_duration_cached = lru_cache(maxsize=PARSE_CACHE_SIZE)(_make_duration)
+
+
+def parse_duration(
+    duration_str: str, class_: Type[V] = pen.Duration, *, cache: bool = True
+) -> V:
+    """
+    Parse a string as a duration, like "1h30m", "90s", "2 days", or "1:30:00".
+    Formats which aren't handled natively are parsed with pytimeparse, if
+    it's installed.
+
+    :param duration_str: the string to parse
+    :param class_: the duration class to return an instance of
+    :param cache: whether to remember the results for recently parsed
+        strings. The same instance is returned for strings that are equal
+        ignoring case, so `class_` should be immutable.
+    :return: the parsed duration
+    """
+    raise_if_missing_deps(pen)
+
+    if cache:
+        return _make_duration_cached(duration_str.lower(), class_)
+    return _make_duration(duration_str, class_)
+
+
+# Fixed timezones by UTC offset in seconds
+_fixed_timezones: Dict[int, object] = {}
+
+
+def _fixed_timezone(offset: int):
+    try:
+        return _fixed_timezones[offset]
+    except KeyError:
+        pass
+    tz = _fixed_timezones[offset] = pen.timezone(offset)
+    return tz
+
+
+def _parse_rfc3339(datetime_str: str, class_: Type[V]) -> Optional[V]:
+    """
+    Parse a strict RFC 3339 datetime, like "2024-05-01T12:00:00Z" or
+    "2024-05-01 12:00:00.123+02:00", by slicing it. The offset may be left
+    out, in which case it's UTC like with `pendulum.parse`.
+
+    :return: the parsed datetime, or None if the string isn't strict RFC 3339
+    """
+    s = datetime_str
+    length = len(s)
+    if (
+        length < 19
+        or not s.isascii()
+        or s[4] != "-"
+        or s[7] != "-"
+        or (s[10] != "T" and s[10] != " ")
+        or s[13] != ":"
+        or s[16] != ":"
+    ):
+        return None
+
+    microsecond = 0
+    pos = 19
+    if length > pos and s[pos] == ".":
+        pos += 1
+        while pos < length and "0" <= s[pos] <= "9":
+            pos += 1
+        fraction = s[20:pos]
+        if not 1 <= len(fraction) <= 9:
+            return None
+        # Extra precision is truncated, like `pendulum.parse` does
+        microsecond = int(fraction[:6].ljust(6, "0"))
+
+    offset = s[pos:]
+    offset_seconds = None
+    if (
+        len(offset) == 6
+        and (offset[0] == "+" or offset[0] == "-")
+        and offset[3] == ":"
+        and offset[1:3].isdigit()
+        and offset[4:].isdigit()
+    ):
+        offset_seconds = int(offset[1:3]) * 3600 + int(offset[4:]) * 60
+        if offset[0] == "-":
+            offset_seconds = -offset_seconds
+        if not -86400 < offset_seconds < 86400:
+            # pendulum would only complain when the offset is first used
+            return None
+    elif offset and offset != "Z":
+        return None
+
+    try:
+        tz = pen.UTC if offset_seconds is None else _fixed_timezone(offset_seconds)
+        # With the separators checked above, this only accepts
+        # "YYYY-MM-DDTHH:MM:SS" on every Python version
+        dt = datetime.fromisoformat(s[:19])
+        return class_(
+            dt.year,
+            dt.month,
+            dt.day,
+            dt.hour,
+            dt.minute,
+            dt.second,
+            microsecond,
+            tzinfo=tz,
+        )
+    except ValueError:
+        # Not digits, or out of range. Let pendulum decide what to do with it.
+        return None
+
+
+def parse_datetime(
+    datetime_str: str, class_: Type[V] = pen.DateTime, *, iso_only: bool = False
+) -> V:
+    """
+    Parse a string as a datetime. Strict RFC 3339 datetimes, like
+    "2024-05-01T12:00:00Z", are parsed quickly; anything else is parsed with
+    `pendulum.parse`.
+
+    :param datetime_str: the string to parse
+    :param class_: the datetime class to return an instance of
+    :param iso_only: whether to reject anything that isn't strict RFC 3339
+        instead of parsing it with `pendulum.parse`
+    :return: the parsed datetime
+    """
+    raise_if_missing_deps(pen)
+
+    parsed = _parse_rfc3339(datetime_str, class_)
+    if parsed is not None:
+        return parsed
+    if iso_only:
+        raise ValueError("Invalid RFC 3339 datetime")
+
+    parsed = pen.parse(datetime_str)
+    if not isinstance(parsed, pen.DateTime):
+        raise ValueError("Invalid datetime format")
+    if type(parsed) is class_:
+        return parsed
+    return class_(
+        parsed.year,
+        parsed.month,
+        parsed.day,
+        parsed.hour,
+        parsed.minute,
+        parsed.second,
+        parsed.microsecond,
+        tzinfo=parsed.tzinfo,
+        fold=parsed.fold,
+    )
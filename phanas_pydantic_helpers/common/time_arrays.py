@@ -0,0 +1,139 @@
+"""
+Parse whole arrays of time and duration strings at once with NumPy.
+
+Each distinct string is parsed once with the same parser as `parse_time` and
+`parse_duration`, and the results are spread back out over the array, so
+columns with many repeated values cost little more than their distinct
+values.
+"""
+
+__all__ = ["parse_times_array", "parse_durations_array"]
+
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from phanas_pydantic_helpers.common.imports import DummyModule, raise_if_missing_deps
+from phanas_pydantic_helpers.common.time import (
+    _parse_duration_seconds,
+    _parse_iso_time,
+    _parse_time_parts,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = DummyModule("numpy")
+
+T_Parser = Callable[[str], Optional[Union[int, float]]]
+
+
+def _as_str(value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        try:
+            return value.decode()
+        except UnicodeDecodeError:
+            return None
+    return None
+
+
+def _parse_array(
+    values: Any, parse: T_Parser, dtype: Any
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    raise_if_missing_deps(np)
+
+    array = np.asarray(values)
+    flat = array.ravel()
+
+    uniques: List[Any]
+    if flat.dtype.kind in "US":
+        # Strings can be deduplicated in C
+        unique_array, inverse = np.unique(flat, return_inverse=True)
+        uniques = unique_array.tolist()
+    else:
+        # Objects might not be comparable with each other, so deduplicate
+        # them by hashing (and treat anything that isn't a string as invalid)
+        index = {}
+        inverse_list = []
+        for value in flat.tolist():
+            key = _as_str(value)
+            try:
+                inverse_list.append(index[key])
+            except KeyError:
+                inverse_list.append(index.setdefault(key, len(index)))
+        uniques = list(index)
+        inverse = np.asarray(inverse_list, dtype=np.intp)
+
+    dtype = np.dtype(dtype)
+    fractions_allowed = dtype.kind in "fc"
+    parsed = np.zeros(len(uniques), dtype=dtype)
+    valid = np.zeros(len(uniques), dtype=bool)
+    for idx, value in enumerate(uniques):
+        value = _as_str(value)
+        if value is None:
+            continue
+        try:
+            result = parse(value)
+        except ValueError:
+            continue
+        if not fractions_allowed and result != int(result):
+            continue
+        try:
+            parsed[idx] = result
+        except (OverflowError, ValueError):
+            # Doesn't fit in the dtype
+            continue
+        valid[idx] = True
+
+    return parsed[inverse].reshape(array.shape), valid[inverse].reshape(array.shape)
+
+
+def _minutes_since_midnight(time_str: str) -> int:
+    iso = _parse_iso_time(time_str)
+    if iso is None:
+        hour, minute = _parse_time_parts(time_str)
+    else:
+        hour, minute, second, microsecond, offset = iso
+        if second or microsecond or offset is not None:
+            raise ValueError("Not a whole minute")
+    return hour * 60 + minute
+
+
+def parse_times_array(
+    times: Any, dtype: Any = None
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Parse an array of time specifiers of the general format "12:34 PM",
+    following the same rules as `parse_time`.
+
+    :param times: a sequence or NumPy array of strings. Elements which aren't
+        strings are invalid.
+    :param dtype: the integer dtype of the result, int64 by default
+    :return: the minutes since midnight of each time (0 where the time is
+        invalid), and a bool mask of which times are valid. Both have the
+        same shape as `times`. Times with seconds or a UTC offset are
+        invalid, since they can't be given in minutes since midnight.
+    """
+    return _parse_array(
+        times, _minutes_since_midnight, np.int64 if dtype is None else dtype
+    )
+
+
+def parse_durations_array(
+    durations: Any, dtype: Any = None
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Parse an array of durations, following the same rules as
+    `parse_duration`.
+
+    :param durations: a sequence or NumPy array of strings. Elements which
+        aren't strings are invalid.
+    :param dtype: the dtype of the result, int64 by default. Durations with
+        fractional seconds are only valid if this is a float dtype.
+    :return: the total seconds of each duration (0 where the duration is
+        invalid), and a bool mask of which durations are valid. Both have the
+        same shape as `durations`.
+    """
+    return _parse_array(
+        durations, _parse_duration_seconds, np.int64 if dtype is None else dtype
+    )
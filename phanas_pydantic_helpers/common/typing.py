@@ -1,6 +1,7 @@
 import sys
 from types import FunctionType, MethodType
-from typing import Callable, Dict, List, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+from weakref import WeakKeyDictionary
 
 from typing_extensions import get_type_hints
 
@@ -11,6 +12,8 @@ __all__ = [
     "get_function_annotations",
     "get_function_args_annotations",
     "get_function_return_type",
+    "get_model_annotations",
+    "invalidate_annotations",
 ]
 
 V = TypeVar("V")
@@ -26,20 +29,85 @@ def ensure_list(value_or_list: T_MaybeList[V]) -> List[V]:
 T_Functionish = Union[Callable, FunctionType, MethodType, classmethod, staticmethod]
 
 
-def get_function_annotations(f: T_Functionish):
+# Function or class -> its resolved annotations. Resolving annotations looks
+# names up in the whole module, so it's only done once per object.
+_annotations_cache: "WeakKeyDictionary[Any, Dict[str, Any]]" = WeakKeyDictionary()
+
+
+def _get_cached_annotations(obj: Any, resolve: Callable[[], Dict[str, Any]]):
+    try:
+        return dict(_annotations_cache[obj])
+    except KeyError:
+        pass
+    except TypeError:
+        # Can't be weakly referenced
+        return resolve()
+
+    annotations = _annotations_cache[obj] = resolve()
+    return dict(annotations)
+
+
+def invalidate_annotations(obj: Any = None) -> None:
+    """
+    Forget the cached annotations of a function or class, or of everything if
+    `obj` is None. Call this after a name its annotations refer to changes,
+    e.g. when updating forward refs.
+    """
+    if obj is None:
+        _annotations_cache.clear()
+        return
+
+    try:
+        # Unwrap classmethod/staticmethod
+        obj = obj.__func__
+    except AttributeError:
+        pass
+    try:
+        _annotations_cache.pop(obj, None)
+    except TypeError:
+        pass
+
+
+def get_function_annotations(f: T_Functionish) -> Dict[str, Any]:
+    """
+    :return: a copy of the function's resolved annotations
+    """
     try:
         # Unwrap classmethod/staticmethod
         f = f.__func__
     except AttributeError:
         pass
-    return get_type_hints(
+    return _get_cached_annotations(
         f,
-        globalns=vars(sys.modules[f.__module__]),
-        localns=vars(f),
-        include_extras=False,
+        lambda: get_type_hints(
+            f,
+            globalns=vars(sys.modules[f.__module__]),
+            localns=vars(f),
+            include_extras=False,
+        ),
     )
 
 
+def get_model_annotations(model: type) -> Dict[str, Any]:
+    """
+    :return: a copy of the class's resolved annotations, including inherited
+        ones. Names are looked up in the class's module and namespace, and
+        the class's own name is always defined, so self-referencing
+        annotations resolve even if the class isn't defined at module level.
+    """
+
+    def resolve():
+        localns = {model.__name__: model, **vars(model)}
+        return get_type_hints(
+            model,
+            globalns=vars(sys.modules[model.__module__]),
+            localns=localns,
+            include_extras=False,
+        )
+
+    return _get_cached_annotations(model, resolve)
+
+
 def get_function_args_annotations(f: T_Functionish) -> Dict[str, type]:
     annotations = get_function_annotations(f)
     try:
@@ -1,9 +1,30 @@
 from __future__ import annotations
 
-__all__ = ["DateTimeField", "TimeField", "DurationField"]
+__all__ = [
+    "DateTimeField",
+    "TimeField",
+    "DurationField",
+    "TIME_JSON_ENCODERS",
+    "dump_many",
+]
 
-from phanas_pydantic_helpers.common.imports import DummyModule, raise_if_missing_deps
-from phanas_pydantic_helpers.common.time import parse_duration, parse_time
+import json
+from datetime import datetime, timedelta, tzinfo
+from typing import Any, Callable, ClassVar, Dict, Iterable, Optional, Type, Union
+from weakref import WeakKeyDictionary
+
+from pydantic import BaseModel
+
+from phanas_pydantic_helpers.common.imports import (
+    PYDANTIC_V1,
+    DummyModule,
+    raise_if_missing_deps,
+)
+from phanas_pydantic_helpers.common.time import (
+    parse_datetime,
+    parse_duration,
+    parse_time,
+)
 from phanas_pydantic_helpers.helpers import FieldConverter
 
 try:
@@ -11,27 +32,306 @@ try:
 except ImportError:
     pen = DummyModule("pendulum")
 
+if PYDANTIC_V1:
+    from pydantic.json import pydantic_encoder
+else:
+    # Pydantic v2 deprecates pydantic_encoder in favor of this
+    from pydantic_core import to_jsonable_python as pydantic_encoder
+
+
+# Pickles refer to values by these compact forms instead of pickling their
+# pendulum state, which for datetimes includes the whole timezone database
+# entry of named timezones
+
+
+def _timezone_key(tz: Optional[tzinfo]) -> Union[None, str, int, tzinfo]:
+    from pendulum.tz.timezone import FixedTimezone, Timezone
+
+    if isinstance(tz, FixedTimezone) and tz.name != "UTC":
+        return tz.offset
+    if isinstance(tz, Timezone):
+        return tz.name
+    return tz
+
+
+def _restore_datetime(
+    cls: Type[DateTimeField],
+    year: int,
+    month: int,
+    day: int,
+    hour: int,
+    minute: int,
+    second: int,
+    microsecond: int,
+    tz: Union[None, str, int, tzinfo],
+    fold: int = 0,
+) -> DateTimeField:
+    if isinstance(tz, (str, int)):
+        # Timezones are cached, so this only loads each one once
+        tz = pen.timezone(tz)
+    return cls(year, month, day, hour, minute, second, microsecond, tz, fold=fold)
+
+
+def _restore_time(
+    cls: Type[TimeField],
+    hour: int,
+    minute: int,
+    second: int,
+    microsecond: int,
+    tz: Union[None, str, int, tzinfo],
+    fold: int = 0,
+) -> TimeField:
+    if isinstance(tz, (str, int)):
+        tz = pen.timezone(tz)
+    # pendulum's Time only takes fold as a keyword
+    return cls(hour, minute, second, microsecond, tz, fold=fold)
+
+
+def _restore_duration(
+    cls: Type[DurationField],
+    days: int,
+    seconds: int,
+    microseconds: int,
+    years: int = 0,
+    months: int = 0,
+) -> DurationField:
+    # The duration's days include its years and months
+    return cls(
+        days - years * 365 - months * 30,
+        seconds,
+        microseconds,
+        years=years,
+        months=months,
+    )
+
 
 class DateTimeField(pen.DateTime, FieldConverter):
+    # Whether to reject anything that isn't strict RFC 3339 instead of
+    # falling back to `pendulum.parse`. Override this in a subclass to turn it
+    # on.
+    iso_only: ClassVar[bool] = False
+
     @classmethod
     def _pyd_convert(cls, datetime_str: str):
         raise_if_missing_deps(pen)
+        return parse_datetime(datetime_str, class_=cls, iso_only=cls.iso_only)
 
-        parsed_dt = pen.parse(datetime_str)
-        if not isinstance(parsed_dt, pen.DateTime):
-            raise ValueError("Invalid datetime format")
-        return parsed_dt
+    def __reduce_ex__(self, protocol):
+        args = (
+            self.__class__,
+            self.year,
+            self.month,
+            self.day,
+            self.hour,
+            self.minute,
+            self.second,
+            self.microsecond,
+            _timezone_key(self.tzinfo),
+        )
+        if self.fold:
+            args += (self.fold,)
+        return _restore_datetime, args
 
 
 class TimeField(pen.Time, FieldConverter):
+    # Whether to remember the results for recently parsed strings. Override
+    # this in a subclass to turn the cache off.
+    cache_parsed: ClassVar[bool] = True
+    # Whether to share one instance between all values with the same hour and
+    # minute. Override this in a subclass to turn interning on.
+    intern_parsed: ClassVar[bool] = False
+
     @classmethod
     def _pyd_convert(cls, time_str: str):
         raise_if_missing_deps(pen)
-        return parse_time(time_str, class_=cls)
+        return parse_time(
+            time_str, class_=cls, cache=cls.cache_parsed, intern=cls.intern_parsed
+        )
+
+    def __reduce_ex__(self, protocol):
+        if self.tzinfo is None and not self.fold:
+            return self.__class__, (
+                self.hour,
+                self.minute,
+                self.second,
+                self.microsecond,
+            )
+        args = (
+            self.__class__,
+            self.hour,
+            self.minute,
+            self.second,
+            self.microsecond,
+            _timezone_key(self.tzinfo),
+        )
+        if self.fold:
+            args += (self.fold,)
+        return _restore_time, args
 
 
 class DurationField(pen.Duration, FieldConverter):
+    # Whether to remember the results for recently parsed strings. Override
+    # this in a subclass to turn the cache off.
+    cache_parsed: ClassVar[bool] = True
+
     @classmethod
     def _pyd_convert(cls, duration_str: str):
         raise_if_missing_deps(pen)
-        return parse_duration(duration_str, class_=cls)
+        return parse_duration(duration_str, class_=cls, cache=cls.cache_parsed)
+
+    def __reduce_ex__(self, protocol):
+        # pendulum's `seconds` and `microseconds` aren't timedelta's, so get
+        # the timedelta's own (days, seconds, microseconds)
+        cls, args = timedelta.__reduce__(self)
+        if self.years or self.months:
+            return _restore_duration, (cls, *args, self.years, self.months)
+        return cls, args
+
+
+# Every "HH:MM" a TimeField can hold, indexed by minute of the day
+_TIME_STRINGS = [f"{h:02}:{m:02}" for h in range(24) for m in range(60)]
+
+
+def _encode_time(value: TimeField) -> str:
+    if value.second or value.microsecond or value.tzinfo is not None:
+        # parse_time reads ISO 8601 times back with their seconds and offset
+        return value.isoformat()
+    return _TIME_STRINGS[value.hour * 60 + value.minute]
+
+
+def _encode_duration(value: DurationField) -> str:
+    # Like DurationField.__reduce_ex__, use the timedelta's own fields
+    days, seconds, microseconds = timedelta.__reduce__(value)[1]
+    total = (days * 86400 + seconds) * 1_000_000 + microseconds
+    sign = ""
+    if total < 0:
+        sign = "-"
+        total = -total
+    seconds, microseconds = divmod(total, 1_000_000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if microseconds:
+        return f"{sign}{hours}:{minutes:02}:{seconds:02}.{microseconds:06}"
+    return f"{sign}{hours}:{minutes:02}:{seconds:02}"
+
+
+def _encode_datetime(value: DateTimeField) -> str:
+    tz = value.tzinfo
+    # datetime's own isoformat is implemented in C
+    iso = datetime.isoformat(value)
+    if tz is None:
+        # There's no way to write a naive datetime which parses back as
+        # naive; without an offset, it parses as UTC
+        return iso
+    if tz is pen.UTC:
+        return f"{iso[:-6]}Z"
+    if len(iso) - (26 if value.microsecond else 19) != 6:
+        # RFC 3339 offsets can't have seconds, so give the same instant in UTC
+        return f"{datetime.isoformat(value.in_timezone(pen.UTC))[:-6]}Z"
+    return iso
+
+
+# Encoders to put in a model's `Config.json_encoders`. Their output parses
+# back to the same value with each field's converter. TimeFields are encoded
+# as "HH:MM" (or ISO 8601 if they have seconds or a timezone),
+# DurationFields as "[-]H:MM:SS[.ffffff]", and DateTimeFields as RFC 3339.
+# Named timezones become their UTC offset, except on times, which have no
+# offset without a date, so their timezone is left out. Naive datetimes are
+# written without an offset, so they parse back as UTC.
+TIME_JSON_ENCODERS: Dict[type, Callable[[Any], Any]] = {
+    TimeField: _encode_time,
+    DurationField: _encode_duration,
+    DateTimeField: _encode_datetime,
+}
+
+T_Encoders = Dict[type, Callable[[Any], Any]]
+
+# Each model's `json.dumps` default function, for dump_many
+_model_defaults: "WeakKeyDictionary[Type[BaseModel], Callable[[Any], Any]]" = (
+    WeakKeyDictionary()
+)
+
+
+def _make_default(encoders: T_Encoders) -> Callable[[Any], Any]:
+    # Value type -> encoder, resolved through the type's MRO
+    encoders_by_type: Dict[type, Callable[[Any], Any]] = {}
+
+    def default(value: Any) -> Any:
+        value_type = type(value)
+        try:
+            encoder = encoders_by_type[value_type]
+        except KeyError:
+            encoder = pydantic_encoder
+            for base in value_type.__mro__[:-1]:
+                if base in encoders:
+                    encoder = encoders[base]
+                    break
+            encoders_by_type[value_type] = encoder
+        return encoder(value)
+
+    return default
+
+
+def _model_json_encoders(model_type: Type[BaseModel]) -> T_Encoders:
+    if PYDANTIC_V1:
+        return model_type.__config__.json_encoders
+    return model_type.model_config.get("json_encoders") or {}
+
+
+def _get_model_default(model_type: Type[BaseModel]) -> Callable[[Any], Any]:
+    try:
+        return _model_defaults[model_type]
+    except KeyError:
+        pass
+    default = _model_defaults[model_type] = _make_default(
+        {**TIME_JSON_ENCODERS, **_model_json_encoders(model_type)}
+    )
+    return default
+
+
+def dump_many(
+    models: Iterable[BaseModel],
+    encoders: Optional[T_Encoders] = None,
+    *,
+    by_alias: bool = False,
+    exclude_none: bool = False,
+    **dumps_kwargs: Any,
+) -> str:
+    """
+    Serialize many models to a JSON array at once, encoding time fields with
+    `TIME_JSON_ENCODERS`.
+
+    Each value type's encoder is looked up once and cached, rather than
+    searched for on every value like Pydantic's `.json()` does.
+
+    :param models: the models to serialize
+    :param encoders: encoders to use on top of `TIME_JSON_ENCODERS` and the
+        models' `Config.json_encoders` (`json_encoders` in Pydantic v2's
+        `model_config`)
+    :param by_alias: see `BaseModel.dict`
+    :param exclude_none: see `BaseModel.dict`
+    :param dumps_kwargs: passed to `json.dumps`
+    :return: the JSON array
+    """
+    values = []
+    model_types: Dict[Type[BaseModel], None] = {}
+    for model in models:
+        model_types[type(model)] = None
+        if PYDANTIC_V1:
+            values.append(model.dict(by_alias=by_alias, exclude_none=exclude_none))
+        else:
+            values.append(
+                model.model_dump(by_alias=by_alias, exclude_none=exclude_none)
+            )
+
+    if encoders is None and len(model_types) == 1:
+        (model_type,) = model_types
+        default = _get_model_default(model_type)
+    else:
+        merged: T_Encoders = dict(TIME_JSON_ENCODERS)
+        for model_type in model_types:
+            merged.update(_model_json_encoders(model_type))
+        merged.update(encoders or {})
+        default = _make_default(merged)
+
+    return json.dumps(values, default=default, **dumps_kwargs)
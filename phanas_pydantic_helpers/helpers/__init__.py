@@ -1,6 +1,16 @@
-from . import create_template_from_model as create_template_model_module
-from .create_template_from_model import *
-from .factory import *
+from phanas_pydantic_helpers.common.imports import PYDANTIC_V1 as _PYDANTIC_V1
+
+from .converter_stats import *
 from .field_converter import *
-from .misc import *
-from .validators import *
+
+if _PYDANTIC_V1:
+    # These use Pydantic v1's model internals
+    from . import create_template_from_model as create_template_model_module
+    from .create_template_from_model import *
+    from .factory import *
+    from .jsonl import *
+    from .misc import *
+    from .parallel import *
+    from .reload import *
+    from .validators import *
+    from .write_template import *
@@ -0,0 +1,182 @@
+__all__ = ["ConverterStats", "ConverterTypeStats"]
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+from phanas_pydantic_helpers.helpers.field_converter import (
+    ConversionRecord,
+    FieldConverter,
+    T_ConverterObserver,
+    set_converter_observer,
+)
+
+T_StatsKey = Tuple[Type[FieldConverter], type]
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _type_name(type_: type) -> str:
+    if type_.__module__ == "builtins":
+        return type_.__qualname__
+    return f"{type_.__module__}.{type_.__qualname__}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ConverterTypeStats:
+    """
+    What happened to the values of one input type given to one
+    FieldConverter.
+    """
+
+    __slots__ = ("calls", "errors", "misses", "total_seconds", "samples")
+
+    def __init__(self, max_samples: int):
+        self.calls = 0
+        # How many conversions raised an exception, including misses
+        self.errors = 0
+        # How many values there was no converter for
+        self.misses = 0
+        self.total_seconds = 0.0
+        # The durations of the most recent conversions
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+
+    def percentile(self, q: float) -> float:
+        """
+        :param q: the percentile as a fraction, e.g. 0.99
+        :return: the duration in seconds that fraction of the recent
+            conversions took at most, or NaN if there weren't any
+        """
+        samples = sorted(self.samples)
+        if not samples:
+            return math.nan
+        idx = min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))
+        return samples[idx]
+
+
+class ConverterStats:
+    """
+    Records how many values each FieldConverter converts, how long that takes,
+    and how often it fails, per converter class and input type.
+
+    Use it as a context manager to record conversions while the block runs:
+
+        with ConverterStats() as stats:
+            load_config()
+        print(stats.to_prometheus())
+
+    or install it until further notice with `stats.install()`.
+
+    :param max_samples: how many recent durations to keep per converter
+        class and input type for percentiles
+    """
+
+    def __init__(self, max_samples: int = 1024):
+        self.max_samples = max_samples
+        self._stats: Dict[T_StatsKey, ConverterTypeStats] = {}
+        self._lock = threading.Lock()
+        self._previous: List[Optional[T_ConverterObserver]] = []
+
+    def __call__(self, record: ConversionRecord) -> None:
+        key = (record.converter, record.value_type)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = ConverterTypeStats(self.max_samples)
+            stats.calls += 1
+            stats.total_seconds += record.seconds
+            stats.samples.append(record.seconds)
+            if record.error is not None:
+                stats.errors += 1
+            if record.missed:
+                stats.misses += 1
+
+    def install(self) -> None:
+        """
+        Start recording conversions, replacing the current observer until
+        `uninstall` is called.
+        """
+        self._previous.append(set_converter_observer(self))
+
+    def uninstall(self) -> None:
+        """
+        Stop recording conversions and restore the observer that was set
+        before `install`.
+        """
+        set_converter_observer(self._previous.pop())
+
+    def __enter__(self) -> "ConverterStats":
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.uninstall()
+
+    def __getitem__(self, key: T_StatsKey) -> ConverterTypeStats:
+        return self._stats[key]
+
+    def __iter__(self) -> Iterator[T_StatsKey]:
+        with self._lock:
+            keys = list(self._stats)
+        return iter(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._stats)
+
+    def items(self) -> List[Tuple[T_StatsKey, ConverterTypeStats]]:
+        with self._lock:
+            return list(self._stats.items())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def to_prometheus(
+        self,
+        prefix: str = "phanas_field_converter",
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    ) -> str:
+        """
+        Export the stats in the Prometheus text format: a `{prefix}_seconds`
+        summary of conversion durations, and `{prefix}_errors_total` and
+        `{prefix}_misses_total` counters, labelled by `converter` and
+        `input_type`.
+        """
+        seconds: List[str] = []
+        errors: List[str] = []
+        misses: List[str] = []
+        for (converter, value_type), stats in sorted(
+            self.items(),
+            key=lambda item: (_type_name(item[0][0]), _type_name(item[0][1])),
+        ):
+            labels = (
+                f'converter="{_escape_label(_type_name(converter))}",'
+                f'input_type="{_escape_label(_type_name(value_type))}"'
+            )
+            for q in quantiles:
+                seconds.append(
+                    f'{prefix}_seconds{{{labels},quantile="{q}"}} '
+                    f"{stats.percentile(q)!r}"
+                )
+            seconds.append(f"{prefix}_seconds_sum{{{labels}}} {stats.total_seconds!r}")
+            seconds.append(f"{prefix}_seconds_count{{{labels}}} {stats.calls}")
+            errors.append(f"{prefix}_errors_total{{{labels}}} {stats.errors}")
+            misses.append(f"{prefix}_misses_total{{{labels}}} {stats.misses}")
+
+        lines = [
+            f"# HELP {prefix}_seconds Time spent converting values.",
+            f"# TYPE {prefix}_seconds summary",
+            *seconds,
+            f"# HELP {prefix}_errors_total Conversions which raised an exception.",
+            f"# TYPE {prefix}_errors_total counter",
+            *errors,
+            f"# HELP {prefix}_misses_total Values with no converter for their type.",
+            f"# TYPE {prefix}_misses_total counter",
+            *misses,
+        ]
+        return "\n".join(lines) + "\n"
@@ -1,9 +1,34 @@
 from __future__ import annotations
 
-__all__ = ["create_template_from_model"]
+__all__ = [
+    "create_template_from_model",
+    "clear_template_plan_cache",
+    "empty_template_stub",
+    "iter_template_events",
+    "TemplateEvent",
+    "START_MAP",
+    "MAP_KEY",
+    "END_MAP",
+    "START_ARRAY",
+    "END_ARRAY",
+    "SCALAR",
+]
 
-import sys
-from typing import TypeVar, get_type_hints
+from copy import deepcopy
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+from weakref import WeakKeyDictionary
 
 from pydantic import BaseModel
 
@@ -11,11 +36,9 @@ from pydantic import BaseModel
 from pydantic.main import ModelMetaclass
 from typing_extensions import get_args, get_origin
 
-from phanas_pydantic_helpers.common.typing import get_function_args_annotations
-from phanas_pydantic_helpers.helpers.field_converter import (
-    FieldConverter,
-    CONVERTER_METHOD_PREFIX,
-)
+from phanas_pydantic_helpers.common.typing import get_model_annotations
+from phanas_pydantic_helpers.helpers.factory import LazyDefault
+from phanas_pydantic_helpers.helpers.field_converter import FieldConverter
 
 T = TypeVar("T")
 
@@ -25,37 +48,90 @@ templatable_types = (list, dict, BaseModel)
 
 MISSING = object()
 
+# Templates are generated from "plans": each model is compiled once into a
+# tuple of (field name, ops) pairs, where ops describe how to emit the
+# field's value in prefix order. Running a plan needs no reflection.
+_OP_VALUE = 0  # Emit arg as-is (immutable)
+_OP_COPY = 1  # Emit a deep copy of arg
+_OP_CALL = 2  # Emit the result of calling arg
+_OP_LIST = 3  # Emit a list containing the next value
+_OP_DICT = 4  # Emit a dict mapping arg to the next value
+_OP_MODEL = 5  # Emit the template of the model arg
+
+_Op = Tuple[int, Any]
+_TemplatePlan = Tuple[Tuple[str, Tuple[_Op, ...]], ...]
+
+# Stands in for PLACEHOLDER_DICT_KEY_STR in plans so it's read at run time
+_PLACEHOLDER_KEY = object()
+
+_IMMUTABLE_TYPES = frozenset(
+    (type(None), bool, int, float, complex, str, bytes, frozenset)
+)
+
+# Template event kinds
+START_MAP = "start_map"
+MAP_KEY = "map_key"
+END_MAP = "end_map"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+SCALAR = "scalar"
+
+# Frame kinds used while running plans
+_FRAME_MODEL = 0
+_FRAME_LIST = 1
+_FRAME_DICT = 2
+
+_template_plans: WeakKeyDictionary[type, _TemplatePlan] = WeakKeyDictionary()
 
-def create_template_from_type(type_: type[T], field_name: str) -> T:
+
+def clear_template_plan_cache(model_type: Optional[type[BaseModel]] = None) -> None:
+    """
+    Forget the compiled template plan of a model, or of all models if
+    `model_type` is None. Call this after a model's fields change, e.g. after
+    updating its forward refs.
+    """
+    if model_type is None:
+        _template_plans.clear()
+    else:
+        _template_plans.pop(model_type, None)
+
+
+def empty_template_stub(model_type: type[BaseModel]) -> dict[str, object]:
+    """
+    The default template for a model which (indirectly) contains itself.
+    """
+    return {}
+
+
+def _value_op(value: object) -> _Op:
+    if type(value) in _IMMUTABLE_TYPES:
+        return _OP_VALUE, value
+    return _OP_COPY, value
+
+
+def _compile_type(ops: List[_Op], type_: type, field_name: str) -> None:
     if isinstance(type_, ModelMetaclass):
-        return create_template_from_model(type_)
+        ops.append((_OP_MODEL, type_))
+        return
 
     # If a class inherits a `typing.Protocol`, its type will not be `type`
     # like expected, and `issubclass` will not be able to be run on it. We can
     # search for FieldConverter in __mro__ instead.
     if hasattr(type_, "__mro__") and FieldConverter in type_.__mro__:
-        converters = (
-            (getattr(type_, attr))
-            for attr in vars(type_).keys()
-            if attr.startswith(CONVERTER_METHOD_PREFIX)
-        )
         # We're going to get ONLY the first converter's value type
         try:
-            first_converter_type = list(
-                get_function_args_annotations(next(converters)).values()
-            )[0]
-        except StopIteration:
+            first_converter_type = type_.accepted_types()[0]
+        except IndexError:
             raise ValueError(
                 f'FieldConverter named "{field_name}" has no converter methods'
             )
-        return create_template_from_type(
-            # Avoid useless type error
-            first_converter_type,  # noqa
-            field_name,
-        )
+        # Avoid useless type error
+        _compile_type(ops, first_converter_type, field_name)  # noqa
+        return
 
     if type_ is str:
-        return field_name.upper()
+        ops.append((_OP_VALUE, field_name.upper()))
+        return
 
     # Get origin type of parameterized type
     origin_type = get_origin(type_)
@@ -63,31 +139,37 @@ def create_template_from_type(type_: type[T], field_name: str) -> T:
     if origin_type is dict:
         key_type, value_type = get_args(type_)
         if key_type is str:
-            placeholder_key = PLACEHOLDER_DICT_KEY_STR
+            placeholder_key = _PLACEHOLDER_KEY
         else:
             # Get the default value for the key's type
             placeholder_key = key_type()
-        return {placeholder_key: create_template_from_type(value_type, field_name)}
+        ops.append((_OP_DICT, placeholder_key))
+        _compile_type(ops, value_type, field_name)
+        return
 
     if origin_type is list:
         item_type = get_args(type_)[0]
-        return [create_template_from_type(item_type, field_name)]
+        ops.append((_OP_LIST, None))
+        _compile_type(ops, item_type, field_name)
+        return
 
-    # Not parameterized, or some other parameterized type. Return the default
+    # Not parameterized, or some other parameterized type. Use the default
     # value for the type
-    return type_()
+    default = type_()
+    if type(default) in _IMMUTABLE_TYPES:
+        ops.append((_OP_VALUE, default))
+    else:
+        # Construct a new default each time so templates don't share it
+        ops.append((_OP_CALL, type_))
 
 
-def create_template_from_model(
-    model_type: type[BaseModel] | ModelMetaclass,
-) -> dict[str, object]:
-    annotations = get_type_hints(
-        model_type, vars(sys.modules[model_type.__module__]), vars(model_type)
-    )
+def _compile_model(model_type: type[BaseModel] | ModelMetaclass) -> _TemplatePlan:
+    annotations = get_model_annotations(model_type)
 
-    dict_ = {}
+    plan = []
     for field_name, field in model_type.__fields__.items():
         type_ = annotations.get(field_name, MISSING)
+        ops: List[_Op] = []
 
         if not field.required:
             # Field is optional, so it either has a default or a default_factory
@@ -96,20 +178,328 @@ def create_template_from_model(
                 # Only factories can be templatable types, since they're
                 # generated at runtime
                 factory in templatable_types
-                or isinstance(factory, ModelMetaclass)
+                or isinstance(factory, (ModelMetaclass, LazyDefault))
             ):
                 # This default factory can be templated
-                value = create_template_from_type(type_, field_name)
-            else:
+                _compile_type(ops, type_, field_name)
+            elif factory:
                 # We can't template this default, so just use the default as-is
-                value = factory() if factory else field.default
+                ops.append((_OP_CALL, factory))
+            else:
+                ops.append(_value_op(field.default))
 
         else:
             # Field is required
-            value = create_template_from_type(
-                type_ if type is not MISSING else field.type_, field_name
+            _compile_type(
+                ops, field.outer_type_ if type_ is MISSING else type_, field_name
             )
 
-        dict_[field_name] = value
+        plan.append((field_name, tuple(ops)))
+
+    return tuple(plan)
+
+
+def _get_plan(model_type: type[BaseModel] | ModelMetaclass) -> _TemplatePlan:
+    try:
+        return _template_plans[model_type]
+    except KeyError:
+        pass
+    plan = _template_plans[model_type] = _compile_model(model_type)
+    return plan
+
+
+def _run_plan(
+    plan: _TemplatePlan,
+    on_cycle: Callable[[type[BaseModel]], object],
+    share_models: bool,
+) -> dict[str, object]:
+    """
+    Run a template plan with an explicit stack, so deeply nested models don't
+    hit the recursion limit.
+    """
+    # Models currently being built (i.e. ancestors of the current value)
+    active: Set[type] = set()
+    # Finished model templates, if they're shared
+    finished: Dict[type, dict[str, object]] = {}
+
+    root: dict[str, object] = {}
+    # Model frames are [kind, template, fields iterator, field name, model,
+    # whether a cycle stub was written below it]
+    stack: List[list] = [[_FRAME_MODEL, root, iter(plan), None, None, False]]
+
+    while stack:
+        frame = stack[-1]
+        # The top frame is always a model frame here, so move on to its next
+        # field
+        try:
+            frame[3], field_ops = next(frame[2])
+        except StopIteration:
+            stack.pop()
+            model_type = frame[4]
+            if model_type is None:
+                # This is the root frame
+                break
+            active.discard(model_type)
+            if frame[5]:
+                # The stubs depend on which models contain this one, so this
+                # template can't be reused elsewhere, and neither can its
+                # parent's
+                for parent in reversed(stack):
+                    if parent[0] == _FRAME_MODEL:
+                        parent[5] = True
+                        break
+            elif share_models:
+                finished[model_type] = frame[1]
+            value = frame[1]
+        else:
+            ops = iter(field_ops)
+            while True:
+                op, arg = next(ops)
+                if op == _OP_LIST:
+                    stack.append([_FRAME_LIST])
+                    continue
+                if op == _OP_DICT:
+                    if arg is _PLACEHOLDER_KEY:
+                        arg = PLACEHOLDER_DICT_KEY_STR
+                    stack.append([_FRAME_DICT, arg])
+                    continue
+
+                if op == _OP_VALUE:
+                    value = arg
+                elif op == _OP_COPY:
+                    value = deepcopy(arg)
+                elif op == _OP_CALL:
+                    value = arg()
+                elif op == _OP_MODEL:
+                    if arg in active:
+                        value = on_cycle(arg)
+                        frame[5] = True
+                    elif arg in finished:
+                        value = finished[arg]
+                    else:
+                        active.add(arg)
+                        stack.append(
+                            [_FRAME_MODEL, {}, iter(_get_plan(arg)), None, arg, False]
+                        )
+                        value = MISSING
+                else:
+                    raise ValueError(f"Unknown template op {op}")
+                break
 
-    return dict_
+            if value is MISSING:
+                # Start building the nested model
+                continue
+
+        # Hand the finished value to the containers waiting for it
+        while True:
+            frame = stack[-1]
+            kind = frame[0]
+            if kind == _FRAME_MODEL:
+                frame[1][frame[3]] = value
+                break
+            stack.pop()
+            value = [value] if kind == _FRAME_LIST else {frame[1]: value}
+
+    return root
+
+
+def create_template_from_type(
+    type_: type[T],
+    field_name: str,
+    *,
+    on_cycle: Callable[[type[BaseModel]], object] = empty_template_stub,
+    share_models: bool = False,
+) -> T:
+    ops: List[_Op] = []
+    _compile_type(ops, type_, field_name)
+    return _run_plan(((field_name, tuple(ops)),), on_cycle, share_models)[field_name]
+
+
+def create_template_from_model(
+    model_type: type[BaseModel] | ModelMetaclass,
+    *,
+    on_cycle: Callable[[type[BaseModel]], object] = empty_template_stub,
+    share_models: bool = False,
+) -> dict[str, object]:
+    """
+    Create a template dict from a model, filling in required fields with
+    placeholders.
+
+    Each model is compiled once into a template plan which is cached, so
+    repeated calls don't need to reflect over the model again. If a model's
+    fields change (e.g. after updating its forward refs), call
+    `clear_template_plan_cache`.
+
+    :param model_type: the model to create a template for
+    :param on_cycle: called with a model that contains itself (directly or
+        indirectly) to get the value to use in place of the nested copy of
+        that model. Defaults to an empty dict.
+    :param share_models: whether every occurrence of a nested model should
+        share the same template object. This builds each model's template
+        only once, which keeps large schemas cheap, but mutating the
+        template for one occurrence changes all of them (and YAML dumpers
+        write anchors for them). Templates of models which contain a cycle
+        are never shared, since their stubs depend on where they are.
+    """
+    return create_template_from_type(
+        model_type,
+        "__root__",
+        on_cycle=on_cycle,
+        share_models=share_models,
+    )
+
+
+class TemplateEvent(NamedTuple):
+    """
+    An event from `iter_template_events`.
+
+    `path` is the location of the value the event refers to, as a tuple of
+    dict keys and list indices. For `MAP_KEY` events, `path` is the location
+    of the map and `value` is the key. For `SCALAR` events, `value` is the
+    scalar. `value` is None for other events.
+    """
+
+    path: Tuple[Hashable, ...]
+    kind: str
+    value: object = None
+
+
+def _is_table_value(value: object) -> bool:
+    if isinstance(value, dict):
+        return True
+    if isinstance(value, (list, tuple)):
+        return bool(value) and all(isinstance(item, dict) for item in value)
+    return False
+
+
+def iter_template_events(
+    model_type: type[BaseModel] | ModelMetaclass,
+    *,
+    on_cycle: Callable[[type[BaseModel]], object] = empty_template_stub,
+    scalars_first: bool = False,
+) -> Iterator[TemplateEvent]:
+    """
+    Generate the template of a model as a stream of events, without building
+    the whole template in memory. The template is walked the same way as
+    `create_template_from_model`, and the events describe the same value.
+
+    :param model_type: the model to create a template for
+    :param on_cycle: see `create_template_from_model`
+    :param scalars_first: emit the values of each map which aren't maps or
+        lists of maps before those which are, as required by formats like
+        TOML
+    """
+    active: Set[type] = set()
+
+    # Each frame is [end event kind, path, iterator of (key, producer), model]
+    # Producers are (True, ops iterator) or (False, value)
+    stack: List[list] = []
+    path: Tuple[Hashable, ...] = ()
+    producer: Tuple[bool, Any] = (True, iter(((_OP_MODEL, model_type),)))
+
+    while True:
+        is_ops, source = producer
+        if is_ops:
+            op, arg = next(source)
+            if op == _OP_LIST:
+                yield TemplateEvent(path, START_ARRAY)
+                stack.append([END_ARRAY, path, iter(((0, producer),)), None])
+            elif op == _OP_DICT:
+                if arg is _PLACEHOLDER_KEY:
+                    arg = PLACEHOLDER_DICT_KEY_STR
+                yield TemplateEvent(path, START_MAP)
+                stack.append([END_MAP, path, iter(((arg, producer),)), None])
+            elif op == _OP_MODEL and arg not in active:
+                active.add(arg)
+                if scalars_first:
+                    fields = _scalars_first_fields(_get_plan(arg), active, on_cycle)
+                else:
+                    fields = [
+                        (field_name, (True, iter(field_ops)))
+                        for field_name, field_ops in _get_plan(arg)
+                    ]
+                yield TemplateEvent(path, START_MAP)
+                stack.append([END_MAP, path, iter(fields), arg])
+            else:
+                if op == _OP_VALUE:
+                    value = arg
+                elif op == _OP_COPY:
+                    value = deepcopy(arg)
+                elif op == _OP_CALL:
+                    value = arg()
+                elif op == _OP_MODEL:
+                    value = on_cycle(arg)
+                else:
+                    raise ValueError(f"Unknown template op {op}")
+                producer = (False, value)
+                continue
+
+        else:
+            value = source
+            if isinstance(value, dict):
+                items = (
+                    (key, (False, item))
+                    for key, item in (
+                        sorted(value.items(), key=lambda kv: _is_table_value(kv[1]))
+                        if scalars_first
+                        else value.items()
+                    )
+                )
+                yield TemplateEvent(path, START_MAP)
+                stack.append([END_MAP, path, items, None])
+            elif isinstance(value, (list, tuple)):
+                items = ((idx, (False, item)) for idx, item in enumerate(value))
+                yield TemplateEvent(path, START_ARRAY)
+                stack.append([END_ARRAY, path, items, None])
+            else:
+                yield TemplateEvent(path, SCALAR, value)
+
+        # Find the next value to produce, closing finished containers
+        while stack:
+            frame = stack[-1]
+            try:
+                key, producer = next(frame[2])
+            except StopIteration:
+                stack.pop()
+                if frame[3] is not None:
+                    active.discard(frame[3])
+                yield TemplateEvent(frame[1], frame[0])
+                continue
+
+            if frame[0] == END_MAP:
+                yield TemplateEvent(frame[1], MAP_KEY, key)
+            path = frame[1] + (key,)
+            break
+        else:
+            return
+
+
+def _scalars_first_fields(
+    plan: _TemplatePlan,
+    active: Set[type],
+    on_cycle: Callable[[type[BaseModel]], object],
+) -> List[Tuple[str, Tuple[bool, Any]]]:
+    scalars = []
+    tables = []
+    for field_name, field_ops in plan:
+        op, arg = field_ops[0]
+        if op == _OP_CALL or (op == _OP_MODEL and arg in active):
+            # We can only tell what these make by making them
+            value = arg() if op == _OP_CALL else on_cycle(arg)
+            is_table = _is_table_value(value)
+            producer = (False, value)
+        else:
+            # Skip through lists to find what they contain
+            idx = 0
+            while field_ops[idx][0] == _OP_LIST:
+                idx += 1
+            op, arg = field_ops[idx]
+            if op == _OP_MODEL and arg in active:
+                is_table = _is_table_value(on_cycle(arg))
+            elif op in (_OP_COPY, _OP_VALUE):
+                is_table = idx == 0 and _is_table_value(arg)
+            else:
+                is_table = op in (_OP_MODEL, _OP_DICT)
+            producer = (True, iter(field_ops))
+        (tables if is_table else scalars).append((field_name, producer))
+    return scalars + tables
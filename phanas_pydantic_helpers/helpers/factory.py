@@ -1,10 +1,53 @@
-__all__ = ["Factory", "instance_list_factory"]
+__all__ = [
+    "Factory",
+    "LazyFactory",
+    "LazyDefault",
+    "instance_list_factory",
+    "prototype_list_factory",
+]
 
-from typing import Callable, List, Type, TypeVar
+from copy import deepcopy
+from datetime import date, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from pathlib import PurePath
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
+from uuid import UUID
+from weakref import WeakKeyDictionary
 
+from pydantic import BaseModel
 from pydantic.fields import FieldInfo
 
 V = TypeVar("V")
+M = TypeVar("M", bound=BaseModel)
+
+# Values of these types can't be changed in place, so they're shared without
+# copying
+_IMMUTABLE_TYPES = frozenset(
+    (type(None), bool, int, float, complex, str, bytes, frozenset)
+)
+
+# Instances of these types (and their subclasses, like field converters) are
+# treated as values, which prototypes share with their copies
+_VALUE_TYPES = (
+    type(None),
+    bool,
+    int,
+    float,
+    complex,
+    str,
+    bytes,
+    frozenset,
+    Decimal,
+    Enum,
+    PurePath,
+    UUID,
+    date,
+    time,
+    timedelta,
+)
+
+_MISSING = object()
 
 
 class Factory(FieldInfo):
@@ -17,3 +60,242 @@ def instance_list_factory(class_: Type[V], *args, **kwargs) -> Callable[[], List
         return [class_(*args, **kwargs)]
 
     return make_list
+
+
+def prototype_list_factory(class_: Type[V], *args, **kwargs) -> Callable[[], List[V]]:
+    """
+    Like `instance_list_factory`, but `class_` is only instantiated (and
+    validated) once, the first time the factory is called. Every list after
+    that holds a copy of that prototype.
+
+    Copies of models share the prototype's immutable values (like strings,
+    numbers, and dates) and get deep copies of the rest. Other classes are
+    copied with `copy.deepcopy`.
+    """
+    clone: Optional[Callable[[], V]] = None
+
+    def make_clone() -> Callable[[], V]:
+        prototype = class_(*args, **kwargs)
+        if not isinstance(prototype, BaseModel):
+            return lambda: deepcopy(prototype)
+
+        # Only copy the values that can be changed in place
+        values = prototype.__dict__
+        mutable = [
+            name
+            for name, value in values.items()
+            if not isinstance(value, _VALUE_TYPES)
+        ]
+        fields_set = prototype.__fields_set__
+        # A shallow copy shares the private values too, so copy the mutable
+        # ones after
+        mutable_private = [
+            name
+            for name in prototype.__private_attributes__
+            if not isinstance(getattr(prototype, name, None), _VALUE_TYPES)
+        ]
+
+        def clone_model():
+            new_values = values.copy()
+            for name in mutable:
+                new_values[name] = deepcopy(new_values[name])
+            model = prototype._copy_and_set_values(
+                new_values, set(fields_set), deep=False
+            )
+            for name in mutable_private:
+                object.__setattr__(model, name, deepcopy(getattr(prototype, name)))
+            return model
+
+        return clone_model
+
+    def make_list():
+        nonlocal clone
+        if clone is None:
+            clone = make_clone()
+        return [clone()]
+
+    return make_list
+
+
+def _copy_mutable(values: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        name: value if type(value) in _IMMUTABLE_TYPES else deepcopy(value)
+        for name, value in values.items()
+    }
+
+
+def _rebuild_model(model_type: Type[M], values: Dict[str, Any], fields_set: set) -> M:
+    model = model_type.__new__(model_type)
+    object.__setattr__(model, "__dict__", values)
+    object.__setattr__(model, "__fields_set__", fields_set)
+    return model
+
+
+class _LazyField:
+    """
+    Copies a lazy model's values before a mutable field is read, so changing
+    the value in place doesn't change the shared default.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance._lazy_materialize()[self.name]
+
+    def __set__(self, instance, value):
+        instance._lazy_materialize()[self.name] = value
+
+
+class _LazyModel:
+    """
+    Mixed into a subclass of a model to make instances which share the values
+    of one default instance until they're written to.
+    """
+
+    __slots__ = ()
+
+    # The model this is a lazy version of
+    _lazy_model_type: Type[BaseModel]
+    # The values every instance shares until it's written to
+    _lazy_values: Dict[str, Any]
+
+    @classmethod
+    def _lazy_new(cls):
+        model = cls.__new__(cls)
+        object.__setattr__(model, "__dict__", cls._lazy_values)
+        object.__setattr__(model, "__fields_set__", set())
+        if cls.__private_attributes__:
+            # Private values aren't shared; each instance gets its own, like
+            # any other model
+            model._init_private_attributes()
+        return model
+
+    def _lazy_materialize(self) -> Dict[str, Any]:
+        values = object.__getattribute__(self, "__dict__")
+        if values is type(self)._lazy_values:
+            values = _copy_mutable(values)
+            object.__setattr__(self, "__dict__", values)
+        return values
+
+    def __setattr__(self, name, value):
+        self._lazy_materialize()
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        self._lazy_materialize()
+        super().__delattr__(name)
+
+    def _copy_and_set_values(self, values, fields_set, *, deep):
+        shared = type(self)._lazy_values
+        if not deep and values is not shared:
+            # A shallow copy with changes, which mustn't share mutable values
+            # with the default
+            values = {
+                name: (
+                    deepcopy(value)
+                    if type(value) not in _IMMUTABLE_TYPES
+                    and shared.get(name, _MISSING) is value
+                    else value
+                )
+                for name, value in values.items()
+            }
+        return super()._copy_and_set_values(values, fields_set, deep=deep)
+
+    def __deepcopy__(self, memo):
+        cls = type(self)
+        values = object.__getattribute__(self, "__dict__")
+        if values is cls._lazy_values:
+            model = cls._lazy_new()
+        else:
+            model = _rebuild_model(
+                cls, deepcopy(values, memo), set(self.__fields_set__)
+            )
+        for name in cls.__private_attributes__:
+            try:
+                value = object.__getattribute__(self, name)
+            except AttributeError:
+                continue
+            object.__setattr__(model, name, deepcopy(value, memo))
+        return model
+
+    def __reduce__(self):
+        # Lazy classes are made at runtime, so they can't be pickled by name
+        return (
+            _rebuild_model,
+            (
+                type(self)._lazy_model_type,
+                dict(object.__getattribute__(self, "__dict__")),
+                set(self.__fields_set__),
+            ),
+        )
+
+
+# Model -> its lazy subclass
+_lazy_types: "WeakKeyDictionary[type, type]" = WeakKeyDictionary()
+
+
+def _get_lazy_type(model_type: Type[BaseModel]) -> type:
+    try:
+        return _lazy_types[model_type]
+    except KeyError:
+        pass
+
+    default = model_type()
+    lazy_type = type(
+        model_type.__name__,
+        (_LazyModel, model_type),
+        {"__module__": model_type.__module__, "__qualname__": model_type.__qualname__},
+    )
+    # Set these after the class is made so Pydantic doesn't mistake them for
+    # fields
+    lazy_type._lazy_model_type = model_type
+    lazy_type._lazy_values = default.__dict__
+    for name, value in default.__dict__.items():
+        if type(value) not in _IMMUTABLE_TYPES:
+            setattr(lazy_type, name, _LazyField(name))
+
+    _lazy_types[model_type] = lazy_type
+    return lazy_type
+
+
+class LazyDefault:
+    """
+    The default factory of a `LazyFactory`.
+    """
+
+    __slots__ = ("model_type", "_lazy_type")
+
+    def __init__(self, model_type: Type[BaseModel]):
+        self.model_type = model_type
+        self._lazy_type: Optional[type] = None
+
+    def __call__(self) -> BaseModel:
+        lazy_type = self._lazy_type
+        if lazy_type is None:
+            lazy_type = self._lazy_type = _get_lazy_type(self.model_type)
+        return lazy_type._lazy_new()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.model_type.__name__})"
+
+
+class LazyFactory(FieldInfo):
+    """
+    Like `Factory(model_type)`, but instead of building a new default model
+    for every instance, every default shares the values of a single default
+    model until it's changed.
+
+    The default model is built when the first default is needed. Reading a
+    field which holds a mutable value (like a list or another model), or
+    setting any field, gives the instance its own copy of the values first,
+    so the shared default never changes. `.dict()` and `.json()` read the
+    shared values directly.
+    """
+
+    def __init__(self, model_type: Type[BaseModel], *args, **kwargs):
+        super().__init__(*args, default_factory=LazyDefault(model_type), **kwargs)
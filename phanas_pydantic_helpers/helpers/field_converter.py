@@ -2,9 +2,23 @@ __all__ = [
     "CONVERTER_METHOD_PREFIX",
     "FieldConverterError",
     "FieldConverter",
+    "ConversionRecord",
+    "set_converter_observer",
+    "converter_union",
 ]
 
-from typing import Any, Callable, Dict, Type
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
 
 from phanas_pydantic_helpers.common.typing import get_function_args_annotations
 
@@ -12,11 +26,89 @@ CONVERTER_METHOD_PREFIX = "_pyd_convert"
 
 T_Converter = Callable[[Type["FieldConverter"], Any], Any]
 
+# The exceptions Pydantic turns into validation errors
+CONVERSION_ERRORS = (ValueError, TypeError, AssertionError)
+
 
 class FieldConverterError(Exception):
     pass
 
 
+class ConversionRecord(NamedTuple):
+    converter: Type["FieldConverter"]
+    value_type: type
+    seconds: float
+    # The exception the conversion raised, if any
+    error: Optional[BaseException]
+    # Whether there was no converter for the value's type
+    missed: bool
+
+
+T_ConverterObserver = Callable[[ConversionRecord], Any]
+
+_observer: Optional[T_ConverterObserver] = None
+
+
+def set_converter_observer(
+    observer: Optional[T_ConverterObserver],
+) -> Optional[T_ConverterObserver]:
+    """
+    Call `observer` with a `ConversionRecord` after every value a
+    FieldConverter converts, e.g. to record how long each converter takes.
+    See `ConverterStats` for a ready-made observer.
+
+    Conversions only check whether there is an observer, so this costs
+    next to nothing while it's unset.
+
+    :param observer: the new observer, or None to stop observing
+    :return: the previous observer
+    """
+    global _observer
+    previous, _observer = _observer, observer
+    return previous
+
+
+def _observe(cls: Type["FieldConverter"], fn: Optional[T_Converter], value: Any) -> Any:
+    value_type = type(value)
+    start = time.perf_counter()
+    try:
+        if fn is None:
+            raise TypeError(f"No converter for type {value_type}")
+        result = fn(cls, value)
+    except BaseException as e:
+        observer = _observer
+        if observer is not None:
+            observer(
+                ConversionRecord(
+                    cls, value_type, time.perf_counter() - start, e, fn is None
+                )
+            )
+        raise
+
+    observer = _observer
+    if observer is not None:
+        observer(
+            ConversionRecord(cls, value_type, time.perf_counter() - start, None, False)
+        )
+    return result
+
+
+def _v2_validator(
+    cls: Type["FieldConverter"], fn: T_Converter, observe: bool = True
+) -> Callable[[Any], Any]:
+    def validate(value):
+        try:
+            if observe and _observer is not None:
+                return _observe(cls, fn, value)
+            return fn(cls, value)
+        except TypeError as e:
+            # Pydantic v1 turns TypeErrors into validation errors, but v2
+            # only does that for ValueErrors
+            raise ValueError(str(e)) from e
+
+    return validate
+
+
 class FieldConverter:
     """
     Examples:
@@ -35,20 +127,90 @@ class FieldConverter:
             @classmethod
             def _pyd_convert(cls, time_str: str):
                 return parse_time(time_str, class_=cls)
+
+    Converter tables are built when the subclass is created. Converters are
+    inherited from FieldConverter base classes, and subclasses of a
+    converter's value type (e.g. `bool` for an `int` converter) are resolved
+    through their MRO and cached, so dispatch is a single dict lookup after
+    the first value of each type.
     """
 
-    __pyd_converters: Dict[type, T_Converter] = None
+    # Converter value type -> converter, in definition order
+    __pyd_converters: Optional[Dict[type, T_Converter]] = None
+    # Concrete input type -> converter (or None if there is no converter)
+    __pyd_dispatch: Dict[type, Optional[T_Converter]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.__pyd_converters = None
+        cls.__pyd_dispatch = {}
+        try:
+            cls.__pyd_build_converters()
+        except NameError:
+            # A converter annotation refers to a name that isn't defined yet
+            # (e.g. a class defined later in the module). The table will be
+            # built on first use instead.
+            pass
 
     @classmethod
     def __get_validators__(cls):
+        # Pydantic v1
         yield cls.__pyd_convert
 
     @classmethod
-    def __pyd_get_converters(cls) -> Dict[type, T_Converter]:
-        if cls.__pyd_converters is not None:
-            return cls.__pyd_converters
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: Any):
+        """
+        Pydantic v2. Each converter becomes an `isinstance` check chained to
+        the converter, so pydantic-core picks the converter for each value.
+
+        Choices are tried from the most to the least specific type. Unlike on
+        v1, if the most specific converter fails, the converters for the
+        value's other base classes are also tried before the value is
+        rejected.
+        """
+        from pydantic_core import core_schema
+
+        converters = cls.__pyd_get_converters()
+        if not converters or not all(isinstance(t, type) for t in converters):
+            # Nothing pydantic-core can check, e.g. an `Any` converter
+            return core_schema.no_info_plain_validator_function(
+                # This observes conversions itself
+                _v2_validator(cls, cls.__pyd_convert.__func__, observe=False)
+            )
+
+        choices = []
+        # Subclasses have longer MROs than their bases, so they're tried
+        # first. Sorting is stable, so unrelated types stay in definition
+        # order.
+        for value_type, fn in sorted(
+            converters.items(), key=lambda item: -len(item[0].__mro__)
+        ):
+            choices.append(
+                core_schema.chain_schema(
+                    [
+                        core_schema.is_instance_schema(value_type),
+                        core_schema.no_info_plain_validator_function(
+                            _v2_validator(cls, fn)
+                        ),
+                    ]
+                )
+            )
 
+        if len(choices) == 1:
+            return choices[0]
+        return core_schema.union_schema(choices, mode="left_to_right")
+
+    @classmethod
+    def __pyd_build_converters(cls) -> Dict[type, T_Converter]:
         converters: Dict[type, T_Converter] = {}
+
+        # Inherit converters from FieldConverter base classes. Subclasses
+        # override their bases' converters for the same type.
+        for base in reversed(cls.__mro__[1:]):
+            if base is not FieldConverter and issubclass(base, FieldConverter):
+                converters.update(base.__pyd_get_converters())
+
+        own_converters: Dict[type, T_Converter] = {}
         for name, member in cls.__dict__.items():
             # Iterate through this class's members and find converter methods
             if not isinstance(member, classmethod):
@@ -65,21 +227,186 @@ class FieldConverter:
                     f"Converter {name} must take one positional argument: value"
                 )
             converter_type = fn_args_types[0]
-            if converter_type in converters:
+            if converter_type in own_converters:
                 raise FieldConverterError(
                     f"Multiple converters found for type {converter_type}, there "
                     f"should only be one"
                 )
-            converters[converter_type] = fn
+            own_converters[converter_type] = fn
 
+        converters.update(own_converters)
         cls.__pyd_converters = converters
-        return cls.__pyd_converters
+        return converters
 
     @classmethod
-    def __pyd_convert(cls, value):
+    def __pyd_get_converters(cls) -> Dict[type, T_Converter]:
+        converters = cls.__pyd_converters
+        if converters is None:
+            converters = cls.__pyd_build_converters()
+        return converters
+
+    @classmethod
+    def __pyd_resolve_converter(cls, value_type: type) -> Optional[T_Converter]:
         converters = cls.__pyd_get_converters()
+        fn = None
+        for type_ in value_type.__mro__:
+            fn = converters.get(type_)
+            if fn is not None:
+                break
+
+        # Assigning a single key is atomic, so concurrent resolutions of the
+        # same type at worst do the same work twice
+        cls.__pyd_dispatch[value_type] = fn
+        return fn
+
+    @classmethod
+    def accepted_types(cls) -> Tuple[type, ...]:
+        """
+        :return: the value types this class has converters for, including
+            inherited converters. Subclasses of these types are accepted too.
+        """
+        return tuple(cls.__pyd_get_converters())
+
+    @classmethod
+    def accepts(cls, value: Any) -> bool:
+        """
+        Check whether there is a converter for a value's type, without
+        converting it or raising an exception.
+        """
+        try:
+            return cls.__pyd_dispatch[type(value)] is not None
+        except KeyError:
+            return cls.__pyd_resolve_converter(type(value)) is not None
+
+    @classmethod
+    def convert_many(
+        cls, values: Iterable[Any]
+    ) -> Tuple[List[Any], Dict[int, Exception]]:
+        """
+        Convert many values at once, without going through Pydantic.
+
+        Values are grouped by type so each converter is looked up once per
+        type rather than once per value.
+
+        :param values: the raw values to convert
+        :return: a list of converted values in input order (`None` where
+            conversion failed), and a dict of input index to the exception
+            raised while converting that value
+        """
+        values = values if isinstance(values, list) else list(values)
+
+        indices_by_type: Dict[type, List[int]] = {}
+        for idx, value in enumerate(values):
+            try:
+                indices_by_type[type(value)].append(idx)
+            except KeyError:
+                indices_by_type[type(value)] = [idx]
+
+        results: List[Any] = [None] * len(values)
+        errors: Dict[int, Exception] = {}
+        for value_type, indices in indices_by_type.items():
+            try:
+                fn = cls.__pyd_dispatch[value_type]
+            except KeyError:
+                fn = cls.__pyd_resolve_converter(value_type)
+
+            if _observer is not None:
+                for idx in indices:
+                    try:
+                        results[idx] = _observe(cls, fn, values[idx])
+                    except CONVERSION_ERRORS as e:
+                        errors[idx] = e
+                continue
+
+            if fn is None:
+                error = TypeError(f"No converter for type {value_type}")
+                for idx in indices:
+                    errors[idx] = error
+                continue
+
+            for idx in indices:
+                try:
+                    results[idx] = fn(cls, values[idx])
+                except CONVERSION_ERRORS as e:
+                    errors[idx] = e
+
+        return results, errors
+
+    @classmethod
+    def __pyd_convert(cls, value):
+        value_type = type(value)
         try:
-            fn = converters[type(value)]
+            fn = cls.__pyd_dispatch[value_type]
         except KeyError:
-            raise TypeError(f"No converter for type {type(value)}")
+            fn = cls.__pyd_resolve_converter(value_type)
+        if _observer is not None:
+            return _observe(cls, fn, value)
+        if fn is None:
+            raise TypeError(f"No converter for type {value_type}")
         return fn(cls, value)
+
+
+def _make_union_converter(
+    value_type: type, convert: Callable[[Any], Any]
+) -> classmethod:
+    def union_converter(cls, value):
+        return convert(value)
+
+    union_converter.__annotations__ = {"value": value_type}
+    return classmethod(union_converter)
+
+
+def converter_union(
+    *converters: Type[FieldConverter], name: Optional[str] = None
+) -> Type[FieldConverter]:
+    """
+    Create a field type which accepts any of `converters`, like
+    `Union[TimeField, DurationField]`, but which picks the converters to try
+    from the value's type up front. Converters which don't accept the type
+    are skipped instead of raising and formatting a `TypeError`.
+
+    Like a `Union`, if more than one converter accepts a value they're tried
+    in order, and the first to succeed wins.
+
+    :param converters: the FieldConverter classes to accept
+    :param name: the name of the new class
+    :return: a FieldConverter subclass to use as a field's type
+    """
+    if not converters:
+        raise FieldConverterError("converter_union needs at least one converter")
+
+    # Concrete input type -> the converters which accept it
+    candidates_by_type: Dict[type, Tuple[Type[FieldConverter], ...]] = {}
+
+    def convert(value):
+        value_type = type(value)
+        try:
+            candidates = candidates_by_type[value_type]
+        except KeyError:
+            candidates = tuple(c for c in converters if c.accepts(value))
+            candidates_by_type[value_type] = candidates
+
+        if len(candidates) == 1:
+            return candidates[0]._FieldConverter__pyd_convert(value)
+
+        error: Optional[Exception] = None
+        for converter in candidates:
+            try:
+                return converter._FieldConverter__pyd_convert(value)
+            except CONVERSION_ERRORS as e:
+                error = e
+        raise error
+
+    namespace: Dict[str, Any] = {
+        "__module__": __name__,
+        "__doc__": f"Any of {', '.join(c.__name__ for c in converters)}",
+    }
+    value_types = dict.fromkeys(t for c in converters for t in c.accepted_types())
+    for idx, value_type in enumerate(value_types):
+        namespace[f"{CONVERTER_METHOD_PREFIX}_{idx}"] = _make_union_converter(
+            value_type, convert
+        )
+
+    if name is None:
+        name = "Or".join(c.__name__ for c in converters)
+    return type(name, (FieldConverter,), namespace)
@@ -0,0 +1,261 @@
+__all__ = ["load_jsonl", "JSONL_CHUNK_SIZE"]
+
+import copy
+import json
+import os
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Set,
+    TextIO,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_SINGLETON
+from pydantic.main import validate_model
+
+from phanas_pydantic_helpers.helpers.field_converter import FieldConverter
+
+T_Model = TypeVar("T_Model", bound=BaseModel)
+T_Source = Union[str, "os.PathLike[str]", BinaryIO, TextIO, Any]
+
+JSONL_CHUNK_SIZE = 1024
+
+# JSON lines files are always UTF-8, so decode lines directly instead of
+# letting `json.loads` detect their encoding
+_decode_json = json.JSONDecoder().decode
+
+
+def _already_converted(cls, value, values, field, config):
+    return value
+
+
+class _BatchedModel:
+    """
+    Stands in for a model in `pydantic.main.validate_model`, with copies of
+    the model's batched fields which take their already converted values as
+    they are. Every other step of validation is the model's own.
+    """
+
+    def __init__(self, model_type: Type[BaseModel], batch_names: Set[str]):
+        self.__config__ = model_type.__config__
+        self.__pre_root_validators__ = model_type.__pre_root_validators__
+        self.__post_root_validators__ = model_type.__post_root_validators__
+        self.__fields__ = dict(model_type.__fields__)
+        for name in batch_names:
+            field = copy.copy(self.__fields__[name])
+            # Only the converter is skipped; post validators still run
+            field.validators = [_already_converted]
+            self.__fields__[name] = field
+
+
+def _batch_fields(
+    model_type: Type[BaseModel],
+) -> List[Tuple[str, Tuple[str, ...], Type[FieldConverter]]]:
+    """
+    :return: the name, input keys (in the order `validate_model` looks them
+        up), and converter of each top-level field whose values can be
+        converted in batches before the model is validated
+    """
+    if (
+        model_type.__pre_root_validators__
+        or model_type.__init__ is not BaseModel.__init__
+        or model_type.parse_obj.__func__ is not BaseModel.parse_obj.__func__
+    ):
+        # Pre root validators would see converted values instead of raw
+        # ones, and custom constructors have to be called
+        return []
+
+    fields = []
+    for field in model_type.__fields__.values():
+        if (
+            field.shape != SHAPE_SINGLETON
+            or field.sub_fields
+            or field.pre_validators
+            or any(v.each_item for v in field.class_validators.values())
+            or not isinstance(field.type_, type)
+            or not issubclass(field.type_, FieldConverter)
+        ):
+            continue
+        keys: Tuple[str, ...] = (field.alias,)
+        if model_type.__config__.allow_population_by_field_name and field.alt_alias:
+            keys += (field.name,)
+        fields.append((field.name, keys, field.type_))
+    return fields
+
+
+def _convert_chunk(
+    records: List[Dict[str, Any]],
+    batch_fields: List[Tuple[str, Tuple[str, ...], Type[FieldConverter]]],
+) -> Set[int]:
+    """
+    Replace the raw values of the batched fields in `records` with their
+    converted values.
+
+    :return: the IDs of the records which any value failed to convert for.
+        Their raw values are left as they are, so validating them as usual
+        reports the errors.
+    """
+    # (indices of records with a value, their keys, raw values)
+    batches: List[Tuple[List[int], List[str], List[Any]]] = []
+    failed: Set[int] = set()
+    for _, keys, converter in batch_fields:
+        indices = []
+        value_keys = []
+        values = []
+        for idx, record in enumerate(records):
+            for key in keys:
+                # Like validate_model, the first key present is used, even
+                # if its value is None
+                if key in record:
+                    value = record[key]
+                    if value is not None:
+                        indices.append(idx)
+                        value_keys.append(key)
+                        values.append(value)
+                    break
+        if not values:
+            continue
+
+        results, errors = converter.convert_many(values)
+        for idx, key, result in zip(indices, value_keys, results):
+            records[idx][key] = result
+        for value_idx in errors:
+            failed.add(indices[value_idx])
+        batches.append((indices, value_keys, values))
+
+    if failed:
+        # Put back every raw value of the records which failed
+        for indices, value_keys, values in batches:
+            for idx, key, value in zip(indices, value_keys, values):
+                if idx in failed:
+                    records[idx][key] = value
+    return {id(records[idx]) for idx in failed}
+
+
+def _validate_converted(
+    model_type: Type[T_Model], batched_model: _BatchedModel, record: Dict[str, Any]
+) -> T_Model:
+    # What BaseModel.__init__ does, without converting the batched values
+    # again
+    values, fields_set, error = validate_model(batched_model, record, model_type)
+    if error:
+        raise error
+    model = model_type.__new__(model_type)
+    object.__setattr__(model, "__dict__", values)
+    object.__setattr__(model, "__fields_set__", fields_set)
+    model._init_private_attributes()
+    return model
+
+
+def _iter_lines(fp: Any) -> Iterator[Union[str, bytes]]:
+    # Memory-mapped files have readline but can't be iterated over by line
+    readline: Callable[[], Union[str, bytes]] = fp.readline
+    while True:
+        line = readline()
+        if not line:
+            return
+        yield line
+
+
+def _load_path(
+    model_type: Type[T_Model], path: Union[str, "os.PathLike[str]"], chunk_size: int
+) -> Iterator[Union[T_Model, Tuple[int, Exception]]]:
+    with open(path, "rb") as fp:
+        yield from _load_chunks(model_type, _iter_lines(fp), chunk_size)
+
+
+def _load_chunks(
+    model_type: Type[T_Model], lines: Iterator[Union[str, bytes]], chunk_size: int
+) -> Iterator[Union[T_Model, Tuple[int, Exception]]]:
+    batch_fields = _batch_fields(model_type)
+    batched_model = _BatchedModel(model_type, {name for name, _, _ in batch_fields})
+    line_no = 0
+    while True:
+        # Each item is (line number, record or error)
+        chunk: List[Tuple[int, Any]] = []
+        records: List[Dict[str, Any]] = []
+        for line in lines:
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                if isinstance(line, bytes):
+                    line = line.decode("utf-8")
+                record = _decode_json(line)
+            except ValueError as e:
+                # Includes UnicodeDecodeError
+                chunk.append((line_no, e))
+            else:
+                chunk.append((line_no, record))
+                if isinstance(record, dict):
+                    records.append(record)
+            if len(chunk) >= chunk_size:
+                break
+
+        if not chunk:
+            return
+
+        failed: Set[int] = set()
+        if batch_fields and records:
+            failed = _convert_chunk(records, batch_fields)
+
+        for record_line_no, record in chunk:
+            if isinstance(record, Exception):
+                yield record_line_no, record
+                continue
+            try:
+                if (
+                    batch_fields
+                    and isinstance(record, dict)
+                    and id(record) not in failed
+                ):
+                    yield _validate_converted(model_type, batched_model, record)
+                else:
+                    yield model_type.parse_obj(record)
+            except ValueError as e:
+                # Includes ValidationError
+                yield record_line_no, e
+
+        # Don't hold on to this chunk while reading the next one
+        del chunk, records, failed
+
+
+def load_jsonl(
+    model_type: Type[T_Model],
+    source: T_Source,
+    *,
+    chunk_size: int = JSONL_CHUNK_SIZE,
+) -> Iterator[Union[T_Model, Tuple[int, Exception]]]:
+    """
+    Load models from a JSON lines file (one JSON object per line), a chunk of
+    lines at a time, so only one chunk of raw records is in memory at once.
+
+    Top-level `FieldConverter` fields (e.g. `TimeField`) are converted for
+    the whole chunk with `FieldConverter.convert_many`, and the rest of each
+    model is validated as usual around the converted values. Blank lines are
+    skipped.
+
+    :param model_type: the model to validate each line as
+    :param source: a path, or anything with a `readline` method, like an
+        open file (text or binary) or an `mmap.mmap`. Files passed in aren't
+        closed.
+    :param chunk_size: how many lines to parse and convert at a time
+    :return: an iterator of the models in the order of their lines, or
+        `(line_no, error)` in place of lines which aren't valid JSON or fail
+        validation. Line numbers start at 1.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    if isinstance(source, (str, os.PathLike)):
+        return _load_path(model_type, source, chunk_size)
+    return _load_chunks(model_type, _iter_lines(source), chunk_size)
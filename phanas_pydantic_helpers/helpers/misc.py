@@ -1,16 +1,174 @@
-__all__ = ["update_forward_refs_recursive"]
+__all__ = [
+    "update_forward_refs_recursive",
+    "update_module_forward_refs",
+    "ForwardRefsReport",
+]
 
-from typing import Type, TypeVar
+import importlib
+import pkgutil
+import time
+from types import ModuleType
+from weakref import WeakSet
+from typing import (
+    ForwardRef,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from pydantic import BaseModel
+from pydantic.fields import ModelField
+from pydantic.main import ModelMetaclass
+
+from phanas_pydantic_helpers.common.typing import invalidate_annotations
+from phanas_pydantic_helpers.helpers.create_template_from_model import (
+    clear_template_plan_cache,
+)
 
 T_BaseModel = TypeVar("T_BaseModel", bound=Type[BaseModel])
 
+# Models whose forward refs have all been resolved. Fields don't gain forward
+# refs after a model is created, so these never need checking again.
+_models_without_forward_refs: "WeakSet[Type[BaseModel]]" = WeakSet()
+
+
+class ForwardRefsReport(NamedTuple):
+    # How many models were looked at
+    models_visited: int
+    # How many of those had forward refs and were updated
+    models_resolved: int
+    seconds: float
+
+
+def _iter_nested_models(model: Type[BaseModel]) -> Iterator[Type[BaseModel]]:
+    # Every model class is an instance of ModelMetaclass, which is one
+    # isinstance check rather than two
+    return iter(
+        [
+            value
+            for value in model.__dict__.values()
+            if isinstance(value, ModelMetaclass)
+        ]
+    )
+
+
+def _field_has_forward_refs(field: ModelField) -> bool:
+    # Mirrors what `pydantic.typing.update_field_forward_refs` updates
+    if field.type_.__class__ is ForwardRef or field.outer_type_.__class__ is ForwardRef:
+        return True
+    if field.discriminator_key is not None:
+        return True
+    return any(_field_has_forward_refs(f) for f in field.sub_fields or ())
+
+
+def _has_forward_refs(model: Type[BaseModel]) -> bool:
+    for key in model.__config__.json_encoders:
+        if isinstance(key, (str, ForwardRef)):
+            return True
+    return any(_field_has_forward_refs(f) for f in model.__fields__.values())
+
+
+def _resolve_models(
+    models: Iterable[Type[BaseModel]], visited: Set[Type[BaseModel]]
+) -> int:
+    """
+    Update the forward refs of models and the models nested in them, skipping
+    the ones in `visited`. Nested models are updated before the models
+    they're nested in.
+
+    :return: how many models had forward refs to update
+    """
+    resolved = 0
+    for root in models:
+        if root in visited:
+            continue
+        visited.add(root)
+
+        stack: List[Tuple[Type[BaseModel], Iterator[Type[BaseModel]]]] = [
+            (root, _iter_nested_models(root))
+        ]
+        while stack:
+            model, nested = stack[-1]
+            for child in nested:
+                if child not in visited:
+                    visited.add(child)
+                    stack.append((child, _iter_nested_models(child)))
+                    break
+            else:
+                # All of this model's nested models are done
+                stack.pop()
+                if model in _models_without_forward_refs:
+                    continue
+                if _has_forward_refs(model):
+                    model.update_forward_refs(**model.__dict__)
+                    resolved += 1
+                    clear_template_plan_cache(model)
+                    invalidate_annotations(model)
+                    if _has_forward_refs(model):
+                        # Some names still aren't defined
+                        continue
+                _models_without_forward_refs.add(model)
+
+    return resolved
+
 
 def update_forward_refs_recursive(model: T_BaseModel) -> T_BaseModel:
-    for name, value in model.__dict__.items():
-        if isinstance(value, type) and issubclass(value, BaseModel):
-            update_forward_refs_recursive(value)
+    """
+    Update the forward refs of a model and all models nested in it. Names are
+    looked up in each model's namespace (e.g. its nested classes) and module.
 
-    model.update_forward_refs(**model.__dict__)
+    Each model is visited once, so models nested in each other are fine.
+    """
+    _resolve_models([model], set())
     return model
+
+
+def _iter_modules(
+    module: Union[ModuleType, str], recursive: bool
+) -> Iterator[ModuleType]:
+    if isinstance(module, str):
+        module = importlib.import_module(module)
+    yield module
+
+    path = getattr(module, "__path__", None)
+    if not recursive or path is None:
+        return
+    for info in pkgutil.walk_packages(path, f"{module.__name__}."):
+        yield importlib.import_module(info.name)
+
+
+def update_module_forward_refs(
+    *modules: Union[ModuleType, str], recursive: bool = True
+) -> ForwardRefsReport:
+    """
+    Update the forward refs of every model defined in some modules, like
+    `update_forward_refs_recursive` does for a single model.
+
+    :param modules: modules or module names. Only models defined in these
+        modules (not imported into them) are updated, along with the models
+        nested in them.
+    :param recursive: whether to also update the models in all submodules of
+        packages, importing them if needed
+    :return: how many models were updated and how long it took
+    """
+    start = time.perf_counter()
+    visited: Set[Type[BaseModel]] = set()
+    resolved = 0
+    for module in modules:
+        for submodule in _iter_modules(module, recursive):
+            models = [
+                value
+                for value in vars(submodule).values()
+                if isinstance(value, type)
+                and issubclass(value, BaseModel)
+                and value.__module__ == submodule.__name__
+            ]
+            resolved += _resolve_models(models, visited)
+
+    return ForwardRefsReport(len(visited), resolved, time.perf_counter() - start)
@@ -0,0 +1,117 @@
+__all__ = ["validate_parallel"]
+
+import itertools
+import math
+import os
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from pydantic import BaseModel, ValidationError
+
+if TYPE_CHECKING:
+    # concurrent.futures imports multiprocessing, so it's only imported when
+    # it's used
+    from concurrent.futures import Executor
+
+T_Model = TypeVar("T_Model", bound=BaseModel)
+
+# How many chunks to give each worker, so workers which finish early can pick
+# up more work
+CHUNKS_PER_WORKER = 4
+
+
+def _validate_chunk(
+    model_type: Type[T_Model], records: List[Any]
+) -> Tuple[List[Optional[T_Model]], Dict[int, ValidationError]]:
+    results: List[Optional[T_Model]] = []
+    errors: Dict[int, ValidationError] = {}
+    for idx, record in enumerate(records):
+        try:
+            results.append(model_type.parse_obj(record))
+        except ValidationError as e:
+            results.append(None)
+            errors[idx] = e
+    return results, errors
+
+
+def _iter_chunks(records: List[Any], chunksize: int) -> Iterable[List[Any]]:
+    for start in range(0, len(records), chunksize):
+        yield records[start : start + chunksize]
+
+
+def _validate_in_pool(
+    pool: "Executor", model_type: Type[T_Model], records: List[Any], chunksize: int
+) -> Tuple[List[Optional[T_Model]], Dict[int, ValidationError]]:
+    results: List[Optional[T_Model]] = []
+    errors: Dict[int, ValidationError] = {}
+    chunks = pool.map(
+        _validate_chunk,
+        itertools.repeat(model_type),
+        _iter_chunks(records, chunksize),
+    )
+    for chunk_results, chunk_errors in chunks:
+        offset = len(results)
+        results.extend(chunk_results)
+        for idx, error in chunk_errors.items():
+            errors[offset + idx] = error
+    return results, errors
+
+
+def validate_parallel(
+    model_type: Type[T_Model],
+    records: Iterable[Any],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    *,
+    executor: Optional["Executor"] = None,
+) -> Tuple[List[Optional[T_Model]], Dict[int, ValidationError]]:
+    """
+    Validate many records as `model_type` in a pool of processes.
+
+    Records and models are pickled to and from the workers, so `model_type`
+    must be importable (defined at the top level of a module), and this is
+    only worth it when validating a record costs more than pickling it.
+
+    :param model_type: the model to validate each record as
+    :param records: the raw records, e.g. dicts
+    :param workers: how many processes to use, the number of CPUs by default.
+        With 1 worker, records are validated in this process.
+    :param chunksize: how many records to send to a worker at a time. By
+        default, each worker gets about four chunks.
+    :param executor: a pool to reuse instead of starting a new one for this
+        call. `workers` only affects the default chunk size then.
+    :return: a list of models in input order (`None` where validation
+        failed), and a dict of input index to the validation error for that
+        record
+    """
+    records = records if isinstance(records, list) else list(records)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(records) / (workers * CHUNKS_PER_WORKER)))
+    elif chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+    if not records:
+        return [], {}
+    if executor is None and (workers == 1 or len(records) <= chunksize):
+        # Not worth starting any processes
+        return _validate_chunk(model_type, records)
+
+    if executor is not None:
+        return _validate_in_pool(executor, model_type, records, chunksize)
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _validate_in_pool(pool, model_type, records, chunksize)
@@ -0,0 +1,176 @@
+__all__ = ["ModelReloader"]
+
+import threading
+from typing import Any, Dict, Generic, List, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.fields import SHAPE_SINGLETON, ModelField
+from pydantic.main import ModelMetaclass
+
+T_Model = TypeVar("T_Model", bound=BaseModel)
+T_Path = Tuple[str, ...]
+
+_MISSING = object()
+
+
+def _is_reusable_model_field(field: ModelField) -> bool:
+    # Validating an instance of a model field's type doesn't validate the
+    # instance again, unless the field's pre validators change it first
+    return (
+        field.shape == SHAPE_SINGLETON
+        and not field.sub_fields
+        and not field.pre_validators
+        and isinstance(field.type_, ModelMetaclass)
+    )
+
+
+def _field_key(
+    model_type: Type[BaseModel], field: ModelField, raw: Dict[str, Any]
+) -> str:
+    if (
+        field.alias not in raw
+        and field.name in raw
+        and model_type.__config__.allow_population_by_field_name
+    ):
+        return field.name
+    return field.alias
+
+
+def _rebuild(
+    model_type: Type[T_Model],
+    model: T_Model,
+    old_raw: Dict[str, Any],
+    new_raw: Dict[str, Any],
+    path: T_Path,
+    changed: List[T_Path],
+) -> T_Model:
+    """
+    Validate `new_raw` as `model_type`, reusing the nested models of `model`
+    whose raw dicts are the same in `old_raw` and `new_raw`.
+
+    :param changed: the paths of the keys which changed are added to this
+    :raises ValidationError: with the errors of every invalid nested model,
+        located relative to `model_type` like `parse_obj`'s
+    """
+    data = dict(new_raw)
+    reused_keys = set()
+    errors: List[ErrorWrapper] = []
+
+    if not model_type.__pre_root_validators__:
+        for field in model_type.__fields__.values():
+            if not _is_reusable_model_field(field):
+                continue
+            key = _field_key(model_type, field, new_raw)
+            new_value = new_raw.get(key, _MISSING)
+            old_value = old_raw.get(key, _MISSING)
+            current = getattr(model, field.name)
+            if (
+                not isinstance(new_value, dict)
+                or not isinstance(old_value, dict)
+                or not isinstance(current, field.type_)
+            ):
+                # Added, removed, or not a model before; validate it as usual
+                continue
+
+            reused_keys.add(key)
+            if new_value == old_value:
+                data[key] = current
+                continue
+            try:
+                data[key] = _rebuild(
+                    field.type_,
+                    current,
+                    old_value,
+                    new_value,
+                    path + (key,),
+                    changed,
+                )
+            except ValidationError as e:
+                # Nest the errors under this key, and keep checking the other
+                # fields
+                errors.append(ErrorWrapper(e, loc=key))
+                data[key] = current
+
+    for key in (*new_raw, *(k for k in old_raw if k not in new_raw)):
+        if key in reused_keys:
+            continue
+        if new_raw.get(key, _MISSING) != old_raw.get(key, _MISSING):
+            changed.append(path + (key,))
+
+    if not errors:
+        return model_type.parse_obj(data)
+    try:
+        model_type.parse_obj(data)
+    except ValidationError as e:
+        errors.extend(e.raw_errors)
+    raise ValidationError(errors, model_type)
+
+
+class ModelReloader(Generic[T_Model]):
+    """
+    Holds a model validated from a raw dict (e.g. a loaded config file) and
+    reloads it from new raw dicts, re-validating only the nested models whose
+    raw values changed.
+
+    Each model on the path to a change is validated again from its raw dict,
+    but unchanged nested models are passed to it as the instances already
+    validated, which Pydantic copies instead of validating. Models with pre
+    root validators, and fields with pre validators, always get raw values.
+
+        reloader = ModelReloader(Config, json.load(f))
+        ...
+        changed = reloader.reload(json.load(f))
+        config = reloader.model
+
+    Raw dicts are compared with the next reload's, so they must not be
+    changed after they're passed in.
+
+    :param model_type: the model to validate raw dicts as
+    :param raw: the raw dict to validate first
+    """
+
+    def __init__(self, model_type: Type[T_Model], raw: Dict[str, Any]):
+        self.model_type = model_type
+        self._lock = threading.Lock()
+        self._raw = raw
+        self._model = model_type.parse_obj(raw)
+
+    @property
+    def model(self) -> T_Model:
+        """
+        The current model. Reloads replace it with a new model rather than
+        changing it, so hold on to it to keep using one version.
+        """
+        return self._model
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """
+        The raw dict the current model was validated from.
+        """
+        return self._raw
+
+    def reload(self, raw: Dict[str, Any]) -> List[T_Path]:
+        """
+        Validate a new raw dict, and replace the current model with it if it's
+        valid.
+
+        :param raw: the new raw dict
+        :return: the paths of the keys which were added, removed, or changed,
+            e.g. `[("database", "port")]`. A key whose value is a nested model
+            is only listed if it was added or removed; otherwise its changed
+            keys are listed instead. Empty if nothing changed.
+        :raises ValidationError: if the new raw dict is invalid. The current
+            model is kept.
+        """
+        with self._lock:
+            if raw is self._raw or raw == self._raw:
+                self._raw = raw
+                return []
+
+            changed: List[T_Path] = []
+            model = _rebuild(self.model_type, self._model, self._raw, raw, (), changed)
+            self._raw = raw
+            self._model = model
+            return changed
@@ -1,32 +1,164 @@
-__all__ = ["maybe_relative_path", "only_one_of"]
+__all__ = [
+    "maybe_relative_path",
+    "only_one_of",
+    "OnlyOneOf",
+    "PathStatCache",
+    "path_stat_cache",
+]
 
+import os
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple, Union
 
 from pydantic import ConfigError, root_validator, validator
 
 from phanas_pydantic_helpers.common.typing import T_MaybeList, ensure_list
 
+PATH_CACHE_SIZE = 4096
 
-def maybe_relative_path(fields: T_MaybeList[str], root_path: Path):
+
+class PathStatCache:
+    """
+    Remembers which paths exist and what they resolve to for `ttl` seconds.
+
+    Existence is checked by listing each parent directory once and looking
+    names up in the listing, so checking every file in a directory costs one
+    `os.listdir` rather than one `stat` per file. Names are compared exactly,
+    so on case-insensitive file systems a path only exists if its case
+    matches the directory entry.
+
+    :param ttl: how many seconds a directory listing or resolved path is
+        trusted for
+    :param max_size: how many directory listings and resolved paths to keep
+        before expired entries are dropped
+    """
+
+    def __init__(self, ttl: float = 5.0, max_size: int = 4096):
+        self.ttl = ttl
+        self.max_size = max_size
+        # Directory -> (expiry time, names in the directory or None if it
+        # can't be listed)
+        self._listings: Dict[str, Tuple[float, Optional[FrozenSet[str]]]] = {}
+        # Path -> (expiry time, resolved path)
+        self._resolved: Dict[Path, Tuple[float, Path]] = {}
+
+    def clear(self) -> None:
+        """
+        Forget everything, e.g. after creating or deleting files.
+        """
+        self._listings.clear()
+        self._resolved.clear()
+
+    def _store(self, cache: Dict[Any, Tuple[float, Any]], key, value, now: float):
+        if len(cache) >= self.max_size:
+            for old_key, (expires, _) in list(cache.items()):
+                if expires <= now:
+                    cache.pop(old_key, None)
+            if len(cache) >= self.max_size:
+                cache.clear()
+        # Assigning a single key is atomic, so concurrent lookups of the same
+        # path at worst do the same work twice
+        cache[key] = (now + self.ttl, value)
+
+    def _list_dir(self, directory: str) -> Optional[FrozenSet[str]]:
+        now = time.monotonic()
+        entry = self._listings.get(directory)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        try:
+            names: Optional[FrozenSet[str]] = frozenset(os.listdir(directory))
+        except OSError:
+            # It doesn't exist, isn't a directory, or we can't read it
+            names = None
+        self._store(self._listings, directory, names, now)
+        return names
+
+    def exists(self, path: Path) -> bool:
+        directory, name = os.path.split(path)
+        if not name or name == "." or name == "..":
+            # The root or a relative component, which aren't in listings
+            return path.exists()
+        names = self._list_dir(directory or ".")
+        return names is not None and name in names
+
+    def resolve(self, path: Path) -> Path:
+        now = time.monotonic()
+        entry = self._resolved.get(path)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        resolved = path.resolve()
+        self._store(self._resolved, path, resolved, now)
+        return resolved
+
+
+# The stat cache validators use unless they're given their own
+path_stat_cache = PathStatCache()
+
+
+def maybe_relative_path(
+    fields: T_MaybeList[str],
+    root_path: Path,
+    *,
+    must_exist: bool = False,
+    resolve: bool = False,
+    stat_cache: Optional[PathStatCache] = None,
+    cache_size: Optional[int] = PATH_CACHE_SIZE,
+):
+    """
+    A Pydantic validator that makes relative paths relative to `root_path`.
+
+    :param fields: the field(s) to validate
+    :param root_path: the directory relative paths are relative to
+    :param must_exist: whether to fail if the path doesn't exist
+    :param resolve: whether to make the path absolute and resolve symlinks
+    :param stat_cache: the cache used to check whether paths exist and
+        resolve them. Defaults to `path_stat_cache`, which is shared by all
+        validators.
+    :param cache_size: how many raw values to remember the joined paths of,
+        or None for no limit
+    """
     fields = ensure_list(fields)
+    root_path = Path(root_path)
+    if stat_cache is None:
+        stat_cache = path_stat_cache
 
-    def validate_fn(path: Union[Path, str]):
+    @lru_cache(maxsize=cache_size)
+    def join(path: Union[Path, str]) -> Path:
+        # Joining doesn't touch the file system, so it's safe to remember
+        # forever. Paths are immutable, so validated models can share them.
         if not isinstance(path, Path):
             path = Path(path)
         if not path.is_absolute():
             return root_path / path
         return path
 
-    return validator(*fields, allow_reuse=True)(validate_fn)
+    def validate_fn(path: Union[Path, str, None]):
+        if path is None:
+            # Let Pydantic decide whether the field is optional
+            return path
+        path = join(path)
+        if resolve:
+            path = stat_cache.resolve(path)
+        if must_exist and not stat_cache.exists(path):
+            raise ValueError(f"Path {str(path)!r} does not exist")
+        return path
 
+    # Run before Pydantic converts the value to a Path so the cache can skip
+    # that too
+    return validator(*fields, pre=True, allow_reuse=True)(validate_fn)
 
-def only_one_of(
-    *groups_of_fields: T_MaybeList[str], need_all: Union[bool, List[bool]] = True
-):
+
+class OnlyOneOf:
     """
-    A Pydantic root validator that ensures one and only one of the groups of
-    fields exists in the model.
+    Checks that one and only one of the groups of fields exists in a dict of
+    values. `only_one_of` wraps this in a Pydantic root validator.
+
+    The groups are compiled to bitmasks when this is created, so checking
+    values is a single pass over their keys.
 
     :param groups_of_fields: the groups of fields that you want one and only
         one of. Each group may be either a list of field names or a single
@@ -36,39 +168,69 @@ def only_one_of(
         each item will be matched up with the corresponding field group from
         `groups_of_fields` (the list lengths must match).
     """
-    if isinstance(need_all, list) and len(need_all) != len(groups_of_fields):
-        raise ConfigError(
-            "`need_all` must either be a bool or a list of bools of the same "
-            "length as `groups_of_fields`"
-        )
 
-    groups_of_fields = list(groups_of_fields)
-    for idx, group in enumerate(groups_of_fields):
-        groups_of_fields[idx] = ensure_list(group)
+    def __init__(
+        self,
+        *groups_of_fields: T_MaybeList[str],
+        need_all: Union[bool, List[bool]] = True,
+    ):
+        if isinstance(need_all, list) and len(need_all) != len(groups_of_fields):
+            raise ConfigError(
+                "`need_all` must either be a bool or a list of bools of the same "
+                "length as `groups_of_fields`"
+            )
+
+        self.groups_of_fields: List[List[str]] = [
+            ensure_list(group) for group in groups_of_fields
+        ]
+
+        # Give each field name a bit
+        self._field_bits: Dict[str, int] = {}
+        for group in self.groups_of_fields:
+            for name in group:
+                if name not in self._field_bits:
+                    self._field_bits[name] = 1 << len(self._field_bits)
 
-    def validate_fn(cls, values: Dict[str, Any]):
+        # (mask of the group's fields, whether the group needs all of them)
+        self._groups: List[Tuple[int, bool]] = []
+        for idx, group in enumerate(self.groups_of_fields):
+            mask = 0
+            for name in group:
+                mask |= self._field_bits[name]
+            required = need_all[idx] if isinstance(need_all, list) else need_all
+            self._groups.append((mask, bool(required)))
+
+    def _get_present(self, values: Mapping[str, Any]) -> int:
+        get_bit = self._field_bits.get
+        present = 0
+        for key in values:
+            present |= get_bit(key, 0)
+        return present
+
+    def _get_error(self, present: int) -> Optional[ValueError]:
         a_group_succeeded = False
 
-        for idx, group in enumerate(groups_of_fields):
-            required: bool = need_all[idx] if isinstance(need_all, list) else need_all
-            existing_fields = [name in values for name in group]
+        for idx, (mask, required) in enumerate(self._groups):
+            found_mask = present & mask
 
             # Ignore if no fields exist
-            if not any(existing_fields):
+            if not found_mask:
                 continue
 
             # Two groups coexist, not allowed!
             if a_group_succeeded:
-                raise ValueError(
+                return ValueError(
                     f"Only one of the following groups of fields is allowed: "
-                    f"{', '.join(map(str, groups_of_fields))}"
+                    f"{', '.join(map(str, self.groups_of_fields))}"
                 )
 
             # Check that all fields exist if that was requested
-            if required and not all(existing_fields):
-                found = [name for name in group if name in values]
-                missing = [name for name in group if name not in values]
-                raise ValueError(
+            if required and found_mask != mask:
+                group = self.groups_of_fields[idx]
+                bits = self._field_bits
+                found = [name for name in group if present & bits[name]]
+                missing = [name for name in group if not present & bits[name]]
+                return ValueError(
                     f"The fields {found} exist, but the following are also "
                     f"required and missing: {missing}"
                 )
@@ -77,11 +239,71 @@ def only_one_of(
             a_group_succeeded = True
 
         if not a_group_succeeded:
-            raise ValueError(
+            return ValueError(
                 f"One and only one of the following groups must exist: "
-                f"{', '.join(map(str, groups_of_fields))}"
+                f"{', '.join(map(str, self.groups_of_fields))}"
             )
+        return None
+
+    def check(self, values: Mapping[str, Any]) -> None:
+        """
+        :param values: the values to check, e.g. the input to a model
+        :raises ValueError: if not exactly one group of fields exists
+        """
+        error = self._get_error(self._get_present(values))
+        if error is not None:
+            raise error
 
-        return values
+    def check_many(
+        self, values_list: Iterable[Mapping[str, Any]]
+    ) -> Dict[int, ValueError]:
+        """
+        Check many dicts of values at once, e.g. a batch of inputs before
+        creating models from them.
 
-    return root_validator(pre=True, allow_reuse=True)(validate_fn)
+        :param values_list: the dicts of values to check
+        :return: a dict of the index of each failing dict to its error
+        """
+        errors: Dict[int, ValueError] = {}
+        # The result only depends on which fields are present, so check each
+        # combination once
+        errors_by_present: Dict[int, Optional[ValueError]] = {}
+        for idx, values in enumerate(values_list):
+            present = self._get_present(values)
+            try:
+                error = errors_by_present[present]
+            except KeyError:
+                error = errors_by_present[present] = self._get_error(present)
+            if error is not None:
+                errors[idx] = error
+        return errors
+
+    def validator(self):
+        """
+        Make a Pydantic root validator which runs this check.
+        """
+        check = self.check
+
+        def validate_fn(cls, values: Dict[str, Any]):
+            check(values)
+            return values
+
+        return root_validator(pre=True, allow_reuse=True)(validate_fn)
+
+
+def only_one_of(
+    *groups_of_fields: T_MaybeList[str], need_all: Union[bool, List[bool]] = True
+):
+    """
+    A Pydantic root validator that ensures one and only one of the groups of
+    fields exists in the model.
+
+    :param groups_of_fields: the groups of fields that you want one and only
+        one of. Each group may be either a list of field names or a single
+        field name.
+    :param need_all: whether the groups need all fields or just one to succeed.
+        If this arg is a bool, apply to all fields. If it's a list of bools,
+        each item will be matched up with the corresponding field group from
+        `groups_of_fields` (the list lengths must match).
+    """
+    return OnlyOneOf(*groups_of_fields, need_all=need_all).validator()
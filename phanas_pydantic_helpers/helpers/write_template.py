@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+__all__ = ["write_template", "TEMPLATE_FORMATS"]
+
+import json
+import math
+import re
+from typing import Callable, Hashable, Iterator, List, Optional, TextIO
+
+from pydantic import BaseModel
+
+from phanas_pydantic_helpers.helpers.create_template_from_model import (
+    END_ARRAY,
+    END_MAP,
+    MAP_KEY,
+    SCALAR,
+    START_ARRAY,
+    START_MAP,
+    TemplateEvent,
+    empty_template_stub,
+    iter_template_events,
+)
+
+TEMPLATE_FORMATS = ("json", "yaml", "toml")
+
+_BARE_YAML_KEY = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_YAML_RESERVED_WORDS = frozenset(
+    ("y", "n", "yes", "no", "on", "off", "true", "false", "null")
+)
+_BARE_TOML_KEY = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class _Events:
+    """
+    An iterator of template events that can look ahead one event.
+    """
+
+    def __init__(self, events: Iterator[TemplateEvent]):
+        self._events = events
+        self._peeked: Optional[TemplateEvent] = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> TemplateEvent:
+        if self._peeked is not None:
+            event, self._peeked = self._peeked, None
+            return event
+        return next(self._events)
+
+    def peek(self) -> TemplateEvent:
+        if self._peeked is None:
+            self._peeked = next(self._events)
+        return self._peeked
+
+
+def _json_scalar(value: object) -> str:
+    return json.dumps(value, default=str)
+
+
+def _json_key(key: Hashable) -> str:
+    # Convert keys the same way `json.dumps` does
+    if not isinstance(key, str):
+        key = json.dumps(key) if isinstance(key, (bool, int, float)) else str(key)
+    return json.dumps(key)
+
+
+def _write_json(events: _Events, fp: TextIO, indent: int) -> None:
+    # Each item is [is map, number of items written]
+    stack: List[list] = []
+    for event in events:
+        kind = event.kind
+        depth = len(stack)
+
+        if kind == MAP_KEY:
+            frame = stack[-1]
+            fp.write(f"{',' if frame[1] else ''}\n{' ' * indent * depth}")
+            fp.write(f"{_json_key(event.value)}: ")
+            frame[1] += 1
+            continue
+
+        if kind == END_MAP or kind == END_ARRAY:
+            frame = stack.pop()
+            if frame[1]:
+                fp.write(f"\n{' ' * indent * (depth - 1)}")
+            fp.write("}" if kind == END_MAP else "]")
+            continue
+
+        if stack and not stack[-1][0]:
+            # This is an item of an array
+            frame = stack[-1]
+            fp.write(f"{',' if frame[1] else ''}\n{' ' * indent * depth}")
+            frame[1] += 1
+
+        if kind == SCALAR:
+            fp.write(_json_scalar(event.value))
+        elif kind == START_MAP:
+            fp.write("{")
+            stack.append([True, 0])
+        elif kind == START_ARRAY:
+            fp.write("[")
+            stack.append([False, 0])
+
+    fp.write("\n")
+
+
+def _yaml_scalar(value: object) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ".nan"
+        if math.isinf(value):
+            return ".inf" if value > 0 else "-.inf"
+        text = repr(value)
+        if "e" in text and "." not in text:
+            # YAML 1.1 floats need a decimal point, e.g. "1.0e+20"
+            mantissa, exponent = text.split("e")
+            text = f"{mantissa}.0e{exponent}"
+        return text
+    return _json_scalar(value)
+
+
+def _yaml_key(key: Hashable) -> str:
+    if isinstance(key, str):
+        if _BARE_YAML_KEY.match(key) and key.lower() not in _YAML_RESERVED_WORDS:
+            return key
+        return json.dumps(key)
+    return _yaml_scalar(key)
+
+
+def _write_yaml(events: _Events, fp: TextIO, indent: int) -> None:
+    # The indent of each open container's items
+    stack: List[int] = []
+    # Whether each open container is an array
+    is_array: List[bool] = []
+    # The marker (":" or "-") written just before the next value, if any
+    marker = ""
+    # Whether the next line continues the current one (after "- ")
+    inline = False
+
+    for event in events:
+        kind = event.kind
+
+        if kind == END_MAP or kind == END_ARRAY:
+            stack.pop()
+            is_array.pop()
+            continue
+
+        if kind == MAP_KEY:
+            fp.write(" " if inline else " " * stack[-1])
+            fp.write(f"{_yaml_key(event.value)}:")
+            marker = ":"
+            inline = False
+            continue
+
+        if is_array and is_array[-1]:
+            fp.write(" " if inline else " " * stack[-1])
+            fp.write("-")
+            marker = "-"
+            inline = False
+
+        separator = " " if marker else ""
+        if kind == SCALAR:
+            fp.write(f"{separator}{_yaml_scalar(event.value)}\n")
+        else:
+            end_kind = END_MAP if kind == START_MAP else END_ARRAY
+            if events.peek().kind == end_kind:
+                next(events)
+                fp.write(f"{separator}{'{}' if kind == START_MAP else '[]'}\n")
+            elif marker == "-":
+                # Start the container on the same line as its "-", and line
+                # its other items up with the first
+                stack.append(stack[-1] + 2)
+                is_array.append(kind == START_ARRAY)
+                inline = True
+            else:
+                if marker == ":":
+                    fp.write("\n")
+                stack.append(stack[-1] + indent if stack else 0)
+                is_array.append(kind == START_ARRAY)
+        marker = ""
+
+
+def _toml_key(key: Hashable) -> str:
+    key = key if isinstance(key, str) else _json_key(key)[1:-1]
+    if _BARE_TOML_KEY.match(key):
+        return key
+    return json.dumps(key)
+
+
+def _toml_scalar(value: object) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "nan"
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf"
+        return repr(value)
+    if not isinstance(value, str):
+        value = str(value)
+    return json.dumps(value)
+
+
+def _write_toml(events: _Events, fp: TextIO) -> None:
+    first = next(events)
+    if first.kind != START_MAP:
+        raise ValueError("TOML templates must be tables")
+
+    # Each frame is [kind, path or items written]
+    # kind is "table", "tables" (an array of tables) or "inline"
+    stack: List[list] = [["table", ()]]
+    # Inline containers are written as "[...]" or "{...}" on one line, and
+    # are tracked as [is map, items written]
+    inline: List[list] = []
+    key: Optional[Hashable] = None
+    wrote_anything = False
+
+    def write_header(header: str) -> None:
+        nonlocal wrote_anything
+        if wrote_anything:
+            # Separate tables with a blank line
+            fp.write("\n")
+        fp.write(f"{header}\n")
+        wrote_anything = True
+
+    for event in events:
+        kind = event.kind
+
+        if inline:
+            frame = inline[-1]
+            if kind == MAP_KEY:
+                key = event.value
+                continue
+            if kind == END_MAP or kind == END_ARRAY:
+                inline.pop()
+                if not frame[0]:
+                    fp.write("]")
+                elif frame[1]:
+                    fp.write(" }")
+                else:
+                    fp.write("}")
+                if not inline:
+                    fp.write("\n")
+                continue
+            if kind == SCALAR and event.value is None:
+                # TOML has no null, so leave it out
+                continue
+            if frame[1]:
+                fp.write(", ")
+            elif frame[0]:
+                fp.write(" ")
+            frame[1] += 1
+            if frame[0]:
+                fp.write(f"{_toml_key(key)} = ")
+            if kind == SCALAR:
+                fp.write(_toml_scalar(event.value))
+            else:
+                fp.write("{" if kind == START_MAP else "[")
+                inline.append([kind == START_MAP, 0])
+            continue
+
+        frame = stack[-1]
+        if kind == MAP_KEY:
+            key = event.value
+            continue
+        if kind == END_MAP or kind == END_ARRAY:
+            stack.pop()
+            continue
+
+        if frame[0] == "tables":
+            # Every item of an array of tables must be a table
+            if kind != START_MAP:
+                raise ValueError(
+                    f"TOML arrays of tables can't contain other values "
+                    f"(at {'.'.join(map(str, event.path))})"
+                )
+            write_header(f"[[{'.'.join(map(_toml_key, frame[1]))}]]")
+            stack.append(["table", frame[1]])
+            continue
+
+        # We're in a table and just read a key
+        path = frame[1] + (key,)
+        if kind == SCALAR:
+            if event.value is not None:
+                fp.write(f"{_toml_key(key)} = {_toml_scalar(event.value)}\n")
+                wrote_anything = True
+        elif kind == START_MAP:
+            write_header(f"[{'.'.join(map(_toml_key, path))}]")
+            stack.append(["table", path])
+        elif events.peek().kind == START_MAP:
+            stack.append(["tables", path])
+        else:
+            fp.write(f"{_toml_key(key)} = [")
+            inline.append([False, 0])
+            wrote_anything = True
+
+
+def write_template(
+    model_type: type[BaseModel],
+    fp: TextIO,
+    format: str = "json",
+    *,
+    indent: int = 2,
+    on_cycle: Callable[[type[BaseModel]], object] = empty_template_stub,
+) -> None:
+    """
+    Write the template of a model to a file as it's generated, without
+    building the whole template in memory first.
+
+    :param model_type: the model to create a template for
+    :param fp: a text file to write to
+    :param format: one of "json", "yaml", or "toml"
+    :param indent: the number of spaces to indent nested values by (JSON and
+        YAML only)
+    :param on_cycle: see `create_template_from_model`
+    """
+    if format not in TEMPLATE_FORMATS:
+        raise ValueError(
+            f"Unknown template format {format!r}, must be one of {TEMPLATE_FORMATS}"
+        )
+
+    events = _Events(
+        iter_template_events(
+            model_type, on_cycle=on_cycle, scalars_first=format == "toml"
+        )
+    )
+    if format == "json":
+        _write_json(events, fp, indent)
+    elif format == "yaml":
+        _write_yaml(events, fp, indent)
+    else:
+        _write_toml(events, fp)
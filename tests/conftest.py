@@ -0,0 +1,19 @@
+from phanas_pydantic_helpers.common.imports import PYDANTIC_V1
+
+# Only field converters and the time fields support Pydantic v2, so the other
+# helpers' tests only run on v1
+collect_ignore = (
+    []
+    if PYDANTIC_V1
+    else [
+        "test_benchmarks.py",
+        "test_create_template_from_model.py",
+        "test_factory.py",
+        "test_jsonl.py",
+        "test_misc.py",
+        "test_parallel.py",
+        "test_reload.py",
+        "test_validators.py",
+        "test_write_template.py",
+    ]
+)
@@ -0,0 +1,31 @@
+import json
+
+from benchmarks.__main__ import main
+from benchmarks.suite import CASES, run
+
+
+def test_every_case_runs():
+    # Skip the import case, it starts new interpreters
+    patterns = [name for name in CASES if name != "import"]
+    results = run(patterns, number=1, repeat=1)
+
+    assert [r["name"] for r in results] == patterns
+    for result in results:
+        if "skipped" not in result:
+            assert result["seconds"] > 0
+            assert result["baseline_seconds"] > 0
+
+
+def test_filter():
+    results = run(["template.wide*"], number=1, repeat=1)
+    assert [r["name"] for r in results] == ["template.wide", "template.wide.cold"]
+
+
+def test_json_output(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    assert main(["only_one_of", "-n", "1", "-r", "1", "-o", str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    assert report["number"] == 1
+    assert [r["name"] for r in report["results"]] == ["only_one_of"]
+    assert "only_one_of" in capsys.readouterr().out
@@ -0,0 +1,147 @@
+import math
+
+import pytest
+
+from pydantic import BaseModel, ValidationError
+
+from phanas_pydantic_helpers import (
+    ConverterStats,
+    FieldConverter,
+    set_converter_observer,
+)
+from phanas_pydantic_helpers.common.imports import PYDANTIC_V1
+
+# Pydantic v2 rejects values without a converter before calling the
+# converter, so they aren't recorded as misses
+v1_misses = pytest.mark.skipif(not PYDANTIC_V1, reason="Pydantic v1 only")
+
+
+class ToInt(int, FieldConverter):
+    @classmethod
+    def _pyd_convert_str(cls, value: str) -> int:
+        return int(value)
+
+    @classmethod
+    def _pyd_convert_int(cls, value: int) -> int:
+        return value
+
+
+class Model(BaseModel):
+    x: ToInt
+
+
+@pytest.fixture(autouse=True)
+def no_observer():
+    previous = set_converter_observer(None)
+    yield
+    set_converter_observer(previous)
+
+
+@v1_misses
+def test_records():
+    with ConverterStats() as stats:
+        Model(x="1")
+        Model(x="2")
+        Model(x=3)
+        with pytest.raises(ValidationError):
+            Model(x="x")
+        with pytest.raises(ValidationError):
+            Model(x=1.5)
+
+    str_stats = stats[ToInt, str]
+    assert str_stats.calls == 3
+    assert str_stats.errors == 1
+    assert str_stats.misses == 0
+    assert str_stats.total_seconds > 0
+    assert 0 < str_stats.percentile(0.5) <= str_stats.percentile(1)
+
+    assert stats[ToInt, int].calls == 1
+    assert stats[ToInt, float].misses == 1
+    assert stats[ToInt, float].errors == 1
+    assert len(stats) == 3
+
+
+def test_only_records_while_installed():
+    stats = ConverterStats()
+    Model(x="1")
+    with stats:
+        Model(x="1")
+    Model(x="1")
+    assert stats[ToInt, str].calls == 1
+
+
+def test_restores_previous_observer():
+    outer = ConverterStats()
+    with outer:
+        with ConverterStats() as inner:
+            Model(x="1")
+        Model(x="1")
+
+    assert inner[ToInt, str].calls == 1
+    assert outer[ToInt, str].calls == 1
+
+
+def test_convert_many():
+    with ConverterStats() as stats:
+        ToInt.convert_many(["1", "x", 2, None])
+
+    assert stats[ToInt, str].calls == 2
+    assert stats[ToInt, str].errors == 1
+    assert stats[ToInt, type(None)].misses == 1
+
+
+def test_percentile_empty():
+    stats = ConverterStats()
+    with stats:
+        Model(x="1")
+    stats[ToInt, str].samples.clear()
+    assert math.isnan(stats[ToInt, str].percentile(0.5))
+
+
+def test_max_samples():
+    with ConverterStats(max_samples=2) as stats:
+        for _ in range(5):
+            Model(x="1")
+    assert stats[ToInt, str].calls == 5
+    assert len(stats[ToInt, str].samples) == 2
+
+
+@v1_misses
+def test_prometheus():
+    with ConverterStats() as stats:
+        Model(x="1")
+        with pytest.raises(ValidationError):
+            Model(x=1.5)
+
+    text = stats.to_prometheus(quantiles=[0.5])
+    converter = f"{__name__}.ToInt"
+    assert "# TYPE phanas_field_converter_seconds summary" in text
+    assert (
+        f'phanas_field_converter_seconds_count{{converter="{converter}",'
+        f'input_type="str"}} 1'
+    ) in text
+    assert (
+        f'phanas_field_converter_misses_total{{converter="{converter}",'
+        f'input_type="float"}} 1'
+    ) in text
+    assert 'input_type="str",quantile="0.5"}' in text
+    assert text.endswith("\n")
+
+
+def test_reset():
+    with ConverterStats() as stats:
+        Model(x="1")
+    stats.reset()
+    assert len(stats) == 0
+
+
+def test_iter_while_recording():
+    with ConverterStats() as stats:
+        Model(x="1")
+        keys = []
+        for key in stats:
+            # A new key is recorded while iterating
+            Model(x=2)
+            keys.append(key)
+    assert keys == [(ToInt, str)]
+    assert set(stats) == {(ToInt, str), (ToInt, int)}
@@ -1,14 +1,18 @@
+import sys
 from typing import Any, Dict, List
 from unittest.mock import patch
 
-from pydantic import BaseModel
+from pydantic import BaseModel, create_model
 import pytest
 from typing_extensions import Protocol
 
 from phanas_pydantic_helpers import (
     Factory,
     FieldConverter,
+    clear_template_plan_cache,
+    converter_union,
     create_template_from_model,
+    update_forward_refs_recursive,
 )
 from phanas_pydantic_helpers.helpers import create_template_model_module
 
@@ -257,6 +261,36 @@ class TestFieldConverter:
 
         assert create_template_from_model(Model) == {"to_container": 0}
 
+    def test_inherited_converters(self):
+        class IntToStr(str, FieldConverter):
+            @classmethod
+            def _pyd_convert(cls, value: int):
+                return cls(value)
+
+        class Subclass(IntToStr):
+            pass
+
+        class Model(BaseModel):
+            value: Subclass
+
+        assert create_template_from_model(Model) == {"value": 0}
+
+    def test_converter_union(self):
+        class IntToStr(str, FieldConverter):
+            @classmethod
+            def _pyd_convert(cls, value: int):
+                return cls(value)
+
+        class BytesToStr(str, FieldConverter):
+            @classmethod
+            def _pyd_convert(cls, value: bytes):
+                return value.decode()
+
+        class Model(BaseModel):
+            value: converter_union(IntToStr, BytesToStr)
+
+        assert create_template_from_model(Model) == {"value": 0}
+
     def test_mro(self):
         class ContainerProto(Protocol):
             value: int
@@ -274,3 +308,166 @@ class TestFieldConverter:
             int_to_container_proto_impl: IntToContainerProtoImpl
 
         assert create_template_from_model(Model) == {"int_to_container_proto_impl": 0}
+
+
+class TestPlanCache:
+    def test_templates_are_independent(self, phana):
+        class Model(BaseModel):
+            names: List[str]
+            defaults: List[str] = [phana]
+
+        first = create_template_from_model(Model)
+        first["names"].append("extra")
+        first["defaults"].append("extra")
+
+        assert create_template_from_model(Model) == {
+            "names": ["NAMES"],
+            "defaults": [phana],
+        }
+        assert Model.__fields__["defaults"].default == [phana]
+
+    def test_nested_model_reused(self):
+        class Person(BaseModel):
+            name: str
+
+        class Model(BaseModel):
+            a: Person
+            b: List[Person]
+
+        create_template_from_model(Person)
+        assert create_template_from_model(Model) == {
+            "a": {"name": "NAME"},
+            "b": [{"name": "NAME"}],
+        }
+
+    def test_clear(self):
+        class Model(BaseModel):
+            person: "Person"
+
+            class Person(BaseModel):
+                name: str
+
+        update_forward_refs_recursive(Model)
+        assert create_template_from_model(Model) == {"person": {"name": "NAME"}}
+
+        # Pretend the model changed
+        Model.__fields__["person"].required = False
+        Model.__fields__["person"].default = None
+        assert create_template_from_model(Model) == {"person": {"name": "NAME"}}
+        clear_template_plan_cache(Model)
+        assert create_template_from_model(Model) == {"person": None}
+
+    def test_cleared_after_forward_refs_updated(self, monkeypatch):
+        class Model(BaseModel):
+            # Not defined yet, so Pydantic leaves this unresolved
+            person: "LatePerson"
+
+        class OldPerson(BaseModel):
+            name: str
+
+        class NewPerson(BaseModel):
+            id: int
+
+        # The plan is built while the field is still a forward ref for
+        # Pydantic, with whatever the name refers to at the time
+        monkeypatch.setitem(globals(), "LatePerson", OldPerson)
+        assert create_template_from_model(Model) == {"person": {"name": "NAME"}}
+
+        monkeypatch.setitem(globals(), "LatePerson", NewPerson)
+        update_forward_refs_recursive(Model)
+        assert Model.__fields__["person"].type_ is NewPerson
+        assert create_template_from_model(Model) == {"person": {"id": 0}}
+
+
+class Parent(BaseModel):
+    name: str
+    child: "Child"
+
+
+class Child(BaseModel):
+    parent: Parent = Factory(Parent)
+    toys: List[str]
+
+
+class MutualA(BaseModel):
+    name: str
+    b: "MutualB"
+
+
+class MutualB(BaseModel):
+    tag: str
+    a: MutualA
+
+
+MutualA.update_forward_refs()
+
+
+class TestCycles:
+    def test_self_reference(self):
+        class Node(BaseModel):
+            name: str
+            children: List["Node"]
+
+        assert create_template_from_model(Node) == {
+            "name": "NAME",
+            "children": [{}],
+        }
+
+    def test_mutual_reference(self):
+        assert create_template_from_model(Parent) == {
+            "name": "NAME",
+            "child": {"parent": {}, "toys": ["TOYS"]},
+        }
+
+    def test_custom_stub(self):
+        class Node(BaseModel):
+            children: List["Node"]
+
+        assert create_template_from_model(
+            Node, on_cycle=lambda model_type: f"<{model_type.__name__}>"
+        ) == {"children": ["<Node>"]}
+
+    def test_deep_nesting(self):
+        depth = sys.getrecursionlimit() * 2
+        model = create_model("Leaf", name=(str, ...))
+        for i in range(depth):
+            model = create_model(f"Level{i}", child=(model, ...))
+
+        template = create_template_from_model(model)
+        for _ in range(depth):
+            template = template["child"]
+        assert template == {"name": "NAME"}
+
+
+class TestShareModels:
+    @pytest.fixture()
+    def model_cls(self):
+        class Person(BaseModel):
+            name: str
+
+        class Model(BaseModel):
+            a: Person
+            b: List[Person]
+
+        return Model
+
+    def test_shared(self, model_cls):
+        template = create_template_from_model(model_cls, share_models=True)
+        assert template == {"a": {"name": "NAME"}, "b": [{"name": "NAME"}]}
+        assert template["a"] is template["b"][0]
+
+    def test_not_shared_by_default(self, model_cls):
+        template = create_template_from_model(model_cls)
+        assert template["a"] is not template["b"][0]
+
+    def test_mutual_reference_not_shared(self):
+        class Root(BaseModel):
+            x: MutualA
+            y: MutualB
+
+        expected = {
+            "x": {"name": "NAME", "b": {"tag": "TAG", "a": {}}},
+            "y": {"tag": "TAG", "a": {"name": "NAME", "b": {}}},
+        }
+        assert create_template_from_model(Root) == expected
+        assert create_template_from_model(Root, share_models=True) == expected
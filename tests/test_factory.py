@@ -0,0 +1,207 @@
+import copy
+import pickle
+from typing import List
+
+from pydantic import BaseModel, PrivateAttr, validator
+
+from phanas_pydantic_helpers import (
+    Factory,
+    LazyFactory,
+    create_template_from_model,
+    instance_list_factory,
+    prototype_list_factory,
+)
+
+
+class Config(BaseModel):
+    token: str
+
+    class _ExtraInfo(BaseModel):
+        name: str = "Unnamed"
+        tags: List[str] = ["default"]
+
+        class _Inner(BaseModel):
+            value: int = 1
+
+        inner: _Inner = LazyFactory(_Inner)
+
+    extra_info: _ExtraInfo = LazyFactory(_ExtraInfo)
+
+
+class TestFactory:
+    def test_factory(self):
+        class Model(BaseModel):
+            values: List[int] = Factory(list)
+
+        a = Model()
+        a.values.append(1)
+        assert Model().values == []
+
+
+class TestLazyFactory:
+    def test_defaults(self):
+        config = Config(token="a")
+        assert isinstance(config.extra_info, Config._ExtraInfo)
+        assert config.extra_info.name == "Unnamed"
+        assert config.extra_info.tags == ["default"]
+        assert config.extra_info.inner.value == 1
+
+    def test_shared_until_written(self):
+        a = Config(token="a")
+        b = Config(token="b")
+        assert a.extra_info.__dict__ is b.extra_info.__dict__
+
+        a.extra_info.name = "Changed"
+        assert a.extra_info.name == "Changed"
+        assert a.extra_info.__fields_set__ == {"name"}
+        assert b.extra_info.name == "Unnamed"
+        assert Config(token="c").extra_info.name == "Unnamed"
+
+    def test_mutable_values_not_shared(self):
+        a = Config(token="a")
+        a.extra_info.tags.append("new")
+        a.extra_info.inner.value = 2
+
+        b = Config(token="b")
+        assert a.extra_info.tags == ["default", "new"]
+        assert b.extra_info.tags == ["default"]
+        assert a.extra_info.inner.value == 2
+        assert b.extra_info.inner.value == 1
+
+    def test_serialization(self):
+        config = Config(token="a")
+        expected = {
+            "token": "a",
+            "extra_info": {
+                "name": "Unnamed",
+                "tags": ["default"],
+                "inner": {"value": 1},
+            },
+        }
+        assert config.dict() == expected
+        assert Config.parse_raw(config.json()).dict() == expected
+
+    def test_explicit_value(self):
+        config = Config(token="a", extra_info={"name": "Given"})
+        assert config.extra_info.name == "Given"
+        assert type(config.extra_info) is Config._ExtraInfo
+
+    def test_copies(self):
+        a = Config(token="a")
+
+        deep = a.copy(deep=True)
+        deep.extra_info.name = "Deep"
+        shallow = a.extra_info.copy()
+        shallow.tags.append("shallow")
+        copied = copy.deepcopy(a.extra_info)
+        copied.tags.append("copied")
+
+        assert Config(token="b").extra_info.dict() == a.extra_info.dict()
+        assert a.extra_info.name == "Unnamed"
+        assert a.extra_info.tags == ["default"]
+
+    def test_pickle(self):
+        config = pickle.loads(pickle.dumps(Config(token="a")))
+        assert type(config.extra_info) is Config._ExtraInfo
+        assert config == Config(token="a")
+
+    def test_private_attributes(self):
+        class Section(BaseModel):
+            value: int = 0
+            _cache: dict = PrivateAttr(default_factory=dict)
+
+        class Model(BaseModel):
+            section: Section = LazyFactory(Section)
+
+        first = Model()
+        second = Model()
+        assert first.section._cache == {}
+        first.section._cache["key"] = "value"
+        assert second.section._cache == {}
+        assert Model().section._cache == {}
+
+        copied = copy.deepcopy(first)
+        assert copied.section._cache == {"key": "value"}
+        copied.section._cache["key"] = "changed"
+        assert first.section._cache == {"key": "value"}
+
+    def test_template(self):
+        assert create_template_from_model(Config) == {
+            "token": "TOKEN",
+            "extra_info": {
+                "name": "Unnamed",
+                "tags": ["default"],
+                "inner": {"value": 1},
+            },
+        }
+
+
+class TestPrototypeListFactory:
+    def test_validates_once(self):
+        calls = []
+
+        class Item(BaseModel):
+            name: str
+            tags: List[str] = []
+
+            @validator("name")
+            def count(cls, value):
+                calls.append(value)
+                return value
+
+        class Model(BaseModel):
+            items: List[Item] = Factory(prototype_list_factory(Item, name="x"))
+
+        assert calls == []
+        a = Model()
+        b = Model()
+        assert calls == ["x"]
+        assert a.items == b.items == [Item(name="x")]
+        assert a.items[0] is not b.items[0]
+
+        a.items[0].tags.append("changed")
+        assert Model().items[0].tags == []
+
+    def test_other_classes(self):
+        class Thing:
+            def __init__(self, values):
+                self.values = values
+
+        make_list = prototype_list_factory(Thing, [1])
+        a, b = make_list()[0], make_list()[0]
+        a.values.append(2)
+        assert b.values == [1]
+
+    def test_matches_instance_list_factory(self):
+        class Item(BaseModel):
+            name: str = "x"
+
+        assert (
+            prototype_list_factory(Item, name="y")()
+            == instance_list_factory(Item, name="y")()
+        )
+
+    def test_nested_models_copied(self):
+        class Inner(BaseModel):
+            value: int = 0
+
+        class Item(BaseModel):
+            inner: Inner = Factory(Inner)
+
+        make_list = prototype_list_factory(Item)
+        a, b = make_list()[0], make_list()[0]
+        a.inner.value = 1
+        assert b.inner.value == 0
+
+    def test_private_attributes_copied(self):
+        class Item(BaseModel):
+            name: str = "x"
+            _seen: list = PrivateAttr(default_factory=list)
+            _label: str = PrivateAttr("item")
+
+        make_list = prototype_list_factory(Item)
+        a, b = make_list()[0], make_list()[0]
+        a._seen.append(1)
+        assert b._seen == []
+        assert make_list()[0]._seen == []
+        assert a._label == b._label == "item"
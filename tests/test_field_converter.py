@@ -1,6 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+import pytest
 
-from phanas_pydantic_helpers import FieldConverter
+from typing import Union
+
+from phanas_pydantic_helpers import (
+    FieldConverter,
+    FieldConverterError,
+    converter_union,
+)
 
 
 def test_basic():
@@ -47,3 +54,239 @@ def test_multiple_converters():
 
     m_bytes = Model(x=b"\x00\xFF")
     assert m_bytes.x == 0xFF
+
+
+def test_subclass_of_converter_type():
+    class MyStr(str):
+        pass
+
+    class StrToInt(int, FieldConverter):
+        @classmethod
+        def _pyd_convert_str(cls, value: str) -> int:
+            return int(value)
+
+    class Model(BaseModel):
+        x: StrToInt
+
+    m = Model(x=MyStr("5"))
+    assert m.x == 5
+
+
+def test_most_specific_converter_wins():
+    class ToStr(str, FieldConverter):
+        @classmethod
+        def _pyd_convert_int(cls, value: int) -> str:
+            return "int"
+
+        @classmethod
+        def _pyd_convert_bool(cls, value: bool) -> str:
+            return "bool"
+
+    class Model(BaseModel):
+        x: ToStr
+
+    assert Model(x=1).x == "int"
+    assert Model(x=True).x == "bool"
+
+
+def test_no_converter():
+    class StrToInt(int, FieldConverter):
+        @classmethod
+        def _pyd_convert_str(cls, value: str) -> int:
+            return int(value)
+
+    class Model(BaseModel):
+        x: StrToInt
+
+    with pytest.raises(ValidationError):
+        Model(x=b"5")
+    # The cached miss should fail the same way
+    with pytest.raises(ValidationError):
+        Model(x=b"5")
+
+
+def test_inherited_converters():
+    class ToInt(int, FieldConverter):
+        @classmethod
+        def _pyd_convert_str(cls, value: str) -> int:
+            return int(value)
+
+        @classmethod
+        def _pyd_convert_bytes(cls, value: bytes) -> int:
+            return int.from_bytes(value, "big")
+
+    class ToIntPlusOne(ToInt):
+        @classmethod
+        def _pyd_convert_str(cls, value: str) -> int:
+            return int(value) + 1
+
+    class Model(BaseModel):
+        x: ToIntPlusOne
+
+    assert Model(x="5").x == 6
+    assert Model(x=b"\x00\xFF").x == 0xFF
+
+
+def test_invalid_converter_raises_on_class_creation():
+    with pytest.raises(FieldConverterError):
+
+        class BadConverter(int, FieldConverter):
+            @classmethod
+            def _pyd_convert(cls, a: str, b: str) -> int:
+                return int(a + b)
+
+
+def test_convert_many():
+    class ToInt(int, FieldConverter):
+        @classmethod
+        def _pyd_convert_str(cls, value: str) -> int:
+            return int(value)
+
+        @classmethod
+        def _pyd_convert_bytes(cls, value: bytes) -> int:
+            return int.from_bytes(value, "big")
+
+    results, errors = ToInt.convert_many(["1", b"\x02", "x", 4.0, "5"])
+    assert results == [1, 2, None, None, 5]
+    assert set(errors) == {2, 3}
+    assert isinstance(errors[2], ValueError)
+    assert isinstance(errors[3], TypeError)
+
+
+def test_convert_many_empty():
+    class StrToInt(int, FieldConverter):
+        @classmethod
+        def _pyd_convert_str(cls, value: str) -> int:
+            return int(value)
+
+    assert StrToInt.convert_many(iter([])) == ([], {})
+
+
+def test_core_schema():
+    pydantic_core = pytest.importorskip("pydantic_core")
+
+    class ToStr(str, FieldConverter):
+        @classmethod
+        def _pyd_convert_int(cls, value: int) -> str:
+            return "int"
+
+        @classmethod
+        def _pyd_convert_bool(cls, value: bool) -> str:
+            return "bool"
+
+        @classmethod
+        def _pyd_convert_bytes(cls, value: bytes) -> str:
+            return value.decode()
+
+    schema = ToStr.__get_pydantic_core_schema__(ToStr, None)
+    validator = pydantic_core.SchemaValidator(schema)
+
+    assert validator.validate_python(1) == "int"
+    assert validator.validate_python(True) == "bool"
+    assert validator.validate_python(b"abc") == "abc"
+    with pytest.raises(pydantic_core.ValidationError):
+        validator.validate_python(1.5)
+    with pytest.raises(pydantic_core.ValidationError):
+        validator.validate_python(b"\xff")
+
+
+def test_core_schema_no_converters():
+    pydantic_core = pytest.importorskip("pydantic_core")
+
+    class Nothing(FieldConverter):
+        pass
+
+    schema = Nothing.__get_pydantic_core_schema__(Nothing, None)
+    validator = pydantic_core.SchemaValidator(schema)
+    with pytest.raises(pydantic_core.ValidationError, match="No converter"):
+        validator.validate_python(1)
+
+
+class StrToInt(int, FieldConverter):
+    @classmethod
+    def _pyd_convert_str(cls, value: str) -> int:
+        return int(value)
+
+
+class BytesToStr(str, FieldConverter):
+    @classmethod
+    def _pyd_convert_bytes(cls, value: bytes) -> str:
+        return value.decode()
+
+    @classmethod
+    def _pyd_convert_str(cls, value: str) -> str:
+        return f"str {value}"
+
+
+def test_accepts():
+    class MyStr(str):
+        pass
+
+    assert StrToInt.accepted_types() == (str,)
+    assert StrToInt.accepts("1")
+    assert StrToInt.accepts(MyStr("1"))
+    assert not StrToInt.accepts(1)
+    # Cached now
+    assert not StrToInt.accepts(1)
+
+
+def test_accepted_types_inherited():
+    class Both(StrToInt):
+        @classmethod
+        def _pyd_convert_bytes(cls, value: bytes) -> int:
+            return int(value)
+
+    assert Both.accepted_types() == (str, bytes)
+    assert Both.accepts(b"1")
+
+
+def test_converter_union():
+    Either = converter_union(StrToInt, BytesToStr)
+
+    class Model(BaseModel):
+        x: Either
+
+    assert Either.__name__ == "StrToIntOrBytesToStr"
+    assert set(Either.accepted_types()) == {str, bytes}
+    assert Model(x=b"abc").x == "abc"
+    # StrToInt is tried first, then BytesToStr if it fails
+    assert Model(x="5").x == 5
+    assert Model(x="abc").x == "str abc"
+    with pytest.raises(ValidationError):
+        Model(x=1.5)
+
+
+def test_converter_union_skips_other_converters(monkeypatch):
+    calls = []
+    original = StrToInt._FieldConverter__pyd_convert.__func__
+
+    def convert(cls, value):
+        calls.append(value)
+        return original(cls, value)
+
+    monkeypatch.setattr(StrToInt, "_FieldConverter__pyd_convert", classmethod(convert))
+    Either = converter_union(StrToInt, BytesToStr, name="Either")
+
+    class Model(BaseModel):
+        x: Either
+
+    assert Model(x=b"abc").x == "abc"
+    assert calls == []
+
+
+def test_converter_union_matches_union():
+    Either = converter_union(StrToInt, BytesToStr)
+
+    class UnionModel(BaseModel):
+        x: Union[StrToInt, BytesToStr]
+
+    class EitherModel(BaseModel):
+        x: Either
+
+    for value in ["5", "abc", b"abc"]:
+        assert UnionModel(x=value).x == EitherModel(x=value).x
+
+
+def test_converter_union_empty():
+    with pytest.raises(FieldConverterError):
+        converter_union()
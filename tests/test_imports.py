@@ -0,0 +1,68 @@
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+from phanas_pydantic_helpers.common.imports import PYDANTIC_V1
+
+ROOT = Path(__file__).parents[1]
+
+
+def run_python(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def test_import_does_not_load_optional_deps():
+    names = "Factory, FieldConverter, only_one_of" if PYDANTIC_V1 else "FieldConverter"
+    loaded = run_python(
+        "import sys\n"
+        "import phanas_pydantic_helpers\n"
+        f"from phanas_pydantic_helpers import {names}\n"
+        "print(sorted({'pendulum', 'pytimeparse', 'concurrent.futures', "
+        "'multiprocessing'} & set(sys.modules)))\n"
+    )
+    assert loaded == "[]"
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "DateTimeField",
+        "TimeField",
+        "DurationField",
+        "TIME_JSON_ENCODERS",
+        "dump_many",
+        "parse_time",
+        "parse_duration",
+        "parse_datetime",
+    ],
+)
+def test_lazy_attributes(name):
+    pytest.importorskip("pendulum")
+    import phanas_pydantic_helpers
+
+    assert name in dir(phanas_pydantic_helpers)
+    assert name in phanas_pydantic_helpers.__all__
+    assert getattr(phanas_pydantic_helpers, name) is not None
+
+
+def test_star_import():
+    pytest.importorskip("pendulum")
+    namespace = {}
+    exec("from phanas_pydantic_helpers import *", namespace)
+    assert "TimeField" in namespace
+    assert ("Factory" in namespace) == PYDANTIC_V1
+
+
+def test_missing_attribute():
+    import phanas_pydantic_helpers
+
+    with pytest.raises(AttributeError):
+        phanas_pydantic_helpers.NotAThing
@@ -0,0 +1,210 @@
+import io
+import json
+import mmap
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel, Field, ValidationError, validator
+
+from phanas_pydantic_helpers import FieldConverter, converter_union, load_jsonl
+
+
+class Number(int, FieldConverter):
+    calls = 0
+
+    @classmethod
+    def _pyd_convert_str(cls, value: str):
+        Number.calls += 1
+        return cls(value.strip())
+
+
+class Celsius(FieldConverter):
+    # Converts to a plain float, not an instance of this class
+    @classmethod
+    def _pyd_convert_str(cls, value: str):
+        return float(value.rstrip("C"))
+
+
+class Letters(str, FieldConverter):
+    @classmethod
+    def _pyd_convert_str(cls, value: str):
+        if not value.isalpha():
+            raise ValueError("Not letters")
+        return cls(value)
+
+
+NumberOrLetters = converter_union(Number, Letters)
+
+
+class Model(BaseModel):
+    number: Number
+    maybe: Optional[Number] = Field(None, alias="maybeNumber")
+    numbers: List[Number] = []
+
+
+LINES = [
+    {"number": "1"},
+    {"number": " 2 ", "maybeNumber": "3", "numbers": ["4"]},
+    {"number": "x"},
+    {"number": "5", "maybeNumber": None},
+]
+
+
+def jsonl(records) -> str:
+    return "".join(
+        (json.dumps(r) if not isinstance(r, str) else r) + "\n" for r in records
+    )
+
+
+def split(results):
+    models = [r for r in results if isinstance(r, BaseModel)]
+    errors = [r for r in results if not isinstance(r, BaseModel)]
+    return models, errors
+
+
+class TestLoadJsonl:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 1024])
+    def test_text_file(self, chunk_size):
+        results = list(
+            load_jsonl(Model, io.StringIO(jsonl(LINES)), chunk_size=chunk_size)
+        )
+        models, errors = split(results)
+
+        assert [m.number for m in models] == [1, 2, 5]
+        assert all(type(m.number) is Number for m in models)
+        assert models[1].maybe == 3
+        assert models[1].numbers == [4]
+        assert models[2].maybe is None
+
+        assert results[2] is errors[0]
+        line_no, error = errors[0]
+        assert line_no == 3
+        assert isinstance(error, ValidationError)
+        assert error.errors()[0]["loc"] == ("number",)
+
+    def test_path_and_mmap(self, tmp_path):
+        path = tmp_path / "models.jsonl"
+        path.write_text(jsonl(LINES))
+
+        from_path = list(load_jsonl(Model, path))
+        from_str = list(load_jsonl(Model, str(path)))
+        with open(path, "rb") as fp, mmap.mmap(
+            fp.fileno(), 0, access=mmap.ACCESS_READ
+        ) as buffer:
+            from_mmap = list(load_jsonl(Model, buffer, chunk_size=2))
+
+        for results in (from_path, from_str, from_mmap):
+            models, errors = split(results)
+            assert [m.number for m in models] == [1, 2, 5]
+            assert [line_no for line_no, _ in errors] == [3]
+
+    def test_bad_lines(self):
+        source = io.StringIO(jsonl(['{"number": "1"}', "", "{oops", "[1]", "  "]))
+        results = list(load_jsonl(Model, source))
+
+        assert results[0] == Model(number="1")
+        (line_no, error), (line_no_2, error_2) = results[1:]
+        assert line_no == 3
+        assert isinstance(error, json.JSONDecodeError)
+        assert line_no_2 == 4
+        assert isinstance(error_2, ValidationError)
+
+    def test_converts_once(self):
+        Number.calls = 0
+        list(load_jsonl(Model, io.StringIO(jsonl([{"number": "1"}] * 10))))
+        assert Number.calls == 10
+
+    def test_pre_validators_see_raw_values(self):
+        class PreModel(BaseModel):
+            number: Number
+
+            @validator("number", pre=True)
+            def strip_prefix(cls, value):
+                return value.lstrip("#")
+
+        models = list(load_jsonl(PreModel, io.StringIO(jsonl([{"number": "#7"}]))))
+        assert models[0].number == 7
+
+    def test_lazy(self):
+        source = io.StringIO(jsonl(LINES))
+        results = load_jsonl(Model, source, chunk_size=1)
+        assert next(results).number == 1
+        # Only the first chunk has been read
+        assert source.tell() == len(jsonl(LINES[:1]))
+
+    def test_bad_chunk_size(self):
+        with pytest.raises(ValueError):
+            load_jsonl(Model, io.StringIO(), chunk_size=0)
+
+    def test_converter_returning_other_types(self):
+        class TemperatureModel(BaseModel):
+            temperature: Celsius
+            number: Number = Number(0)
+
+            @validator("temperature")
+            def not_too_cold(cls, value):
+                assert value > -273.15, "Too cold"
+                return value
+
+        source = io.StringIO(
+            jsonl(
+                [
+                    {"temperature": "20C"},
+                    {"temperature": "-300C"},
+                    {"temperature": "x"},
+                    {"temperature": "5C", "number": "x"},
+                ]
+            )
+        )
+        results = list(load_jsonl(TemperatureModel, source))
+
+        assert results[0] == TemperatureModel(temperature="20C")
+        assert type(results[0].temperature) is float
+        for (line_no, error), loc in zip(
+            results[1:], [("temperature",), ("temperature",), ("number",)]
+        ):
+            assert isinstance(error, ValidationError)
+            assert error.errors()[0]["loc"] == loc
+
+    def test_converter_union(self):
+        class UnionModel(BaseModel):
+            value: NumberOrLetters
+
+        source = io.StringIO(
+            jsonl([{"value": "12"}, {"value": "abc"}, {"value": "a1"}])
+        )
+        results = list(load_jsonl(UnionModel, source))
+
+        assert results[0].value == 12
+        assert type(results[0].value) is Number
+        assert results[1].value == "abc"
+        assert type(results[1].value) is Letters
+        line_no, error = results[2]
+        assert line_no == 3
+        assert isinstance(error, ValidationError)
+
+    def test_population_by_field_name(self):
+        class NameModel(BaseModel):
+            maybe: Optional[Number] = Field(None, alias="maybeNumber")
+
+            class Config:
+                allow_population_by_field_name = True
+
+        source = io.StringIO(
+            jsonl(
+                [
+                    {"maybe": "1"},
+                    {"maybeNumber": "2", "maybe": "x"},
+                    {"maybeNumber": None, "maybe": "3"},
+                    {"maybe": "x"},
+                ]
+            )
+        )
+        results = list(load_jsonl(NameModel, source))
+
+        expected = [NameModel(maybe="1"), NameModel(maybe="2"), NameModel()]
+        assert results[:3] == expected
+        assert type(results[0].maybe) is Number
+        line_no, error = results[3]
+        assert line_no == 4
+        assert error.errors()[0]["loc"] == ("maybeNumber",)
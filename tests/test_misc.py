@@ -0,0 +1,135 @@
+import sys
+import textwrap
+
+import pytest
+
+from pydantic import BaseModel
+
+from phanas_pydantic_helpers import (
+    update_forward_refs_recursive,
+    update_module_forward_refs,
+)
+
+
+class TestUpdateForwardRefsRecursive:
+    def test_nested(self):
+        class Outer(BaseModel):
+            class Inner(BaseModel):
+                value: "Value"
+
+                class Value(BaseModel):
+                    x: int
+
+            inner: "Inner"
+
+        assert update_forward_refs_recursive(Outer) is Outer
+        outer = Outer(inner={"value": {"x": 1}})
+        assert outer.inner.value.x == 1
+
+    def test_mutually_nested(self):
+        class A(BaseModel):
+            b: "B"
+
+        class B(BaseModel):
+            a: "A" = None
+
+        A.B = B
+        B.A = A
+
+        update_forward_refs_recursive(A)
+        assert A(b={"a": None}).b.a is None
+
+    def test_shared_model_resolved_once(self, monkeypatch):
+        class Shared(BaseModel):
+            x: int
+
+        class A(BaseModel):
+            SharedModel = Shared
+
+        class B(BaseModel):
+            SharedModel = Shared
+
+        class Root(BaseModel):
+            AModel = A
+            BModel = B
+            SharedModel = Shared
+            a: "AModel"
+            b: "BModel"
+            shared: "SharedModel"
+
+        calls = []
+        original = BaseModel.update_forward_refs.__func__
+
+        def update_forward_refs(cls, **localns):
+            calls.append(cls)
+            original(cls, **localns)
+
+        monkeypatch.setattr(
+            BaseModel, "update_forward_refs", classmethod(update_forward_refs)
+        )
+        update_forward_refs_recursive(Root)
+
+        # Only Root has forward refs
+        assert calls == [Root]
+        assert Root(a={}, b={}, shared={"x": 1}).shared.x == 1
+
+
+class TestUpdateModuleForwardRefs:
+    @pytest.fixture()
+    def package(self, tmp_path, monkeypatch):
+        root = tmp_path / "fwd_refs_pkg"
+        (root / "sub").mkdir(parents=True)
+        (root / "__init__.py").write_text(textwrap.dedent("""
+                from __future__ import annotations
+
+                from typing import List
+
+                from pydantic import BaseModel
+
+
+                class Top(BaseModel):
+                    leaf: Leaf
+                    others: List[Leaf] = []
+
+
+                class Leaf(BaseModel):
+                    x: int
+                """))
+        (root / "sub" / "__init__.py").write_text("")
+        (root / "sub" / "models.py").write_text(textwrap.dedent("""
+                from pydantic import BaseModel
+
+                from fwd_refs_pkg import Leaf
+
+
+                class Uses(BaseModel):
+                    class Nested(BaseModel):
+                        leaf: "Leaf"
+
+                    nested: "Nested"
+                """))
+        monkeypatch.syspath_prepend(str(tmp_path))
+        yield "fwd_refs_pkg"
+        for name in ["fwd_refs_pkg", "fwd_refs_pkg.sub", "fwd_refs_pkg.sub.models"]:
+            sys.modules.pop(name, None)
+
+    def test_package(self, package):
+        report = update_module_forward_refs(package)
+
+        # Top, Leaf, Uses and Uses.Nested. Leaf is imported into the
+        # submodule, so it's only visited once. Only Top and Uses refer to
+        # names that weren't defined when they were created.
+        assert report.models_visited == 4
+        assert report.models_resolved == 2
+        assert report.seconds >= 0
+
+        from fwd_refs_pkg import Top
+        from fwd_refs_pkg.sub.models import Uses
+
+        assert Top(leaf={"x": 1}, others=[{"x": 2}]).others[0].x == 2
+        assert Uses(nested={"leaf": {"x": 3}}).nested.leaf.x == 3
+
+    def test_not_recursive(self, package):
+        report = update_module_forward_refs(package, recursive=False)
+        assert report.models_visited == 2
+        assert report.models_resolved == 1
@@ -0,0 +1,56 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from phanas_pydantic_helpers import FieldConverter, validate_parallel
+
+
+class Number(int, FieldConverter):
+    @classmethod
+    def _pyd_convert_str(cls, value: str):
+        return cls(value.strip())
+
+
+class Model(BaseModel):
+    number: Number
+    name: Optional[str] = None
+
+
+RECORDS = [{"number": str(i)} if i % 7 else {"number": "x"} for i in range(50)]
+
+
+def check(results, errors):
+    assert len(results) == len(RECORDS)
+    for idx, result in enumerate(results):
+        if idx % 7:
+            assert result == Model(number=str(idx))
+            assert type(result.number) is Number
+        else:
+            assert result is None
+            assert isinstance(errors[idx], ValidationError)
+    assert sorted(errors) == list(range(0, 50, 7))
+
+
+class TestValidateParallel:
+    @pytest.mark.parametrize("chunksize", [None, 1, 8, 100])
+    def test_processes(self, chunksize):
+        check(*validate_parallel(Model, RECORDS, workers=2, chunksize=chunksize))
+
+    def test_one_worker(self):
+        check(*validate_parallel(Model, iter(RECORDS), workers=1))
+
+    @pytest.mark.parametrize("executor_type", [ProcessPoolExecutor, ThreadPoolExecutor])
+    def test_executor(self, executor_type):
+        with executor_type(max_workers=2) as executor:
+            check(*validate_parallel(Model, RECORDS, chunksize=5, executor=executor))
+            check(*validate_parallel(Model, RECORDS, executor=executor))
+
+    def test_empty(self):
+        assert validate_parallel(Model, [], workers=2) == ([], {})
+
+    @pytest.mark.parametrize("kwargs", [{"workers": 0}, {"chunksize": 0}])
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            validate_parallel(Model, RECORDS, **kwargs)
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+import phanas_pydantic_helpers
+from phanas_pydantic_helpers import (
+    ConverterStats,
+    FieldConverter,
+    converter_union,
+    set_converter_observer,
+)
+from phanas_pydantic_helpers.common.imports import PYDANTIC_V1
+
+if PYDANTIC_V1:
+    pytest.skip("Pydantic v2 only", allow_module_level=True)
+
+
+class Number(int, FieldConverter):
+    @classmethod
+    def _pyd_convert_str(cls, value: str):
+        return cls(value.strip())
+
+    @classmethod
+    def _pyd_convert_int(cls, value: int):
+        return cls(value)
+
+
+class Letters(str, FieldConverter):
+    @classmethod
+    def _pyd_convert_str(cls, value: str):
+        if not value.isalpha():
+            raise ValueError("Not letters")
+        return cls(value)
+
+
+class Model(BaseModel):
+    number: Number
+    value: converter_union(Number, Letters) = None
+
+
+def test_field_converter():
+    model = Model(number=" 5 ", value="abc")
+    assert model.number == 5
+    assert type(model.number) is Number
+    assert type(model.value) is Letters
+    assert type(Model(number=1, value=2).value) is Number
+
+    with pytest.raises(ValidationError) as exc_info:
+        Model(number=1.5)
+    # Unions of converters add the choice tried to the location
+    assert exc_info.value.errors()[0]["loc"][0] == "number"
+    with pytest.raises(ValidationError):
+        Model(number="x")
+
+
+def test_observer():
+    previous = set_converter_observer(None)
+    try:
+        with ConverterStats() as stats:
+            Model(number="1")
+        assert stats[Number, str].calls == 1
+    finally:
+        set_converter_observer(previous)
+
+
+def test_v1_helpers_not_exported():
+    assert "FieldConverter" in phanas_pydantic_helpers.__all__
+    assert "create_template_from_model" not in phanas_pydantic_helpers.__all__
+
+
+class TestTimeFields:
+    @pytest.fixture(autouse=True)
+    def pendulum(self):
+        return pytest.importorskip("pendulum")
+
+    @pytest.fixture()
+    def model_cls(self):
+        from phanas_pydantic_helpers import DateTimeField, DurationField, TimeField
+
+        class TimesModel(BaseModel):
+            time: TimeField
+            duration: DurationField
+            dt: DateTimeField
+
+        return TimesModel
+
+    def test_validate(self, model_cls, pendulum):
+        model = model_cls(time="9:30 pm", duration="1h30m", dt="2024-05-01T12:00:00Z")
+        assert model.time == pendulum.time(21, 30)
+        assert model.duration == pendulum.duration(hours=1, minutes=30)
+        assert model.dt == pendulum.datetime(2024, 5, 1, 12)
+
+        with pytest.raises(ValidationError):
+            model_cls(time="x", duration="1h", dt="2024-05-01T12:00:00Z")
+
+    def test_dump_many(self, model_cls):
+        from phanas_pydantic_helpers import dump_many
+
+        models = [
+            model_cls(time="9:30 pm", duration="1h30m", dt="2024-05-01T12:00:00Z")
+        ]
+        dumped = json.loads(dump_many(models))
+        assert dumped == [
+            {"time": "21:30", "duration": "1:30:00", "dt": "2024-05-01T12:00:00Z"}
+        ]
+        assert [model_cls(**obj) for obj in dumped] == models
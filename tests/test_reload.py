@@ -0,0 +1,174 @@
+from collections import Counter
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel, Field, ValidationError, root_validator, validator
+
+from phanas_pydantic_helpers import Factory, ModelReloader
+
+validations = Counter()
+
+
+class Database(BaseModel):
+    host: str = "localhost"
+    port: int = 5432
+
+    @root_validator(skip_on_failure=True)
+    def count(cls, values):
+        validations["database"] += 1
+        return values
+
+
+class Cache(BaseModel):
+    size: int = 100
+    database: Database = Factory(Database)
+
+    @root_validator(skip_on_failure=True)
+    def count(cls, values):
+        validations["cache"] += 1
+        return values
+
+
+class Config(BaseModel):
+    name: str
+    database: Database = Factory(Database)
+    cache: Cache = Factory(Cache)
+    tags: List[str] = []
+    backup: Optional[Database] = None
+
+
+RAW = {
+    "name": "service",
+    "database": {"host": "db", "port": 1},
+    "cache": {"size": 10, "database": {"host": "cache-db"}},
+    "tags": ["a"],
+}
+
+
+@pytest.fixture
+def reloader():
+    reloader = ModelReloader(Config, RAW)
+    validations.clear()
+    return reloader
+
+
+def with_changes(**changes):
+    return {**RAW, **changes}
+
+
+class TestModelReloader:
+    def test_initial(self, reloader):
+        assert reloader.model == Config.parse_obj(RAW)
+        assert reloader.raw is RAW
+
+    def test_unchanged(self, reloader):
+        model = reloader.model
+        assert reloader.reload(dict(RAW)) == []
+        assert reloader.model is model
+        assert not validations
+
+    def test_nested_change(self, reloader):
+        raw = with_changes(cache={"size": 10, "database": {"host": "other"}})
+        assert reloader.reload(raw) == [("cache", "database", "host")]
+        # The top-level database wasn't validated again
+        assert validations == {"cache": 1, "database": 1}
+        assert reloader.model == Config.parse_obj(raw)
+
+    def test_leaf_change(self, reloader):
+        old_model = reloader.model
+        raw = with_changes(name="renamed", tags=["a", "b"])
+        assert reloader.reload(raw) == [("name",), ("tags",)]
+        assert not validations
+        assert reloader.model == Config.parse_obj(raw)
+        assert old_model.name == "service"
+
+    def test_added_and_removed(self, reloader):
+        raw = {
+            "name": "service",
+            "cache": RAW["cache"],
+            "backup": {"host": "backup"},
+        }
+        changed = reloader.reload(raw)
+        assert sorted(changed) == [("backup",), ("database",), ("tags",)]
+        assert reloader.model == Config.parse_obj(raw)
+        assert reloader.model.database == Database()
+
+        # The database section was missing, so the default from Factory was
+        # used. Adding it validates it from scratch.
+        raw = {**raw, "database": {"port": 2}}
+        assert reloader.reload(raw) == [("database",)]
+        assert reloader.model.database == Database(port=2)
+
+    def test_invalid(self, reloader):
+        model = reloader.model
+        with pytest.raises(ValidationError):
+            reloader.reload(with_changes(database={"port": "x"}))
+        assert reloader.model is model
+        assert reloader.raw is RAW
+
+        # The next reload is diffed against the last valid raw dict
+        raw = with_changes(database={"host": "db", "port": 3})
+        assert reloader.reload(raw) == [("database", "port")]
+
+    def test_invalid_locs(self, reloader):
+        raw = with_changes(
+            name=None,
+            database={"host": "db", "port": "x"},
+            cache={"size": "y", "database": {"host": "cache-db", "port": "z"}},
+        )
+        with pytest.raises(ValidationError) as exc_info:
+            reloader.reload(raw)
+        # The same errors as validating the whole dict
+        with pytest.raises(ValidationError) as expected:
+            Config.parse_obj(raw)
+        locs = sorted(error["loc"] for error in exc_info.value.errors())
+        assert locs == sorted(error["loc"] for error in expected.value.errors())
+        assert locs == [
+            ("cache", "database", "port"),
+            ("cache", "size"),
+            ("database", "port"),
+            ("name",),
+        ]
+
+    def test_field_names(self):
+        class Section(BaseModel):
+            value: int
+
+        class AliasConfig(BaseModel):
+            section: Section = Field(alias="mySection")
+            other: Section
+
+            class Config:
+                allow_population_by_field_name = True
+
+        reloader = ModelReloader(
+            AliasConfig, {"mySection": {"value": 1}, "other": {"value": 2}}
+        )
+        assert reloader.reload({"mySection": {"value": 1}, "other": {"value": 3}}) == [
+            ("other", "value")
+        ]
+        assert reloader.model.other.value == 3
+
+    def test_pre_validators_see_raw_values(self):
+        class Section(BaseModel):
+            value: int
+
+        class PreConfig(BaseModel):
+            first: Section
+            second: Section
+
+            @validator("first", pre=True)
+            def check_first(cls, value):
+                assert isinstance(value, dict)
+                return value
+
+            @root_validator(pre=True)
+            def check_all(cls, values):
+                assert all(isinstance(value, dict) for value in values.values())
+                return values
+
+        raw = {"first": {"value": 1}, "second": {"value": 2}}
+        reloader = ModelReloader(PreConfig, raw)
+        raw = {"first": {"value": 1}, "second": {"value": 3}}
+        assert reloader.reload(raw) == [("second",)]
+        assert reloader.model == PreConfig.parse_obj(raw)
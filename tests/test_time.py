@@ -0,0 +1,535 @@
+import copy
+import json
+import pickle
+from datetime import date, timedelta, timezone
+from itertools import product
+from typing import List, Optional
+
+import pytest
+
+from pydantic import BaseModel, Field, ValidationError
+
+from phanas_pydantic_helpers import (
+    TIME_JSON_ENCODERS,
+    DateTimeField,
+    DurationField,
+    TimeField,
+    dump_many,
+)
+from phanas_pydantic_helpers.common import time as time_module
+from phanas_pydantic_helpers.common.time import (
+    parse_datetime,
+    parse_duration,
+    parse_time,
+)
+
+pen = pytest.importorskip("pendulum")
+
+
+class TestParseTime:
+    @pytest.mark.parametrize(
+        "time_str, expected",
+        [
+            ("9", (9, 0)),
+            ("09", (9, 0)),
+            ("930", (9, 30)),
+            ("0930", (9, 30)),
+            ("9:30", (9, 30)),
+            ("17:30", (17, 30)),
+            ("1730", (17, 30)),
+            ("23:59", (23, 59)),
+            ("9am", (9, 0)),
+            ("9 AM", (9, 0)),
+            ("9:30p", (21, 30)),
+            ("9:30 pm", (21, 30)),
+            ("12am", (0, 0)),
+            ("12:15 AM", (0, 15)),
+            ("12pm", (12, 0)),
+            ("0:30pm", (12, 30)),
+            ("5:00  ", (5, 0)),
+        ],
+    )
+    def test_valid(self, time_str, expected):
+        assert parse_time(time_str) == pen.Time(*expected)
+        assert parse_time(time_str, cache=False) == pen.Time(*expected)
+
+    @pytest.mark.parametrize(
+        "time_str",
+        ["", "am", "45", "12345", "9:3", "9:", ":30", "9 m", "abc", "9:30 xm"],
+    )
+    def test_no_match(self, time_str):
+        with pytest.raises(ValueError):
+            parse_time(time_str)
+
+    @pytest.mark.parametrize("time_str", ["24", "29:00", "9:60", "2399"])
+    def test_out_of_range(self, time_str):
+        with pytest.raises(ValueError, match="out of range"):
+            parse_time(time_str)
+
+    @pytest.mark.parametrize("time_str", ["13pm", "13:00 am"])
+    def test_24_hour_with_period(self, time_str):
+        with pytest.raises(ValueError, match="24 hour"):
+            parse_time(time_str)
+
+    @pytest.mark.parametrize(
+        "time_str, expected",
+        [
+            ("09:30:15", pen.Time(9, 30, 15)),
+            ("23:59:59.5", pen.Time(23, 59, 59, 500000)),
+            ("09:30:00.000005", pen.Time(9, 30, 0, 5)),
+            ("09:30:00", pen.Time(9, 30)),
+            ("09:30:00Z", pen.Time(9, 30, tzinfo=pen.UTC)),
+            ("09:30:00+00:00", pen.Time(9, 30, tzinfo=pen.UTC)),
+            ("09:30:00-01:30", pen.Time(9, 30, tzinfo=pen.timezone(-5400))),
+        ],
+    )
+    def test_iso(self, time_str, expected):
+        for cache in (True, False):
+            parsed = parse_time(time_str, cache=cache)
+            assert parsed == expected
+            assert parsed.microsecond == expected.microsecond
+            assert parsed.utcoffset() == expected.utcoffset()
+
+    @pytest.mark.parametrize(
+        "time_str",
+        ["09:30:60", "24:00:00", "09:30:00+24:00", "09:30:00.", "09:30:00+2:00"],
+    )
+    def test_iso_invalid(self, time_str):
+        with pytest.raises(ValueError):
+            parse_time(time_str)
+
+    def test_class(self):
+        class MyTime(pen.Time):
+            pass
+
+        assert type(parse_time("9:30", MyTime)) is MyTime
+        assert type(parse_time("9:30", MyTime, cache=False)) is MyTime
+
+    def test_cache(self):
+        assert parse_time("9:30 AM") is parse_time("9:30 am")
+        assert parse_time("9:30", cache=False) is not parse_time("9:30", cache=False)
+
+    @pytest.mark.parametrize("cache", [True, False])
+    def test_intern(self, cache):
+        class MyTime(pen.Time):
+            pass
+
+        time = parse_time("9:30 PM", MyTime, cache=cache, intern=True)
+        assert type(time) is MyTime
+        assert time == pen.Time(21, 30)
+        assert parse_time("2130", MyTime, cache=cache, intern=True) is time
+        assert parse_time("21:30", cache=cache, intern=True) is not time
+        assert parse_time("21:31", MyTime, cache=cache, intern=True) is not time
+
+
+def test_fast_path_matches_regex():
+    # Every string the fast path accepts must be parsed the same way by the
+    # regex
+    for length in range(1, 6):
+        for chars in product("0139:apm \tA", repeat=length):
+            time_str = "".join(chars)
+            fast_match = time_module._fast_match_time(time_str)
+            if fast_match is None:
+                continue
+
+            match = time_module.time_pattern.match(time_str)
+            assert match, time_str
+            assert fast_match == (
+                int(match["hour"]),
+                int(match["minute"] or 0),
+                "p" if match["period_pm"] else "a" if match["period_am"] else "",
+            ), time_str
+
+
+class TestTimeField:
+    def test_convert(self):
+        class Model(BaseModel):
+            time: TimeField
+
+        time = Model(time="9:30 PM").time
+        assert type(time) is TimeField
+        assert time == pen.Time(21, 30)
+
+    def test_cache_toggle(self):
+        class UncachedTimeField(TimeField):
+            cache_parsed = False
+
+        class Model(BaseModel):
+            cached: TimeField
+            uncached: UncachedTimeField
+
+        a = Model(cached="9:30", uncached="9:30")
+        b = Model(cached="9:30", uncached="9:30")
+        assert a.cached is b.cached
+        assert a.uncached is not b.uncached
+        assert type(a.uncached) is UncachedTimeField
+
+    def test_intern_toggle(self):
+        class InternedTimeField(TimeField):
+            intern_parsed = True
+
+        class Model(BaseModel):
+            time: InternedTimeField
+
+        assert Model(time="9:30 PM").time is Model(time="21:30").time
+
+
+class TestParseDuration:
+    @pytest.mark.parametrize(
+        "duration_str, seconds",
+        [
+            ("90s", 90),
+            ("1h30m", 5400),
+            ("1h 30m", 5400),
+            ("1 hour, 30 minutes", 5400),
+            ("2 days", 172800),
+            ("1w2d", 777600),
+            ("1.5h", 5400),
+            ("1.5s", 1.5),
+            ("- 1 minute", -60),
+            ("1:30", 90),
+            (":30", 30),
+            ("1:30:00", 5400),
+            ("1:00:30:00", 88200),
+            ("1:30.5", 90.5),
+            ("  5 MINS  ", 300),
+        ],
+    )
+    def test_valid(self, duration_str, seconds):
+        assert parse_duration(duration_str) == pen.Duration(seconds=seconds)
+        assert parse_duration(duration_str, cache=False) == pen.Duration(
+            seconds=seconds
+        )
+
+    @pytest.mark.parametrize(
+        "duration_str", ["", "90", "1h30", "1s1m", "1m1m", "1.2.3h", "1:3", "h", "+"]
+    )
+    def test_invalid(self, duration_str):
+        with pytest.raises(ValueError):
+            parse_duration(duration_str)
+
+    def test_pytimeparse_fallback(self):
+        pytest.importorskip("pytimeparse")
+        assert parse_duration("1d 2:00:00") == pen.Duration(hours=26)
+
+    def test_class(self):
+        assert type(parse_duration("1h", DurationField)) is DurationField
+
+    def test_cache(self):
+        assert parse_duration("1H") is parse_duration("1h")
+        assert parse_duration("1h", cache=False) is not parse_duration(
+            "1h", cache=False
+        )
+
+    def test_native_matches_pytimeparse(self):
+        pytimeparse = pytest.importorskip("pytimeparse")
+        tokens = ["1", "05", "1.5", ".", "h", "m", "min", "s", "d", " ", ":", ",", "-"]
+        for length in range(1, 5):
+            for parts in product(tokens, repeat=length):
+                duration_str = "".join(parts)
+                seconds = time_module._parse_duration_native(duration_str)
+                if seconds is None:
+                    continue
+
+                expected = pytimeparse.parse(duration_str)
+                assert seconds == expected, duration_str
+                assert type(seconds) is type(expected), duration_str
+
+
+class TestParseDateTime:
+    @pytest.mark.parametrize(
+        "datetime_str",
+        [
+            "2024-05-01T12:00:00Z",
+            "2024-05-01T12:00:00",
+            "2024-05-01 12:00:00Z",
+            "2024-05-01T12:00:00+02:00",
+            "2024-05-01T12:00:00-05:30",
+            "2024-05-01T12:00:00+00:00",
+            "2024-05-01T12:00:00.5Z",
+            "2024-05-01T12:00:00.123456+01:00",
+            "2024-05-01T12:00:00.123456789Z",
+        ],
+    )
+    def test_rfc3339_matches_pendulum(self, datetime_str):
+        assert time_module._parse_rfc3339(datetime_str, pen.DateTime) is not None
+
+        parsed = parse_datetime(datetime_str)
+        expected = pen.parse(datetime_str)
+        assert type(parsed) is pen.DateTime
+        assert parsed == expected
+        assert parsed.tzinfo.name == expected.tzinfo.name
+        assert parsed.utcoffset() == expected.utcoffset()
+
+    @pytest.mark.parametrize(
+        "datetime_str", ["20240501T120000Z", "2024-05-01", "2024-05-01T12:00Z"]
+    )
+    def test_fallback(self, datetime_str):
+        assert time_module._parse_rfc3339(datetime_str, pen.DateTime) is None
+        assert parse_datetime(datetime_str) == pen.parse(datetime_str)
+        with pytest.raises(ValueError):
+            parse_datetime(datetime_str, iso_only=True)
+
+    def test_offset_out_of_range(self):
+        datetime_str = "2020-01-01T00:00:00+99:00"
+        # The fast path leaves it to pendulum instead of raising
+        assert time_module._parse_rfc3339(datetime_str, pen.DateTime) is None
+        with pytest.raises(ValueError, match="RFC 3339"):
+            parse_datetime(datetime_str, iso_only=True)
+
+    @pytest.mark.parametrize(
+        "datetime_str", ["2024-13-01T12:00:00Z", "2024-05-01T12:00:00+2:00", "nope"]
+    )
+    def test_invalid(self, datetime_str):
+        with pytest.raises(ValueError):
+            parse_datetime(datetime_str)
+
+    @pytest.mark.parametrize("datetime_str", ["2024-05-01T12:00:00Z", "20240501T12"])
+    def test_class(self, datetime_str):
+        parsed = parse_datetime(datetime_str, DateTimeField)
+        assert type(parsed) is DateTimeField
+        assert parsed == pen.parse(datetime_str)
+
+
+class TestDateTimeField:
+    def test_convert(self):
+        class Model(BaseModel):
+            dt: DateTimeField
+
+        dt = Model(dt="2024-05-01T12:00:00Z").dt
+        assert type(dt) is DateTimeField
+        assert dt == pen.datetime(2024, 5, 1, 12)
+
+    def test_iso_only(self):
+        class IsoDateTimeField(DateTimeField):
+            iso_only = True
+
+        class Model(BaseModel):
+            dt: IsoDateTimeField
+
+        assert Model(dt="2024-05-01T12:00:00Z").dt == pen.datetime(2024, 5, 1, 12)
+        with pytest.raises(ValidationError):
+            Model(dt="20240501T120000Z")
+
+
+class IsoDateTimeField(DateTimeField):
+    iso_only = True
+
+
+class TestPickle:
+    @pytest.mark.parametrize(
+        "value",
+        [
+            TimeField(9, 30),
+            TimeField(1, 2, 3, 4),
+            TimeField(9, 30, tzinfo=pen.timezone(7200)),
+            TimeField(9, 30, tzinfo=pen.timezone("Europe/London")),
+            TimeField(1, 30, fold=1),
+            DurationField(hours=1, minutes=30),
+            DurationField(days=-3, seconds=5),
+            DurationField(seconds=1.5),
+            DurationField(years=1, months=2, days=3),
+            DateTimeField(2024, 5, 1, 12),
+            DateTimeField(2024, 5, 1, 12, tzinfo=pen.UTC),
+            DateTimeField(2024, 5, 1, 12, tzinfo=pen.timezone(7200)),
+            DateTimeField(2024, 5, 1, 12, tzinfo=pen.timezone("Europe/London")),
+            DateTimeField(
+                2024, 10, 27, 1, 30, tzinfo=pen.timezone("Europe/London"), fold=1
+            ),
+            IsoDateTimeField(2024, 5, 1, 12, tzinfo=pen.UTC),
+        ],
+        ids=repr,
+    )
+    def test_round_trip(self, value):
+        pickled = pickle.dumps(value)
+        restored = pickle.loads(pickled)
+
+        assert type(restored) is type(value)
+        assert restored == value
+        assert repr(restored) == repr(value)
+        if isinstance(value, pen.Duration):
+            assert (restored.years, restored.months) == (value.years, value.months)
+        if isinstance(value, (pen.DateTime, pen.Time)):
+            assert restored.fold == value.fold
+            if value.tzinfo is not None:
+                assert restored.tzinfo.name == value.tzinfo.name
+                assert restored.utcoffset() == value.utcoffset()
+        assert copy.deepcopy(value) == value
+        # Named timezones are pickled by name, not with their whole database
+        # entry
+        assert len(pickled) < 200
+
+    def test_model(self):
+        class Model(BaseModel):
+            time: TimeField
+            duration: DurationField
+            dt: DateTimeField
+
+        model = Model(time="9:30 pm", duration="1:30:00", dt="2024-05-01T12:00:00Z")
+        state = pickle.loads(pickle.dumps(model.__dict__))
+        assert state == model.__dict__
+        assert type(state["dt"]) is DateTimeField
+
+
+class TimesModel(BaseModel):
+    time: TimeField
+    duration: DurationField
+    dt: DateTimeField
+    durations: List[DurationField] = []
+
+
+class TestJsonEncoders:
+    @pytest.mark.parametrize(
+        "time_str, expected",
+        [("9", "09:00"), ("9:30 pm", "21:30"), ("12am", "00:00"), ("2359", "23:59")],
+    )
+    def test_time(self, time_str, expected):
+        time = parse_time(time_str, TimeField)
+        assert TIME_JSON_ENCODERS[TimeField](time) == expected
+        assert parse_time(expected, TimeField) == time
+
+    @pytest.mark.parametrize(
+        "duration, expected",
+        [
+            (DurationField(), "0:00:00"),
+            (DurationField(hours=1, minutes=30), "1:30:00"),
+            (DurationField(seconds=-1.5), "-0:00:01.500000"),
+            (DurationField(days=-3, seconds=5), "-71:59:55"),
+            (DurationField(days=2, microseconds=1), "48:00:00.000001"),
+            (DurationField(years=1), "8760:00:00"),
+        ],
+    )
+    def test_duration(self, duration, expected):
+        assert TIME_JSON_ENCODERS[DurationField](duration) == expected
+        assert parse_duration(expected, DurationField, cache=False) == duration
+
+    @pytest.mark.parametrize(
+        "dt, expected",
+        [
+            (DateTimeField(2024, 5, 1, 12, tzinfo=pen.UTC), "2024-05-01T12:00:00Z"),
+            (
+                DateTimeField(999, 1, 2, 3, 4, 5, 6, tzinfo=pen.timezone(-5 * 3600)),
+                "0999-01-02T03:04:05.000006-05:00",
+            ),
+            (
+                DateTimeField(2024, 7, 1, tzinfo=pen.timezone("Europe/London")),
+                "2024-07-01T00:00:00+01:00",
+            ),
+            (
+                DateTimeField(2024, 1, 1, 1, tzinfo=timezone(timedelta(seconds=75))),
+                "2024-01-01T00:58:45Z",
+            ),
+        ],
+    )
+    def test_datetime(self, dt, expected):
+        assert TIME_JSON_ENCODERS[DateTimeField](dt) == expected
+        parsed = parse_datetime(expected, DateTimeField, iso_only=True)
+        assert parsed == dt
+        assert parsed.microsecond == dt.microsecond
+
+    @pytest.mark.parametrize(
+        "time, expected",
+        [
+            (TimeField(9, 30, 15), "09:30:15"),
+            (TimeField(9, 30, 0, 5), "09:30:00.000005"),
+            (TimeField(9, 30, tzinfo=pen.UTC), "09:30:00+00:00"),
+            (
+                TimeField(9, 30, 15, 250000, pen.timezone(-5400)),
+                "09:30:15.250000-01:30",
+            ),
+        ],
+    )
+    def test_time_iso(self, time, expected):
+        assert TIME_JSON_ENCODERS[TimeField](time) == expected
+
+        class Model(BaseModel):
+            time: TimeField
+
+            class Config:
+                json_encoders = TIME_JSON_ENCODERS
+
+        parsed = Model.parse_raw(Model.construct(time=time).json()).time
+        assert parsed == time
+        assert (parsed.second, parsed.microsecond) == (time.second, time.microsecond)
+        assert parsed.utcoffset() == time.utcoffset()
+
+    def test_naive_datetime(self):
+        dt = DateTimeField(2024, 5, 1, 12, 30, 0, 5)
+        encoded = TIME_JSON_ENCODERS[DateTimeField](dt)
+        assert encoded == "2024-05-01T12:30:00.000005"
+
+        # Strings without an offset are UTC
+        parsed = parse_datetime(encoded, DateTimeField, iso_only=True)
+        assert parsed.tzinfo is pen.UTC
+        assert parsed.naive() == dt.naive()
+
+    def test_subclass(self):
+        class IsoTimesModel(BaseModel):
+            dt: IsoDateTimeField
+
+            class Config:
+                json_encoders = TIME_JSON_ENCODERS
+
+        model = IsoTimesModel(dt="2024-05-01T12:00:00Z")
+        assert json.loads(model.json()) == {"dt": "2024-05-01T12:00:00Z"}
+
+
+class TestDumpMany:
+    def test_round_trip(self):
+        models = [
+            TimesModel(time="9:30 pm", duration="1h30m", dt="2024-05-01T12:00:00Z"),
+            TimesModel(
+                time="0",
+                duration="-1.5s",
+                dt="2024-05-01T12:00:00.5+05:45",
+                durations=["1:00:00:00", "5s"],
+            ),
+        ]
+        dumped = dump_many(models)
+
+        assert json.loads(dumped)[0] == {
+            "time": "21:30",
+            "duration": "1:30:00",
+            "dt": "2024-05-01T12:00:00Z",
+            "durations": [],
+        }
+        assert [TimesModel.parse_obj(obj) for obj in json.loads(dumped)] == models
+
+    def test_empty(self):
+        assert dump_many([]) == "[]"
+
+    def test_encoders(self):
+        class ConfigModel(BaseModel):
+            time: TimeField
+            duration: DurationField
+
+            class Config:
+                json_encoders = {TimeField: lambda time: time.hour}
+
+        models = [ConfigModel(time="9pm", duration="1s")]
+        assert json.loads(dump_many(models)) == [{"time": 21, "duration": "0:00:01"}]
+        assert json.loads(dump_many(models, {DurationField: lambda d: 1})) == [
+            {"time": 21, "duration": 1}
+        ]
+
+    def test_mixed_models(self):
+        class Other(BaseModel):
+            duration: DurationField
+            when: date
+
+        models = [
+            TimesModel(time="1am", duration="1m", dt="2024-05-01T12:00:00Z"),
+            Other(duration="2m", when=date(2024, 5, 1)),
+        ]
+        dumped = json.loads(dump_many(models, sort_keys=True))
+        assert dumped[1] == {"duration": "0:02:00", "when": "2024-05-01"}
+
+    def test_by_alias(self):
+        class AliasModel(BaseModel):
+            time: TimeField = Field(alias="startTime")
+            note: Optional[str] = None
+
+        models = [AliasModel(startTime="9am")]
+        assert json.loads(dump_many(models, by_alias=True, exclude_none=True)) == [
+            {"startTime": "09:00"}
+        ]
@@ -0,0 +1,100 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pendulum")
+
+from phanas_pydantic_helpers.common.time import parse_duration, parse_time
+from phanas_pydantic_helpers.common.time_arrays import (
+    parse_durations_array,
+    parse_times_array,
+)
+
+TIMES = [
+    "9",
+    "0930",
+    "9:30 pm",
+    "12am",
+    "12:15 PM",
+    "23:59",
+    "13pm",
+    "24:00",
+    "9:60",
+    "",
+    "nope",
+    "9:30 PM",
+]
+
+DURATIONS = ["1h30m", "90s", "2 days", "1:30:00", "-5m", "1.5s", "nope", ""]
+
+
+def expected_minutes(time_str):
+    try:
+        time = parse_time(time_str, cache=False)
+    except ValueError:
+        return None
+    return time.hour * 60 + time.minute
+
+
+def expected_seconds(duration_str):
+    try:
+        return parse_duration(duration_str, cache=False).total_seconds()
+    except ValueError:
+        return None
+
+
+class TestParseTimesArray:
+    @pytest.mark.parametrize("as_array", [False, True])
+    def test_matches_parse_time(self, as_array):
+        times = np.array(TIMES) if as_array else TIMES
+        minutes, valid = parse_times_array(times)
+
+        assert minutes.dtype == np.int64
+        for idx, time_str in enumerate(TIMES):
+            expected = expected_minutes(time_str)
+            assert valid[idx] == (expected is not None), time_str
+            assert minutes[idx] == (expected or 0), time_str
+
+    def test_non_strings(self):
+        minutes, valid = parse_times_array(["9am", None, 5, b"10am"])
+        assert valid.tolist() == [True, False, False, True]
+        assert minutes.tolist() == [540, 0, 0, 600]
+
+    def test_bytes_array(self):
+        minutes, valid = parse_times_array(np.array([b"9am", b"x"]))
+        assert valid.tolist() == [True, False]
+        assert minutes.tolist() == [540, 0]
+
+    def test_shape_and_dtype(self):
+        minutes, valid = parse_times_array([["1am", "2am"], ["3am", "x"]], np.int16)
+        assert minutes.shape == valid.shape == (2, 2)
+        assert minutes.dtype == np.int16
+        assert minutes.tolist() == [[60, 120], [180, 0]]
+
+    def test_empty(self):
+        minutes, valid = parse_times_array([])
+        assert minutes.shape == valid.shape == (0,)
+
+    def test_iso(self):
+        minutes, valid = parse_times_array(["09:30:00", "09:30:15", "09:30:00Z"])
+        assert valid.tolist() == [True, False, False]
+        assert minutes.tolist() == [570, 0, 0]
+
+
+class TestParseDurationsArray:
+    def test_matches_parse_duration(self):
+        seconds, valid = parse_durations_array(DURATIONS, np.float64)
+        for idx, duration_str in enumerate(DURATIONS):
+            expected = expected_seconds(duration_str)
+            assert valid[idx] == (expected is not None), duration_str
+            assert seconds[idx] == (expected or 0), duration_str
+
+    def test_fractions_invalid_for_ints(self):
+        seconds, valid = parse_durations_array(["1.5s", "2s", "1.0s"])
+        assert seconds.dtype == np.int64
+        assert valid.tolist() == [False, True, True]
+        assert seconds.tolist() == [0, 2, 1]
+
+    def test_too_big_for_dtype(self):
+        seconds, valid = parse_durations_array(["100000h", "1h"], np.int16)
+        assert valid.tolist() == [False, True]
+        assert seconds.tolist() == [0, 3600]
@@ -0,0 +1,80 @@
+from typing import List
+
+import pytest
+
+from pydantic import BaseModel
+
+from phanas_pydantic_helpers.common import typing as typing_module
+from phanas_pydantic_helpers.common.typing import (
+    get_function_annotations,
+    get_function_args_annotations,
+    get_model_annotations,
+    invalidate_annotations,
+)
+
+
+@pytest.fixture()
+def count_resolutions(monkeypatch):
+    calls = []
+    original = typing_module.get_type_hints
+
+    def get_type_hints(obj, *args, **kwargs):
+        calls.append(obj)
+        return original(obj, *args, **kwargs)
+
+    monkeypatch.setattr(typing_module, "get_type_hints", get_type_hints)
+    return calls
+
+
+def test_function_annotations_cached(count_resolutions):
+    def f(value: int) -> str:
+        pass
+
+    assert get_function_annotations(f) == {"value": int, "return": str}
+    assert get_function_args_annotations(f) == {"value": int}
+    assert get_function_annotations(classmethod(f)) == {"value": int, "return": str}
+    assert count_resolutions == [f]
+
+
+def test_returns_copies():
+    def f(value: int):
+        pass
+
+    get_function_annotations(f)["value"] = str
+    assert get_function_annotations(f) == {"value": int}
+
+
+def test_model_annotations(count_resolutions):
+    class Model(BaseModel):
+        children: List["Model"]
+        name: str
+
+    assert get_model_annotations(Model) == {"children": List[Model], "name": str}
+    get_model_annotations(Model)
+    assert count_resolutions == [Model]
+
+
+def test_invalidate(count_resolutions):
+    def f(value: int):
+        pass
+
+    get_function_annotations(f)
+    invalidate_annotations(f)
+    get_function_annotations(f)
+    invalidate_annotations()
+    get_function_annotations(f)
+    assert count_resolutions == [f, f, f]
+
+
+def test_unresolved_names_not_cached():
+    def f(value: "NotDefinedYet"):  # noqa: F821
+        pass
+
+    with pytest.raises(NameError):
+        get_function_annotations(f)
+
+    f.__globals__["NotDefinedYet"] = int
+    try:
+        assert get_function_annotations(f) == {"value": int}
+    finally:
+        del f.__globals__["NotDefinedYet"]
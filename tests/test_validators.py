@@ -0,0 +1,157 @@
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from pydantic import BaseModel, ConfigError, ValidationError
+
+from phanas_pydantic_helpers import (
+    OnlyOneOf,
+    PathStatCache,
+    maybe_relative_path,
+    only_one_of,
+)
+
+
+class TestOnlyOneOf:
+    @pytest.fixture()
+    def Model(self):
+        class Model(BaseModel):
+            a: int = 0
+            b: int = 0
+            c: int = 0
+
+            _check = only_one_of(["a", "b"], "c")
+
+        return Model
+
+    @pytest.mark.parametrize("values", [{"a": 1, "b": 2}, {"c": 3}])
+    def test_one_group(self, Model, values):
+        assert Model(**values)
+
+    @pytest.mark.parametrize(
+        "values, message",
+        [
+            (
+                {},
+                "One and only one of the following groups must exist: "
+                "['a', 'b'], ['c']",
+            ),
+            (
+                {"a": 1, "b": 2, "c": 3},
+                "Only one of the following groups of fields is allowed: "
+                "['a', 'b'], ['c']",
+            ),
+            (
+                {"b": 2},
+                "The fields ['b'] exist, but the following are also required "
+                "and missing: ['a']",
+            ),
+        ],
+    )
+    def test_errors(self, Model, values, message):
+        with pytest.raises(ValidationError, match=message.replace("[", r"\[")):
+            Model(**values)
+
+    def test_need_all_list(self):
+        check = OnlyOneOf(["a", "b"], ["c", "d"], need_all=[False, True])
+        check.check({"a": 1})
+        with pytest.raises(ValueError, match="missing"):
+            check.check({"c": 1})
+
+    def test_need_all_length_mismatch(self):
+        with pytest.raises(ConfigError):
+            OnlyOneOf("a", "b", need_all=[True])
+
+    def test_other_keys_ignored(self):
+        OnlyOneOf("a", "b").check({"a": 1, "z": 2})
+
+    def test_check_many(self):
+        check = OnlyOneOf(["a", "b"], "c")
+        errors = check.check_many(
+            [{"a": 1, "b": 2}, {}, {"c": 3}, {"a": 1, "b": 2, "c": 3}, {"x": 1}]
+        )
+
+        assert sorted(errors) == [1, 3, 4]
+        assert "must exist" in str(errors[1])
+        assert "is allowed" in str(errors[3])
+        assert "must exist" in str(errors[4])
+
+
+class TestMaybeRelativePath:
+    def make_model(self, root, **kwargs):
+        class Model(BaseModel):
+            path: Path
+
+            _path = maybe_relative_path("path", root, **kwargs)
+
+        return Model
+
+    def test_relative(self):
+        Model = self.make_model(Path("/root/dir"))
+        assert Model(path="a/b.txt").path == Path("/root/dir/a/b.txt")
+        assert Model(path=Path("c")).path == Path("/root/dir/c")
+
+    def test_absolute(self):
+        Model = self.make_model(Path("/root/dir"))
+        assert Model(path="/etc/hosts").path == Path("/etc/hosts")
+
+    def test_cached(self):
+        Model = self.make_model(Path("/root/dir"))
+        assert Model(path="a").path is Model(path="a").path
+
+    def test_must_exist(self, tmp_path):
+        (tmp_path / "exists.txt").touch()
+        Model = self.make_model(tmp_path, must_exist=True, stat_cache=PathStatCache())
+
+        assert Model(path="exists.txt").path == tmp_path / "exists.txt"
+        assert Model(path=str(tmp_path)).path == tmp_path
+        with pytest.raises(ValidationError, match="does not exist"):
+            Model(path="missing.txt")
+        with pytest.raises(ValidationError, match="does not exist"):
+            Model(path="missing_dir/file.txt")
+
+    def test_stat_cache_ttl(self, tmp_path):
+        stat_cache = PathStatCache(ttl=3600)
+        assert not stat_cache.exists(tmp_path / "new.txt")
+
+        (tmp_path / "new.txt").touch()
+        # The listing of tmp_path is still trusted
+        assert not stat_cache.exists(tmp_path / "new.txt")
+        stat_cache.clear()
+        assert stat_cache.exists(tmp_path / "new.txt")
+
+        stat_cache = PathStatCache(ttl=0)
+        assert not stat_cache.exists(tmp_path / "newer.txt")
+        (tmp_path / "newer.txt").touch()
+        assert stat_cache.exists(tmp_path / "newer.txt")
+
+    def test_stat_cache_max_size(self, tmp_path):
+        stat_cache = PathStatCache(max_size=2)
+        for name in "abc":
+            (tmp_path / name).mkdir()
+            assert not stat_cache.exists(tmp_path / name / "file")
+        assert len(stat_cache._listings) <= 2
+
+    def test_resolve(self, tmp_path):
+        (tmp_path / "real").mkdir()
+        (tmp_path / "link").symlink_to(tmp_path / "real")
+        Model = self.make_model(tmp_path, resolve=True, stat_cache=PathStatCache())
+
+        assert Model(path="link").path == (tmp_path / "real").resolve()
+
+    def test_optional(self):
+        class Model(BaseModel):
+            path: Optional[Path] = None
+
+            _path = maybe_relative_path("path", Path("/root/dir"))
+
+        assert Model(path=None).path is None
+        assert Model(path="a").path == Path("/root/dir/a")
+
+    def test_invalid(self):
+        Model = self.make_model(Path("/root/dir"))
+        with pytest.raises(ValidationError):
+            Model(path=5)
+        with pytest.raises(ValidationError):
+            Model(path=None)
@@ -0,0 +1,134 @@
+import io
+import json
+import math
+from typing import Dict, List
+
+from pydantic import BaseModel
+import pytest
+
+from phanas_pydantic_helpers import (
+    Factory,
+    create_template_from_model,
+    iter_template_events,
+    write_template,
+)
+from phanas_pydantic_helpers.helpers.create_template_from_model import (
+    END_ARRAY,
+    END_MAP,
+    MAP_KEY,
+    SCALAR,
+    START_ARRAY,
+    START_MAP,
+)
+
+
+class Player(BaseModel):
+    name: str
+    admin = False
+    highest_score: float = 1.0
+    extra_data: Dict[str, str]
+
+
+class PlayerDatabase(BaseModel):
+    version: int
+    players: List[Player]
+    banned: List[str] = []
+    scores: List[List[int]]
+
+
+class GameSystem(BaseModel):
+    player_database: PlayerDatabase = Factory(PlayerDatabase)
+    system_name = "PhanaBox"
+    games: List[str]
+    ids: Dict[int, str]
+    options = {"sound volume": {"music": 0.5}, "fullscreen": True}
+
+
+def write(model_type, format, **kwargs) -> str:
+    fp = io.StringIO()
+    write_template(model_type, fp, format, **kwargs)
+    return fp.getvalue()
+
+
+def test_events():
+    class Person(BaseModel):
+        name: str
+        tags: List[str]
+
+    assert list(iter_template_events(Person)) == [
+        ((), START_MAP, None),
+        ((), MAP_KEY, "name"),
+        (("name",), SCALAR, "NAME"),
+        ((), MAP_KEY, "tags"),
+        (("tags",), START_ARRAY, None),
+        (("tags", 0), SCALAR, "TAGS"),
+        (("tags",), END_ARRAY, None),
+        ((), END_MAP, None),
+    ]
+
+
+def test_json():
+    template = create_template_from_model(GameSystem)
+    assert write(GameSystem, "json") == json.dumps(template, indent=2) + "\n"
+    assert write(GameSystem, "json", indent=4) == json.dumps(template, indent=4) + "\n"
+
+
+def test_json_empty():
+    class Model(BaseModel):
+        pass
+
+    assert write(Model, "json") == "{}\n"
+
+
+def test_yaml():
+    yaml = pytest.importorskip("yaml")
+    template = create_template_from_model(GameSystem)
+    assert yaml.safe_load(write(GameSystem, "yaml")) == template
+    assert yaml.safe_load(write(GameSystem, "yaml", indent=4)) == template
+
+
+def test_yaml_floats():
+    yaml = pytest.importorskip("yaml")
+
+    class Floats(BaseModel):
+        inf = float("inf")
+        negative_inf = float("-inf")
+        nan = float("nan")
+        big = 1e20
+        small = -1e-05
+        half = 0.5
+        by_float: Dict[float, int] = {float("inf"): 1, 2.5: 2}
+
+    loaded = yaml.safe_load(write(Floats, "yaml"))
+    assert loaded["inf"] == float("inf")
+    assert loaded["negative_inf"] == float("-inf")
+    assert math.isnan(loaded["nan"])
+    assert (loaded["big"], loaded["small"], loaded["half"]) == (1e20, -1e-05, 0.5)
+    assert loaded["by_float"] == {float("inf"): 1, 2.5: 2}
+
+
+def test_toml():
+    tomllib = pytest.importorskip("tomllib")
+    template = create_template_from_model(GameSystem)
+    # TOML has no integer keys
+    template["ids"] = {str(k): v for k, v in template["ids"].items()}
+    assert tomllib.loads(write(GameSystem, "toml")) == template
+
+
+def test_toml_scalars_before_tables():
+    text = write(GameSystem, "toml")
+    assert text.index("system_name =") < text.index("[player_database]")
+    assert text.index("banned =") < text.index("[[player_database.players]]")
+
+
+def test_cycle():
+    class Node(BaseModel):
+        name: str
+        children: List["Node"]
+
+    assert json.loads(write(Node, "json")) == create_template_from_model(Node)
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        write(GameSystem, "xml")